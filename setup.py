@@ -62,7 +62,7 @@ setup(
                           'requests>2.4.2', 'coloredlogs<=5.1.1', 'paramiko',
                           'termcolor', 'tabulate', 'networkx<=1.12', 'Flask',
                           'PyJWT>=1.4.2', 'docker==2.0.2', 'scipy', 'numpy',
-                          'watchdog', 'Flask-Cors', 'flask_cache', 'redis',
+                          'watchdog', 'Flask-Cors', 'redis',
                           'pycrypto', 'matplotlib', 'prometheus_client',
                           'requests-toolbelt==0.8.0'],
         zip_safe=False,
@@ -72,7 +72,8 @@ setup(
                 'son-package=son.package.package:main',
                 'son-monitor=son.monitor.monitor:main',
                 'son-profile=son.profile.profile:main',
-                'son-validate=son.validate.validate:main',
+                'son-validate=son.validate.cli:main',
+                'son-validate-daemon=son.validate.daemon:main',
                 'son-validate-api=son.validate.api.api:main',
                 'son-access=son.access.access:main'
             ],
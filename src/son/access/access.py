@@ -55,22 +55,19 @@ optional arguments:
 # import sys
 # sys.path.append('src/')
 
+# requests, jwt, Crypto and the platform clients are slow to import: they
+# are imported by the methods using them, not to delay e.g. the usage
 import logging
-import requests
 import yaml
 import json
 import sys
-import jwt
 import coloredlogs
 import os
 import time
 from os.path import expanduser
 from argparse import ArgumentParser
-from Crypto.PublicKey import RSA
-from Crypto.Hash import SHA256
 from son.workspace.workspace import Workspace
-from son.access.pull import Pull
-from son.access.push import Push
+from son import trace
 
 log = logging.getLogger(__name__)
 
@@ -177,6 +174,9 @@ class AccessClient:
             self.platform_dir = os.path.join(self.workspace.workspace_root)
 
         # Create a push and pull client for available Service Platforms
+        from son.access.pull import Pull
+        from son.access.push import Push
+
         self.pull = dict()
         self.push = dict()
         for p_id, platform in self.workspace.service_platforms.items():
@@ -206,6 +206,7 @@ class AccessClient:
             if self.platform_id else None
 
 
+    @trace.traced(category='son.access')
     def client_login(self, username=None, password=None):
         """
         Make a POST request with username and password
@@ -213,6 +214,7 @@ class AccessClient:
         :param password: user password
         :return: JWT Access Token is returned from the GK server
         """
+        from son.access.session import platform_session
 
         default_sp = self.workspace.default_service_platform
         url = self.workspace.get_service_platform(default_sp)['url'] + \
@@ -227,7 +229,8 @@ class AccessClient:
         # Construct the POST login request
         credentials = json.dumps({'username': username, 'password': password})
 
-        response = requests.post(url, data=credentials, verify=False)
+        response = platform_session(url).post(url, data=credentials,
+                                              verify=False)
         if not response.status_code in (200, 201):
             log.debug('Error {0}'.format(response.status_code))
             return response.text
@@ -260,11 +263,13 @@ class AccessClient:
 
         return response.text
 
+    @trace.traced(category='son.access')
     def client_logout(self):
         """
         Send request to /logout interface to end user session
         :return: HTTP Code 204
         """
+        from son.access.session import platform_session
         default_sp = self.workspace.default_service_platform
         url = self.workspace.get_service_platform(default_sp)['url'] + \
             self.GK_API_VERSION + self.GK_URI_LOGOUT
@@ -287,7 +292,8 @@ class AccessClient:
 
         headers = {'Authorization': 'Bearer %s' % self.access_token}
 
-        response = requests.post(url, headers=headers, verify=False)
+        response = platform_session(url).post(url, headers=headers,
+                                              verify=False)
         if response.status_code not in (200, 204):
             log.debug('Error {0}'.format(response.status_code))
             return response.text
@@ -300,6 +306,7 @@ class AccessClient:
         Simple request to check if session has expired (TBD)
         :return: Token status
         """
+        import jwt
 
         if self.access_token is None:
             try:
@@ -345,17 +352,20 @@ class AccessClient:
         except jwt.InvalidIssuedAtError:
             return False
 
+    @trace.traced(category='son.access')
     def get_platform_public_key(self):
         """
         Simple request to request the Platform Public Key
         :return: Public Key, HTTP code 200
         """
+        from son.access.session import platform_session
+        from Crypto.PublicKey import RSA
         default_sp = self.workspace.default_service_platform
         url = self.workspace.get_service_platform(default_sp)['url'] + \
               self.GK_API_VERSION + self.GK_URI_PB_KEY
 
         try:
-            response = requests.get(url, verify=False)
+            response = platform_session(url).get(url, verify=False)
             parsed_key = json.loads(response.text)
             parsed_key = parsed_key['items']['public-key']
             platform_public_key = "-----BEGIN PUBLIC KEY-----\n"
@@ -368,12 +378,15 @@ class AccessClient:
             log.warning("Service Platform Public Key not found. Authentication is disabled.")
             return None
 
+    @trace.traced(category='son.access')
     def generate_keypair(self, platform_dir):
         """
         Generates User's Private Key and Public Key
         :param platform_dir: Path to the location where keys will be saved
         :returns: Private key, Public Key
         """
+        from son.access.session import platform_session
+        from Crypto.PublicKey import RSA
         # KeyPair = NamedTuple('KeyPair', [('public', str), ('private', str)])
         algorithm = 'RS256'
 
@@ -405,7 +418,7 @@ class AccessClient:
 
             print("body=", body)
             print("Updating User Public Key...")
-            r = requests.patch(url, headers=headers, data=body)
+            r = platform_session(url).patch(url, headers=headers, data=body)
 
             print("r.status_code=", r.status_code)
 
@@ -437,13 +450,20 @@ class AccessClient:
             log.error("Error generating new keypair for the user")
             return False
 
-    def push_package(self, path, sign=False):
+    @trace.traced(category='son.access')
+    def push_package(self, path, sign=False, chunk_size=None):
         """
         Call push feature to upload a package to the SP Catalogue
         :param path: location of the package to submit
         :param sign: setting to state if the package is going to be signed
+        :param chunk_size: size of the chunks of the package sent at once,
+                           in bytes (default in son.access.config)
         :return: HTTP code 201 or 40X
         """
+        from son.access.transfer import TransferProgress
+        upload_options = {'progress': TransferProgress(os.path.basename(path))}
+        if chunk_size:
+            upload_options['chunk_size'] = chunk_size
 
         print("Pushing package")
         print("SIGN =", sign)
@@ -468,12 +488,14 @@ class AccessClient:
             # Push son-package to the Service Platform
             sign = self.sign_package(path)
             print(self.default_push.upload_package
-                  (self.access_token, path, sign))
+                  (self.access_token, path, sign, **upload_options))
 
         else:
             # Push son-package to the Service Platform
-            print(self.default_push.upload_package(self.access_token, path))
+            print(self.default_push.upload_package(self.access_token, path,
+                                                   **upload_options))
 
+    @trace.traced(category='son.access')
     def sign_package(self, path, private_key=None):
         """
         Sign package feature using SHA256 hash and RSA keypair
@@ -483,22 +505,28 @@ class AccessClient:
         :return: string containing an int representation of the 
                  package's signature
         """
+        from Crypto.PublicKey import RSA
+        from Crypto.Hash import SHA256
         if private_key:
             # Private key used to test
             private_key_obj = RSA.importKey(private_key)
         else:
             private_key_obj = RSA.importKey(self.dev_private_key)
+        # File read as binary, it's not necessary to encode 'utf-8' to hash
+        package_hash = SHA256.new()
         try:
             with open(path, 'rb') as fhandle:
-                package_content = fhandle.read()
+                # hashed in chunks: packages may not fit in memory
+                for chunk in iter(lambda: fhandle.read(1024 * 1024), b''):
+                    package_hash.update(chunk)
         except IOError as err:
             print("I/O error: {0}".format(err))
-        # File read as binary, it's not necessary to encode 'utf-8' to hash
-        package_hash = SHA256.new(package_content).digest()
+        package_hash = package_hash.digest()
         # Signature is a tuple containing an integer as first entry
         signature = private_key_obj.sign(package_hash, '')
         return str(signature[0])
 
+    @trace.traced(category='son.access')
     def deploy_service(self, service_id):
         """
         Call push feature to request a service instantiation to the 
@@ -508,6 +536,7 @@ class AccessClient:
         """
         print(self.default_push.instantiate_service(service_id, self.access_token))
 
+    @trace.traced(category='son.access')
     def pull_resource(self, resource_type, identifier=None, uuid=False,
                       platform_id=None):
         """
@@ -576,7 +605,7 @@ class AccessClient:
 
             elif resource_type == 'files':
                 log.debug("Retrieving package file uuid='{}'".format(identifier))
-                file_data = pull.get_son_package_by_uuid(identifier)
+                from son.access.transfer import TransferProgress
 
                 filename = str(identifier) + '.son'
                 filepath= os.path.join(
@@ -584,10 +613,11 @@ class AccessClient:
                     self.workspace.platforms_dir,
                     filename)
 
-                with open(filepath, mode="wb") as son_file:
-                    son_file.write(file_data)
-                    # son_file.write(bytes(file_data, 'UTF-8'))
-                    son_file.close()
+                # streamed to the file, resuming interrupted downloads
+                if pull.get_son_package_by_uuid(
+                        identifier, path=filepath,
+                        progress=TransferProgress(filename)):
+                    print("Package file stored in '{0}'".format(filepath))
 
         # resources list
         else:
@@ -678,6 +708,7 @@ class AccessArgParse(object):
             required=False,
             action="store_true"
         )
+        trace.add_argument(parser)
         parser.add_argument(
             "command",
             help="Command to run"
@@ -688,13 +719,14 @@ class AccessArgParse(object):
         for idx in range(1, len(sys.argv)):
             v = sys.argv[idx]
             if (v == "-w" or v == "--workspace" or
-                    v == "--platform"):
+                    v == "--platform" or v == "--trace"):
                 command_idx += 2
-            elif v == '--debug':
+            elif v == '--debug' or v == '--trace-memory':
                 command_idx += 1
 
         self.subarg_idx = command_idx + 1
         args = parser.parse_args(sys.argv[1: self.subarg_idx])
+        trace.configure(args, 'son-access')
 
         # handle workspace
         if args.workspace:
@@ -791,6 +823,14 @@ class AccessArgParse(object):
             metavar="PACKAGE_PATH"
         )
 
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            help="Size of the chunks of the package sent at once, in bytes",
+            required=False,
+            metavar="BYTES"
+        )
+
         mutex_parser = parser.add_mutually_exclusive_group(
             required=False
         )
@@ -820,11 +860,13 @@ class AccessArgParse(object):
             if args.sign:
                 package_path = args.upload
                 print(package_path)
-                self.ac.push_package(package_path, sign=True)
+                self.ac.push_package(package_path, sign=True,
+                                     chunk_size=args.chunk_size)
             else:
                 package_path = args.upload
                 print(package_path)
-                self.ac.push_package(package_path, sign=False)
+                self.ac.push_package(package_path, sign=False,
+                                     chunk_size=args.chunk_size)
 
         elif args.deploy:
             service_uuid = args.deploy
@@ -0,0 +1,215 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE, i2CAT,
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE, i2CAT,
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import logging
+import argparse
+import tempfile
+import tracemalloc
+import requests
+from son.access.pull import Pull
+from son.access.push import Push
+from son.access.session import PlatformSession
+from son.access.config.config import HTTP_CHUNK_SIZE
+from son.access.tests.gatekeeper_standin import StandInGatekeeper
+from son.validate.benchmark import latency_summary
+
+log = logging.getLogger(__name__)
+
+
+def bench_pulls(num_requests=100, num_functions=10, latency=0.0,
+                handshake=0.0):
+    """
+    Time bulk pulls of function descriptors from a local Gatekeeper
+    stand-in, opening a connection per request (as the module-level
+    functions of requests) and reusing the connections of a pooled
+    session.
+    :param num_requests: number of pulled descriptors
+    :param num_functions: number of distinct functions of the catalogue
+    :param latency: time of the stand-in to handle a request, in seconds
+    :param handshake: time of the stand-in to accept a connection, in
+                      seconds, e.g. the TCP and TLS handshakes of a remote
+                      platform
+    :return: dictionary of the latency summaries (see 'latency_summary')
+             and connections opened, per mode
+    """
+    sessions = {'connection_per_request': requests,
+                'pooled': PlatformSession()}
+    results = {}
+    with StandInGatekeeper(latency=latency, handshake=handshake) as gk:
+        uuids = [str(uuid.uuid4()) for _ in range(num_functions)]
+        for idx, vnf_uuid in enumerate(uuids):
+            gk.add(Pull.GK_API_VERSION + Pull.CAT_URI_VNF_ID + vnf_uuid,
+                   json.dumps({'uuid': vnf_uuid,
+                               'vnfd': {'vendor': 'eu.sonata-nfv',
+                                        'name': 'vnf-{0}'.format(idx),
+                                        'version': '0.1'}}))
+
+        for mode, session in sorted(sessions.items()):
+            pull = Pull(gk.url, session=session)
+            connections = gk.connections
+            samples = []
+            for idx in range(num_requests):
+                start = time.perf_counter()
+                vnfd = pull.get_vnf_by_uuid(uuids[idx % num_functions])
+                samples.append(time.perf_counter() - start)
+                assert vnfd, "Failed to pull a function descriptor"
+
+            results[mode] = latency_summary(samples)
+            results[mode]['connections'] = gk.connections - connections
+
+    sessions['pooled'].close()
+    return results
+
+
+def write_synthetic_package(path, size):
+    """
+    Write a synthetic package of random content.
+    :param path: path of the package
+    :param size: size of the package, in bytes
+    """
+    with open(path, 'wb') as _f:
+        while size > 0:
+            chunk = os.urandom(min(size, HTTP_CHUNK_SIZE))
+            _f.write(chunk)
+            size -= len(chunk)
+
+
+def bench_upload(size=64 * 1024 * 1024, chunk_size=HTTP_CHUNK_SIZE):
+    """
+    Time the upload of a synthetic package to a local Gatekeeper stand-in,
+    with a multipart body built in memory (as requests does for 'files')
+    and with the streaming upload of the Push client.
+    :param size: size of the package, in bytes
+    :param chunk_size: size of the chunks of the streaming upload
+    :return: dictionary of the duration, throughput (bytes per second) and
+             peak memory allocated (bytes) by the upload, per mode
+    """
+    root = tempfile.mkdtemp(prefix='son-access-bench-')
+    package = os.path.join(root, 'synthetic.son')
+    write_synthetic_package(package, size)
+
+    def buffered(url):
+        with open(package, 'rb') as _f:
+            requests.post(url + Push.GK_API_VERSION + Push.CAT_URI_PD,
+                          files={'package': _f})
+
+    def streaming(url):
+        Push(url, session=PlatformSession()).upload_package(
+            None, package, chunk_size=chunk_size)
+
+    results = {}
+    try:
+        with StandInGatekeeper() as gk:
+            for mode, upload in (('buffered', buffered),
+                                 ('streaming', streaming)):
+                tracemalloc.start()
+                start = time.perf_counter()
+                upload(gk.url)
+                duration = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+                assert gk.requests[-1][2] > size, "Failed to upload"
+                results[mode] = {'duration_s': duration,
+                                 'throughput_bps': size / duration,
+                                 'peak_memory_bytes': peak}
+        return results
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark of the HTTP connections and package "
+                    "uploads of the platform clients, against a local "
+                    "Gatekeeper stand-in. Reports results in JSON format.")
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=100,
+        help="Number of pulled descriptors. Default: 100"
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Time of the stand-in to handle a request, in msec. "
+             "Default: 0"
+    )
+    parser.add_argument(
+        "--handshake",
+        type=float,
+        default=0.0,
+        help="Time of the stand-in to accept a connection, in msec, to "
+             "emulate the TCP and TLS handshakes with a remote platform. "
+             "Default: 0"
+    )
+    parser.add_argument(
+        "--upload",
+        type=int,
+        metavar="MB",
+        help="Benchmark the upload of a synthetic package of MB megabytes, "
+             "instead of pulls"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=HTTP_CHUNK_SIZE,
+        help="Size of the chunks of the streaming upload, in bytes. "
+             "Default: {0}".format(HTTP_CHUNK_SIZE)
+    )
+    parser.add_argument(
+        "-o", "--output",
+        help="File to write the results to. Default: standard output"
+    )
+    args = parser.parse_args()
+
+    if args.upload:
+        results = {'upload': bench_upload(size=args.upload * 1024 * 1024,
+                                          chunk_size=args.chunk_size)}
+    else:
+        results = {'pulls': bench_pulls(num_requests=args.requests,
+                                        latency=args.latency / 1000,
+                                        handshake=args.handshake / 1000)}
+
+    output = json.dumps(results, sort_keys=True, indent=4,
+                        separators=(',', ': '))
+    if args.output:
+        with open(args.output, 'w') as _f:
+            _f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
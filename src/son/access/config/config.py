@@ -15,4 +15,12 @@ PRIVATE_KEY_PATH = "/config/pv_key.pem"
 "[Certificate]"
 CERT_PATH = "/config/trust.crt"
 
+"[HTTP]"
+HTTP_POOL_SIZE = 10         # connections kept alive per platform
+HTTP_CONNECT_TIMEOUT = 5    # seconds
+HTTP_READ_TIMEOUT = 60      # seconds, between bytes of a response
+HTTP_RETRIES = 3            # retries of idempotent requests
+HTTP_BACKOFF_FACTOR = 0.5   # retry delays: 0.5s, 1s, 2s, ...
+HTTP_CHUNK_SIZE = 1048576   # bytes, read and sent at once by transfers
+
 "[Others]"
@@ -31,6 +31,9 @@ import sys
 import validators
 from son.workspace.workspace import Workspace
 from son.access.config.config import GK_ADDRESS, GK_PORT
+from son import trace
+from son.access.session import platform_session
+from son.access.config.config import HTTP_CHUNK_SIZE
 from json import loads
 
 log = logging.getLogger(__name__)
@@ -75,9 +78,16 @@ class Pull(object):
     CAT_URI_PD_NAME = "/packages?name="  # Get Package list by name
     CAT_URI_SONP_ID = "/packages/"  # Get a specific SON-Package by ID
 
-    def __init__(self, base_url, auth_token=None):
+    def __init__(self, base_url, auth_token=None, session=None):
+        """
+        :param base_url: URL of the Gatekeeper of the service platform
+        :param auth_token: access token of the user
+        :param session: HTTP session, by default the shared session of the
+                        platform, see son.access.session
+        """
         # Assign parameters
         self._base_url = base_url
+        self._session = session or platform_session(base_url)
         self._headers = {'Content-Type': 'application/json'}
         if auth_token:
             self._headers["Authorization"] = "Bearer %s" % auth_token
@@ -101,8 +111,8 @@ class Pull(object):
         """
         url = self._base_url + self.CAT_URI_BASE
         try:
-            response = requests.get(url,
-                                    headers=self._headers)
+            response = self._session.get(url,
+                                         headers=self._headers)
 
         except requests.exceptions.InvalidURL:
             log.warning("Invalid URL: '{}'. Please specify "
@@ -121,6 +131,7 @@ class Pull(object):
 
         return response.status_code == requests.codes.ok
 
+    @trace.traced(category='son.access')
     def __get_cat_object__(self, cat_uri, obj_query, extra_uri=None):
         """
         Generic GET function to request a SONATA SP resource.
@@ -131,18 +142,19 @@ class Pull(object):
         """
         if extra_uri is None:
             url = self._base_url + self.GK_API_VERSION + cat_uri + obj_query
-            response = requests.get(url, headers=self._headers)
+            response = self._session.get(url, headers=self._headers)
             if not response.status_code == requests.codes.ok:
                 return
             return response.text
         else:
             url = self._base_url + self.GK_API_VERSION + cat_uri + obj_query + extra_uri
 
-            response = requests.get(url, headers=self._headers)
+            response = self._session.get(url, headers=self._headers)
             if not response.status_code == requests.codes.ok:
                 return
             return response.content
 
+    @trace.traced(category='son.access')
     def _get_from_url(self, url):
         """
         Generic/internal function to fetch content of a given URL
@@ -154,7 +166,7 @@ class Pull(object):
             raise Exception(url+" is not a valid url.")
 
         try:
-            r = requests.get(url)
+            r = platform_session(url).get(url)
             return r.text
         except:
             raise Exception("Content cannot be downloaded from "+url)
@@ -297,14 +309,54 @@ class Pull(object):
         log.debug("Obtained NS schema:\n{}".format(cat_obj))
         return yaml.load(cat_obj)
 
-    def get_son_package_by_uuid(self, son_package_uuid):
+    def get_son_package_by_uuid(self, son_package_uuid, path=None,
+                                chunk_size=HTTP_CHUNK_SIZE, progress=None):
         """
         Obtains a specific package (PD)
         :param son_package_uuid: UUID of SON-PACKAGE in the form 'uuid-generated'
-        :return: SON file object containing NSDs, VNFDs, PD
+        :param path: file to download the package to. The package is
+                     streamed to the file, resuming interrupted transfers,
+                     and verified against the digest reported by the
+                     catalogue (see son.access.transfer.download). If not
+                     specified, the package is loaded in memory
+        :param chunk_size: size of the chunks written at once, in bytes
+        :param progress: callable, called with the downloaded and total
+                         bytes as the download progresses, e.g. a
+                         son.access.transfer.TransferProgress
+        :return: SON file object containing NSDs, VNFDs, PD, or the path
+                 of the downloaded package. None if it failed
         """
-        cat_file = self.__get_cat_object__(self.CAT_URI_SONP_ID, son_package_uuid, '/download')
-        return cat_file
+        if path is None:
+            cat_file = self.__get_cat_object__(self.CAT_URI_SONP_ID, son_package_uuid, '/download')
+            return cat_file
+
+        from son.access.transfer import download, DownloadError
+        url = self._base_url + self.GK_API_VERSION + self.CAT_URI_SONP_ID + \
+            son_package_uuid + '/download'
+        try:
+            download(self._session, url, path, headers=self._headers,
+                     digest=self.get_son_package_digest(son_package_uuid),
+                     chunk_size=chunk_size, progress=progress)
+        except DownloadError as e:
+            log.error(e)
+            return
+        return path
+
+    def get_son_package_digest(self, son_package_uuid):
+        """
+        Obtains the MD5 digest of a SON-PACKAGE, as reported by the
+        catalogue in the metadata of the package
+        :param son_package_uuid: UUID of SON-PACKAGE in the form 'uuid-generated'
+        :return: hexadecimal digest, None if not reported
+        """
+        cat_obj = self.__get_cat_object__(self.CAT_URI_PD_ID,
+                                          son_package_uuid)
+        try:
+            metadata = yaml.safe_load(cat_obj) if cat_obj else None
+        except yaml.YAMLError:
+            return
+        if isinstance(metadata, dict) and metadata.get('md5'):
+            return str(metadata['md5'])
 
     # def get_instances(url):
     #     return _get_from_url(url + "/instantiations")
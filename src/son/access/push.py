@@ -29,6 +29,9 @@ import requests
 import logging
 import sys
 from son.access.config.config import GK_ADDRESS, GK_PORT
+from son import trace
+from son.access.session import platform_session
+from son.access.config.config import HTTP_CHUNK_SIZE
 
 log = logging.getLogger(__name__)
 
@@ -68,10 +71,19 @@ class Push(object):
     CAT_URI_PD = "/packages?"               # Package submitting endpoint
     GK_URI_INST = "/requests?"
 
-    def __init__(self, base_url, pb_key=None, pr_key=None, cert=None):
-
+    def __init__(self, base_url, pb_key=None, pr_key=None, cert=None,
+                 session=None):
+        """
+        :param base_url: URL of the Gatekeeper of the service platform
+        :param pb_key: public key of the developer
+        :param pr_key: private key of the developer
+        :param cert: certificate of the developer
+        :param session: HTTP session, by default the shared session of the
+                        platform, see son.access.session
+        """
         # Assign parameters
         self._base_url = base_url
+        self._session = session or platform_session(base_url)
         self._headers = {'Content-Type': 'application/json'}
         # {'Content-Type': 'application/x-yaml'}
         self._keys = {'public_key': pb_key, 'private_key': pr_key, 'certificate': cert}
@@ -94,8 +106,8 @@ class Push(object):
         """
         url = self._base_url + Push.CAT_URI_BASE
         try:
-            response = requests.get(url,
-                                    headers=self._headers)
+            response = self._session.get(url,
+                                         headers=self._headers)
 
         except requests.exceptions.InvalidURL:
             log.warning("Invalid URL: '{}'. Please specify "
@@ -114,6 +126,7 @@ class Push(object):
 
         return response.status_code == requests.codes.ok
 
+    @trace.traced(category='son.access')
     def __post_cat_object__(self, cat_uri, obj_data):
         """
         Generic POST function.
@@ -125,7 +138,7 @@ class Push(object):
         log.debug("Object POST to: {}\n{}".format(url, obj_data))
 
         try:
-            response = requests.post(url, data=obj_data, headers=self._headers)
+            response = self._session.post(url, data=obj_data, headers=self._headers)
             return response
 
         except requests.exceptions.ConnectionError:
@@ -164,7 +177,9 @@ class Push(object):
 
         return response
 
-    def upload_package(self, access_token, package_file_name, signature=None):
+    @trace.traced(category='son.access')
+    def upload_package(self, access_token, package_file_name, signature=None,
+                       chunk_size=HTTP_CHUNK_SIZE, progress=None):
         """
         Upload package to platform
 
@@ -180,10 +195,19 @@ class Push(object):
         :param signature: Sets to True or False if the package is signed
                      before pushing it to the Platform
 
+        :param chunk_size: size of the chunks of the package sent at
+                           once, in bytes. The package is streamed: it
+                           isn't loaded in memory
+
+        :param progress: callable, called with the sent and total bytes
+                         as the upload progresses, e.g. a
+                         son.access.transfer.TransferProgress
+
         :returns: text response message of the server or
                   error message
         """
         import os
+        from son.access.transfer import UploadStream
 
         if not os.path.isfile(package_file_name):
             return package_file_name, "is not a file."
@@ -197,16 +221,19 @@ class Push(object):
 
         try:
             with open(package_file_name, 'rb') as pkg_file:
-                payload = {'package': pkg_file}
+                payload = UploadStream(
+                    {'package': (os.path.basename(package_file_name),
+                                 pkg_file)},
+                    chunk_size=chunk_size, progress=progress)
+                headers = {'Content-Type': payload.content_type}
                 if access_token:
-                    headers = {'Authorization': "Bearer %s" % access_token}
-                else:
-                    headers = {}
+                    headers['Authorization'] = "Bearer %s" % access_token
                 if signature:
                     # Including signature header in case it's passed as param
                     print("SIGNATURE= ", signature)
                     headers['signature'] = signature
-                r = requests.post(url, headers=headers, files=payload)
+                r = self._session.post(url, headers=headers, data=payload)
+                trace.count('bytes_uploaded', payload.bytes_read)
                 if r.status_code == 201:
                     msg = "Upload succeeded"
                 elif r.status_code == 409:
@@ -232,6 +259,7 @@ class Push(object):
         # except jwt.exceptions.InvalidTokenError as e:
         #    raise InvalidAuthenticationToken
 
+    @trace.traced(category='son.access')
     def instantiate_service(self, service_uuid="", access_token=None):
         """
         Instantiate service on SONATA service platform
@@ -256,7 +284,7 @@ class Push(object):
             else:
                 headers = {}
 
-            r = requests.post(url, headers=headers, json={"service_uuid": service_uuid})
+            r = self._session.post(url, headers=headers, json={"service_uuid": service_uuid})
             return r.text
 
         except Exception as e:
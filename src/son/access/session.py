@@ -0,0 +1,130 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE, i2CAT,
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE, i2CAT,
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+
+"""
+HTTP sessions of the platform clients. Each service platform (scheme, host
+and port) has a shared session, keeping a pool of connections alive
+between requests, instead of opening a new TCP (and TLS) connection per
+request. Requests have default timeouts, and idempotent requests are
+retried, with exponential backoff, on connection errors and on
+unavailability responses of the gatekeeper.
+"""
+
+import logging
+import threading
+import requests
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from son import trace
+from son.access.config.config import HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT, \
+    HTTP_READ_TIMEOUT, HTTP_RETRIES, HTTP_BACKOFF_FACTOR
+
+log = logging.getLogger(__name__)
+
+# methods which can safely be retried: POST (e.g. a package upload or a
+# service instantiation) and PATCH are not, except on connection errors,
+# as they are then never sent
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+
+# responses of an overloaded or restarting gatekeeper
+RETRY_STATUS = (429, 502, 503, 504)
+
+
+def _retry(retries, backoff):
+    if not retries:
+        # as the default of requests: timeouts raise requests.Timeout
+        return Retry(0, read=False)
+    options = dict(total=retries, backoff_factor=backoff,
+                   status_forcelist=RETRY_STATUS, raise_on_status=False)
+    try:
+        return Retry(allowed_methods=IDEMPOTENT_METHODS, **options)
+    except TypeError:
+        # urllib3 < 1.26
+        return Retry(method_whitelist=IDEMPOTENT_METHODS, **options)
+
+
+class PlatformSession(requests.Session):
+
+    def __init__(self, pool_size=HTTP_POOL_SIZE,
+                 timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+                 retries=HTTP_RETRIES, backoff=HTTP_BACKOFF_FACTOR):
+        """
+        Session with a pool of keep-alive connections, default timeouts
+        and retries of idempotent requests.
+        :param pool_size: maximum number of connections kept alive per
+                          host, i.e. of concurrent requests reusing them
+        :param timeout: default timeout of the requests, in seconds: a
+                        number or a (connect, read) tuple
+        :param retries: maximum number of retries of a request
+        :param backoff: backoff factor of the retries, in seconds: the
+                        n-th retry waits backoff * 2 ** (n - 1)
+        """
+        super(PlatformSession, self).__init__()
+        self.timeout = timeout
+        adapter = HTTPAdapter(pool_connections=pool_size,
+                              pool_maxsize=pool_size,
+                              max_retries=_retry(retries, backoff))
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        trace.count('http_calls')
+        return super(PlatformSession, self).request(method, url, **kwargs)
+
+
+_sessions = dict()
+_sessions_lock = threading.Lock()
+
+
+def platform_session(url, **options):
+    """
+    Provides the shared session of a service platform, created on first
+    use.
+    :param url: URL of the platform, or of any of its resources
+    :param options: options of the session if created, see PlatformSession
+    :return: PlatformSession object
+    """
+    parts = urlsplit(url)
+    origin = '{0}://{1}'.format(parts.scheme, parts.netloc.lower())
+    with _sessions_lock:
+        session = _sessions.get(origin)
+        if session is None:
+            log.debug("Creating HTTP session of '{0}'".format(origin))
+            session = _sessions[origin] = PlatformSession(**options)
+    return session
+
+
+def close_sessions():
+    """
+    Close the shared sessions and their connections.
+    """
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,229 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE, i2CAT,
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE, i2CAT,
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+
+import re
+import time
+import base64
+import hashlib
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+
+# maximum size of the request bodies kept by the stand-in, in bytes
+MAX_BODY = 1024 * 1024
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # keep connections alive between requests
+    protocol_version = 'HTTP/1.1'
+    # headers and content are written separately: don't delay the content
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super(_Handler, self).setup()
+        self.server.gatekeeper._connected()
+
+    def log_message(self, *args):
+        pass
+
+    def _read_body(self):
+        # read in chunks, uploaded packages may be large: only small
+        # bodies are kept
+        length = int(self.headers.get('Content-Length') or 0)
+        remaining = length
+        body = []
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, 65536))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            if length <= MAX_BODY:
+                body.append(chunk)
+        return length - remaining, b''.join(body) if body else None
+
+    def _respond(self, status, body, headers=None, cut=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if cut is None:
+            self.wfile.write(body)
+        else:
+            # interrupted transfer
+            self.wfile.write(body[:cut])
+            self.close_connection = True
+
+    def _handle(self, length=0, body=None):
+        self._respond(*self.server.gatekeeper._handle(
+            self.command, self.path, length, body,
+            self.headers.get('Range')))
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle(*self._read_body())
+
+    def do_PATCH(self):
+        self._handle(*self._read_body())
+
+
+class StandInGatekeeper(object):
+
+    def __init__(self, latency=0.0, handshake=0.0):
+        """
+        Local stand-in of the Gatekeeper API of a service platform, to
+        test and benchmark the platform clients without a platform. It
+        serves the added resources, and records the requests, their
+        bodies (up to MAX_BODY bytes) and requested ranges, and the
+        connections it accepts.
+        :param latency: time to handle a request, in seconds
+        :param handshake: time to accept a connection, in seconds, e.g.
+                          the round-trips of the TCP and TLS handshakes of
+                          a remote platform
+        """
+        self.latency = latency
+        self.handshake = handshake
+        self.connections = 0
+        self.requests = []
+        self.bodies = []
+        self.ranges = []
+        self._resources = {'/': (200, b'{}')}
+        self._failures = []
+        self._ranges = set()
+        self._digests = set()
+        self._interruptions = []
+        self._lock = threading.Lock()
+
+        self._server = _Server(('127.0.0.1', 0), _Handler)
+        self._server.gatekeeper = self
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        kwargs={'poll_interval': 0.05})
+        self._thread.daemon = True
+        self._thread.start()
+
+    @property
+    def url(self):
+        return 'http://{0}:{1}'.format(*self._server.server_address)
+
+    def add(self, path, content, status=200, ranges=False,
+            content_md5=False):
+        """
+        Serve a resource.
+        :param path: path and query of the resource, e.g.
+                     '/api/v2/functions/<uuid>'
+        :param content: content of the resource, str or bytes
+        :param status: status of the responses
+        :param ranges: serve byte ranges of the resource ('Range' header)
+        :param content_md5: send the digest of the resource in the
+                            'Content-MD5' header
+        """
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        self._resources[path] = (status, content)
+        if ranges:
+            self._ranges.add(path)
+        if content_md5:
+            self._digests.add(path)
+
+    def interrupt(self, *sizes):
+        """
+        Interrupt the transfer of the next responses, closing their
+        connection.
+        :param sizes: bytes of the content sent by each interrupted
+                      response
+        """
+        with self._lock:
+            self._interruptions.extend(sizes)
+
+    def fail(self, count, status=503):
+        """
+        Answer the next requests with an error status.
+        :param count: number of failing requests
+        :param status: status of the failing responses
+        """
+        with self._lock:
+            self._failures.extend([status] * count)
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _connected(self):
+        with self._lock:
+            self.connections += 1
+        if self.handshake:
+            time.sleep(self.handshake)
+
+    def _handle(self, method, path, length, body, byte_range=None):
+        with self._lock:
+            self.requests.append((method, path, length))
+            self.bodies.append(body)
+            self.ranges.append(byte_range)
+            failure = self._failures.pop(0) if self._failures else None
+            cut = self._interruptions.pop(0) \
+                if self._interruptions and method == 'GET' else None
+        if self.latency:
+            time.sleep(self.latency)
+        if failure:
+            return failure, b'{"error": "unavailable"}'
+        if method != 'GET':
+            return 201, b'{}'
+        if path not in self._resources:
+            return 404, b'{"error": "not found"}'
+
+        status, content = self._resources[path]
+        headers = dict()
+        if path in self._ranges:
+            headers['Accept-Ranges'] = 'bytes'
+            match = re.match(r'bytes=(\d+)-$', byte_range or '')
+            if match:
+                start = int(match.group(1))
+                if start >= len(content):
+                    headers['Content-Range'] = 'bytes */{0}'.format(
+                        len(content))
+                    return 416, b'', headers
+                headers['Content-Range'] = 'bytes {0}-{1}/{2}'.format(
+                    start, len(content) - 1, len(content))
+                return 206, content[start:], headers, cut
+        if path in self._digests:
+            headers['Content-MD5'] = base64.b64encode(
+                hashlib.md5(content).digest()).decode('ascii')
+        return status, content, headers, cut
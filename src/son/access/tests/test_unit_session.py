@@ -0,0 +1,113 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE, i2CAT,
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE, i2CAT,
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+
+import unittest
+import requests
+from son.access.pull import Pull
+from son.access.push import Push
+from son.access.session import PlatformSession, platform_session, \
+    close_sessions
+from son.access.benchmark import bench_pulls
+from son.access.tests.gatekeeper_standin import StandInGatekeeper
+
+
+class UnitSessionTests(unittest.TestCase):
+
+    def setUp(self):
+        self.gk = StandInGatekeeper()
+        self.addCleanup(self.gk.close)
+        self.gk.add('/api/v2/functions', '[]')
+
+    def test_connection_reuse(self):
+        """
+        Tests that the requests of a client reuse a connection.
+        """
+        pull = Pull(self.gk.url, session=PlatformSession())
+        for _ in range(10):
+            self.assertEqual(pull.get_all_vnfs(), '[]')
+        self.assertEqual(len(self.gk.requests), 10)
+        self.assertEqual(self.gk.connections, 1)
+
+    def test_shared_session(self):
+        """
+        Tests that the clients of a platform share its session.
+        """
+        self.addCleanup(close_sessions)
+        pull = Pull(self.gk.url)
+        push = Push(self.gk.url + '/')
+        self.assertIs(pull._session, push._session)
+        self.assertIs(platform_session(self.gk.url + '/api/v2/packages'),
+                      pull._session)
+        self.assertIsNot(platform_session('http://localhost:1'),
+                         pull._session)
+
+        pull.get_all_vnfs()
+        push.alive()
+        self.assertEqual(self.gk.connections, 1)
+
+    def test_retry_idempotent(self):
+        """
+        Tests that GET requests are retried while the platform is
+        unavailable.
+        """
+        self.gk.fail(2)
+        pull = Pull(self.gk.url, session=PlatformSession(backoff=0))
+        self.assertEqual(pull.get_all_vnfs(), '[]')
+        self.assertEqual([r[0] for r in self.gk.requests], ['GET'] * 3)
+
+        self.gk.fail(5)
+        self.assertIsNone(pull.get_all_vnfs())
+        self.assertEqual(len(self.gk.requests), 3 + 4)
+
+    def test_no_retry_post(self):
+        """
+        Tests that POST requests are not retried.
+        """
+        self.gk.fail(1)
+        push = Push(self.gk.url, session=PlatformSession(backoff=0))
+        response = push.__post_cat_object__(Push.CAT_URI_VNF, '{}')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual([r[0] for r in self.gk.requests], ['POST'])
+
+    def test_timeout(self):
+        """
+        Tests the default timeout of the requests.
+        """
+        self.gk.latency = 0.5
+        pull = Pull(self.gk.url,
+                    session=PlatformSession(timeout=0.1, retries=0))
+        with self.assertRaises(requests.exceptions.Timeout):
+            pull.get_all_vnfs()
+
+    def test_bench_pulls(self):
+        """
+        Tests the benchmark of the connections of bulk pulls.
+        """
+        results = bench_pulls(num_requests=5, num_functions=2)
+        self.assertEqual(results['connection_per_request']['connections'], 5)
+        self.assertEqual(results['pooled']['connections'], 1)
+        self.assertEqual(results['pooled']['count'], 5)
@@ -0,0 +1,268 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE, i2CAT,
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE, i2CAT,
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+
+import io
+import os
+import json
+import uuid
+import shutil
+import hashlib
+import tempfile
+import tracemalloc
+import unittest
+from son.access.pull import Pull
+from son.access.push import Push
+from son.access.session import PlatformSession
+from son.access.transfer import TransferProgress, format_size, download, \
+    DownloadError, PART_SUFFIX
+from son.access.benchmark import write_synthetic_package
+from son.access.tests.gatekeeper_standin import StandInGatekeeper
+
+
+class UnitUploadTests(unittest.TestCase):
+
+    def setUp(self):
+        self.gk = StandInGatekeeper()
+        self.addCleanup(self.gk.close)
+        self.push = Push(self.gk.url, session=PlatformSession())
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def test_upload_package(self):
+        """
+        Tests the multipart body of a package upload, sent in chunks.
+        """
+        package = os.path.join(self.root, 'sonata-demo.son')
+        write_synthetic_package(package, 10000)
+        with open(package, 'rb') as _f:
+            content = _f.read()
+
+        progress = []
+        result = self.push.upload_package(
+            'token', package, chunk_size=1024,
+            progress=lambda done, total: progress.append((done, total)))
+        self.assertTrue(result.startswith("Upload succeeded (201)"))
+
+        method, path, length = self.gk.requests[-1]
+        self.assertEqual((method, path), ('POST', '/api/v2/packages'))
+        body = self.gk.bodies[-1]
+        self.assertEqual(len(body), length)
+        self.assertIn(b'name="package"; filename="sonata-demo.son"', body)
+        self.assertIn(content, body)
+
+        # progress is reported after each chunk
+        self.assertEqual(progress[-1], (length, length))
+        self.assertEqual(len(progress), (length + 1023) // 1024)
+        self.assertEqual(progress[0], (1024, length))
+
+    def test_upload_memory(self):
+        """
+        Tests that the memory used by an upload doesn't depend on the size
+        of the package.
+        """
+        size = 32 * 1024 * 1024
+        package = os.path.join(self.root, 'large.son')
+        write_synthetic_package(package, size)
+
+        tracemalloc.start()
+        try:
+            result = self.push.upload_package(None, package,
+                                              chunk_size=256 * 1024)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        self.assertTrue(result.startswith("Upload succeeded"))
+        self.assertGreater(self.gk.requests[-1][2], size)
+        self.assertLess(peak, size // 8)
+
+    def test_upload_missing(self):
+        """
+        Tests the upload of a missing package.
+        """
+        package = os.path.join(self.root, 'missing.son')
+        self.assertEqual(self.push.upload_package(None, package),
+                         (package, "is not a file."))
+        self.assertEqual(self.gk.requests, [])
+
+
+class UnitDownloadTests(unittest.TestCase):
+
+    def setUp(self):
+        self.gk = StandInGatekeeper()
+        self.addCleanup(self.gk.close)
+        self.session = PlatformSession()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+        self.content = os.urandom(200000)
+        self.md5 = hashlib.md5(self.content).hexdigest()
+        self.uuid = str(uuid.uuid4())
+        self.package_path = '/api/v2/packages/' + self.uuid + '/download'
+        self.url = self.gk.url + self.package_path
+        self.path = os.path.join(self.root, self.uuid + '.son')
+
+    def _downloaded(self):
+        with open(self.path, 'rb') as _f:
+            return _f.read()
+
+    def test_get_son_package(self):
+        """
+        Tests the download of a package to a file, verified against the
+        digest reported by the catalogue.
+        """
+        self.gk.add(self.package_path, self.content, ranges=True)
+        self.gk.add('/api/v2/packages/' + self.uuid,
+                    json.dumps({'uuid': self.uuid, 'md5': self.md5}))
+        pull = Pull(self.gk.url, session=self.session)
+
+        progress = []
+        self.assertEqual(pull.get_son_package_by_uuid(
+            self.uuid, path=self.path, chunk_size=65536,
+            progress=lambda done, total: progress.append((done, total))),
+            self.path)
+        self.assertEqual(self._downloaded(), self.content)
+        self.assertFalse(os.path.exists(self.path + PART_SUFFIX))
+        self.assertEqual(progress[-1], (200000, 200000))
+        self.assertEqual(len(progress), 4)
+
+        # in memory
+        self.assertEqual(pull.get_son_package_by_uuid(self.uuid),
+                         self.content)
+
+    def test_get_son_package_corrupted(self):
+        """
+        Tests that a package not matching the digest reported by the
+        catalogue is discarded.
+        """
+        self.gk.add(self.package_path, self.content, ranges=True)
+        self.gk.add('/api/v2/packages/' + self.uuid,
+                    json.dumps({'md5': hashlib.md5(b'other').hexdigest()}))
+        pull = Pull(self.gk.url, session=self.session)
+
+        self.assertIsNone(pull.get_son_package_by_uuid(self.uuid,
+                                                       path=self.path))
+        self.assertEqual(os.listdir(self.root), [])
+
+    def test_resume(self):
+        """
+        Tests that interrupted downloads are resumed with range requests.
+        """
+        self.gk.add(self.package_path, self.content, ranges=True,
+                    content_md5=True)
+        self.gk.interrupt(50000, 70000)
+
+        self.assertEqual(download(self.session, self.url, self.path,
+                                  chunk_size=10000, backoff=0), self.md5)
+        self.assertEqual(self._downloaded(), self.content)
+        self.assertEqual(self.gk.ranges,
+                         [None, 'bytes=50000-', 'bytes=120000-'])
+
+    def test_resume_later(self):
+        """
+        Tests that a download interrupted in a previous run is resumed.
+        """
+        self.gk.add(self.package_path, self.content, ranges=True)
+        self.gk.interrupt(50000)
+        with self.assertRaises(DownloadError):
+            download(self.session, self.url, self.path, chunk_size=10000,
+                     retries=0)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(os.path.getsize(self.path + PART_SUFFIX), 50000)
+
+        download(self.session, self.url, self.path, digest=self.md5)
+        self.assertEqual(self._downloaded(), self.content)
+        self.assertEqual(self.gk.ranges, [None, 'bytes=50000-'])
+
+    def test_restart(self):
+        """
+        Tests that interrupted downloads are restarted when the server
+        doesn't support ranges.
+        """
+        self.gk.add(self.package_path, self.content, content_md5=True)
+        self.gk.interrupt(50000)
+
+        download(self.session, self.url, self.path, chunk_size=10000,
+                 backoff=0)
+        self.assertEqual(self._downloaded(), self.content)
+        self.assertEqual(self.gk.ranges, [None, 'bytes=50000-'])
+
+    def test_complete_part(self):
+        """
+        Tests a download of which the temporary file is complete, or
+        doesn't match the file anymore.
+        """
+        self.gk.add(self.package_path, self.content, ranges=True)
+        with open(self.path + PART_SUFFIX, 'wb') as _f:
+            _f.write(self.content)
+        download(self.session, self.url, self.path, digest=self.md5)
+        self.assertEqual(self._downloaded(), self.content)
+
+        os.remove(self.path)
+        with open(self.path + PART_SUFFIX, 'wb') as _f:
+            _f.write(self.content + b'changed')
+        download(self.session, self.url, self.path, digest=self.md5)
+        self.assertEqual(self._downloaded(), self.content)
+        self.assertEqual(self.gk.ranges[-2:], ['bytes=200007-', None])
+
+    def test_not_found(self):
+        """
+        Tests the download of a missing file.
+        """
+        with self.assertRaises(DownloadError):
+            download(self.session, self.url, self.path)
+        self.assertEqual(os.listdir(self.root), [])
+
+
+class UnitTransferProgressTests(unittest.TestCase):
+
+    def test_report(self):
+        """
+        Tests the reports of the progress of a transfer.
+        """
+        stream = io.StringIO()
+        progress = TransferProgress('sonata-demo.son', stream=stream,
+                                    interval=0)
+        progress(0, 4096)
+        progress(2048, 4096)
+        self.assertEqual(progress.done, 2048)
+        self.assertGreater(progress.throughput, 0)
+        self.assertIsNotNone(progress.eta)
+        progress(4096, 4096)
+
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[1].startswith(
+            'sonata-demo.son: 2.0 KB of 4.0 KB (50%), '))
+        self.assertIn('ETA', lines[1])
+        self.assertIn('(100%)', lines[2])
+        self.assertNotIn('ETA', lines[2])
+
+    def test_format_size(self):
+        self.assertEqual(format_size(512), '512 B')
+        self.assertEqual(format_size(1536), '1.5 KB')
+        self.assertEqual(format_size(3 * 1024 ** 3), '3.0 GB')
@@ -0,0 +1,334 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE, i2CAT,
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE, i2CAT,
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+
+"""
+Transfers of packages between the SDK and a service platform. Packages
+are streamed in chunks, so that the memory used doesn't depend on their
+size, and the progress of a transfer can be reported. Interrupted
+downloads are resumed.
+"""
+
+import os
+import re
+import sys
+import time
+import base64
+import logging
+import binascii
+import requests
+from requests_toolbelt import MultipartEncoder
+from son import trace
+from son.package.md5 import generate_hash
+from son.access.config.config import HTTP_CHUNK_SIZE, HTTP_RETRIES, \
+    HTTP_BACKOFF_FACTOR
+
+log = logging.getLogger(__name__)
+
+# suffix of the temporary file of a download, kept to resume it when
+# interrupted
+PART_SUFFIX = '.part'
+
+
+class DownloadError(Exception):
+    pass
+
+
+def format_size(size):
+    """
+    Provides a human readable size.
+    :param size: size in bytes
+    """
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(size) < 1024 or unit == 'GB':
+            break
+        size /= 1024.0
+    return '{0:.1f} {1}'.format(size, unit) if unit != 'B' \
+        else '{0} B'.format(int(size))
+
+
+class TransferProgress(object):
+
+    def __init__(self, name, stream=None, interval=0.5):
+        """
+        Reports the progress of a transfer: completion, throughput and
+        estimated time of arrival. It is called with the transferred and
+        total bytes as the transfer progresses.
+        :param name: name of the transferred object
+        :param stream: output of the reports. On a terminal, the report is
+                       updated in place. Default: standard error
+        :param interval: minimum time between reports, in seconds
+        """
+        self.name = name
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.done = 0
+        self.total = None
+        self._start = None
+        self._reported = None
+        self._tty = hasattr(self.stream, 'isatty') and self.stream.isatty()
+
+    @property
+    def elapsed(self):
+        return time.time() - self._start if self._start else 0.0
+
+    @property
+    def throughput(self):
+        """
+        Average throughput of the transfer, in bytes per second.
+        """
+        elapsed = self.elapsed
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta(self):
+        """
+        Estimated remaining time of the transfer, in seconds. None if
+        unknown.
+        """
+        throughput = self.throughput
+        if not self.total or not throughput:
+            return None
+        return max(self.total - self.done, 0) / throughput
+
+    def __call__(self, done, total=None):
+        now = time.time()
+        if self._start is None:
+            self._start = now
+        self.done = done
+        self.total = total
+        if self.total and done >= self.total:
+            self.finish()
+        elif self._reported is None or now - self._reported >= self.interval:
+            self._reported = now
+            self._report()
+
+    def _report(self, end='\r'):
+        line = '{0}: {1}'.format(self.name, format_size(self.done))
+        if self.total:
+            line += ' of {0} ({1:.0%})'.format(format_size(self.total),
+                                                self.done / self.total)
+        line += ', {0}/s'.format(format_size(self.throughput))
+        if self.eta is not None and self.done < self.total:
+            line += ', ETA {0:.0f}s'.format(self.eta)
+        if not self._tty:
+            end = '\n'
+        self.stream.write(line + end)
+        self.stream.flush()
+
+    def finish(self):
+        """
+        Report the end of the transfer.
+        """
+        if self._start is None:
+            return
+        self._report(end='\n')
+        log.debug("Transferred {0}: {1} in {2:.2f}s"
+                  .format(self.name, format_size(self.done), self.elapsed))
+        self._start = None
+
+
+class UploadStream(object):
+
+    def __init__(self, fields, chunk_size=HTTP_CHUNK_SIZE, progress=None):
+        """
+        Multipart body of a request, encoded while it is sent, in chunks
+        of a bounded size. Files of the fields are read as needed.
+        :param fields: fields of the form, as for
+                       requests_toolbelt.MultipartEncoder: name to value or
+                       to (filename, file) tuple
+        :param chunk_size: size of the chunks sent at once, in bytes
+        :param progress: callable, called with the sent and total bytes
+                         after each chunk, e.g. a TransferProgress
+        """
+        self._encoder = MultipartEncoder(fields=fields)
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.bytes_read = 0
+
+    @property
+    def content_type(self):
+        return self._encoder.content_type
+
+    @property
+    def len(self):
+        return self._encoder.len
+
+    def __len__(self):
+        return self._encoder.len
+
+    def read(self, size=-1):
+        # the size requested by the HTTP client is ignored: it sends the
+        # chunks as they are provided
+        data = self._encoder.read(self.chunk_size)
+        self.bytes_read += len(data)
+        if self.progress and data:
+            self.progress(self.bytes_read, self.len)
+        return data
+
+
+def _content_range(response):
+    match = re.match(r'bytes (\d+)-\d+/(\d+)$',
+                     response.headers.get('Content-Range', ''))
+    if not match:
+        return None, None
+    return int(match.group(1)), int(match.group(2))
+
+
+def _content_md5(response):
+    value = response.headers.get('Content-MD5')
+    if not value:
+        return None
+    try:
+        return binascii.hexlify(base64.b64decode(value)).decode('ascii')
+    except (binascii.Error, ValueError):
+        log.warning("Invalid Content-MD5 header: '{0}'".format(value))
+        return None
+
+
+def _fetch(session, url, part, headers, chunk_size, progress):
+    """
+    Request a file, or its remaining part if already partially downloaded,
+    and append it to the temporary file.
+    :return: size of the file (None if unknown) and the digest reported
+             in the response (None if not reported)
+    """
+    offset = os.path.getsize(part) if os.path.isfile(part) else 0
+    request_headers = dict(headers)
+    if offset:
+        request_headers['Range'] = 'bytes={0}-'.format(offset)
+
+    with session.get(url, headers=request_headers, stream=True) as response:
+        start, total = _content_range(response)
+        if response.status_code == 206 and start == offset:
+            log.info("Resuming download of '{0}' at {1}"
+                     .format(url, format_size(offset)))
+            mode = 'ab'
+        elif response.status_code == 416 and offset:
+            size = response.headers.get('Content-Range', '').split('/')[-1]
+            mode = None
+        elif response.status_code == 200:
+            if offset:
+                log.info("Resuming downloads of '{0}' isn't supported, "
+                         "restarting it".format(url))
+            offset = 0
+            mode = 'wb'
+            total = response.headers.get('Content-Length')
+            total = int(total) if total and 'Content-Encoding' not in \
+                response.headers else None
+        else:
+            raise DownloadError("Download of '{0}' failed. HTTP code: {1}"
+                                .format(url, response.status_code))
+
+        # the digest of a partial response is the digest of the part
+        digest = _content_md5(response) if mode == 'wb' else None
+        done = offset
+        if mode:
+            with open(part, mode) as _f:
+                for chunk in response.iter_content(chunk_size):
+                    _f.write(chunk)
+                    done += len(chunk)
+                    if progress:
+                        progress(done, total)
+            trace.count('bytes_downloaded', done - offset)
+
+    if not mode:
+        # range not satisfiable: the file is either already downloaded or
+        # changed since the partial download
+        if size == str(offset):
+            return offset, None
+        log.warning("Partial download of '{0}' doesn't match the file, "
+                    "restarting it".format(url))
+        os.remove(part)
+        return _fetch(session, url, part, headers, chunk_size, progress)
+
+    if total is not None and done < total:
+        raise requests.exceptions.ChunkedEncodingError(
+            "Incomplete download: {0} of {1} bytes".format(done, total))
+    return total, digest
+
+
+def download(session, url, path, headers=None, digest=None,
+             chunk_size=HTTP_CHUNK_SIZE, progress=None, retries=HTTP_RETRIES,
+             backoff=HTTP_BACKOFF_FACTOR):
+    """
+    Download a file, streamed in chunks to a temporary file next to its
+    destination. The temporary file is renamed to the destination once
+    the download is complete and its digest verified. An interrupted
+    download is resumed with range requests, if the server supports them,
+    by the next attempt or by a later download of the same file.
+    :param session: HTTP session, e.g. a PlatformSession
+    :param url: URL of the file
+    :param path: destination of the file
+    :param headers: headers of the requests
+    :param digest: expected MD5 digest (hexadecimal) of the file. By
+                   default, the digest reported by the server in the
+                   Content-MD5 header is verified, if any
+    :param chunk_size: size of the chunks read and written at once, in
+                       bytes. An interrupted download is resumed after its
+                       last complete chunk
+    :param progress: callable, called with the downloaded and total bytes
+                     (None if unknown) after each chunk
+    :param retries: maximum number of attempts to resume an interrupted
+                    download
+    :param backoff: backoff factor of the attempts, in seconds
+    :return: MD5 digest of the downloaded file
+    :raise DownloadError: if the download fails or the file is corrupted
+    """
+    part = path + PART_SUFFIX
+    attempt = 0
+    while True:
+        try:
+            total, reported = _fetch(session, url, part, headers or {},
+                                     chunk_size, progress)
+            break
+        except requests.exceptions.RequestException as e:
+            if attempt >= retries:
+                raise DownloadError("Download of '{0}' failed: {1}"
+                                    .format(url, e))
+            delay = backoff * 2 ** attempt
+            attempt += 1
+            log.warning("Download of '{0}' interrupted, resuming in "
+                        "{1:.1f}s: {2}".format(url, delay, e))
+            time.sleep(delay)
+
+    size = os.path.getsize(part)
+    if total is not None and size != total:
+        os.remove(part)
+        raise DownloadError("Downloaded {0} bytes of '{1}', expected {2}"
+                            .format(size, url, total))
+
+    expected = digest or reported
+    actual = generate_hash(part, chunk_size)
+    if expected and actual != expected.lower():
+        os.remove(part)
+        raise DownloadError("Digest of '{0}' is {1}, expected {2}"
+                            .format(url, actual, expected))
+    if not expected:
+        log.warning("No digest of '{0}' to verify it".format(url))
+
+    os.replace(part, path)
+    return actual
@@ -45,9 +45,6 @@ or
 
 import argparse
 
-from son.monitor.son_emu import Emu
-from son.monitor.son_sp import Service_Platform
-
 import pprint
 pp = pprint.PrettyPrinter(indent=2)
 
@@ -56,12 +53,13 @@ logging.basicConfig(level=logging.INFO)
 LOG = logging.getLogger('son_monitor')
 LOG.setLevel(level=logging.INFO)
 
-import docker
+# the emulator and service platform clients import docker, paramiko and
+# the prometheus libraries: they are imported by the commands using them
 from subprocess import Popen
 import os
-import pkg_resources
 from shutil import copy, rmtree
 from time import sleep
+from son import trace
 
 ## parameters for the emulator VIM
 # TODO: these settings come from the deployed topology in the emulator, read from centralized config file?
@@ -130,6 +128,10 @@ class sonmonitor():
 
     # start the sdk monitoring framework (cAdvisor, Prometheus, Pushgateway, ...)
     def start_containers(self):
+        import docker
+        import pkg_resources
+        from son.monitor.son_emu import Emu
+
         # docker-compose up -d
         cmd = [
             'docker-compose',
@@ -217,6 +219,8 @@ class sonmonitor():
 
     # start a monitoring action on the Service Platform
     def SP_command(self, args):
+        from son.monitor.son_sp import Service_Platform
+
         command = args.command
 
         SP_class = Service_Platform(export_port=PROMETHEUS_STREAM_PORT, GK_api=GK_API,
@@ -236,6 +240,8 @@ class sonmonitor():
 
     # start a monitoring action on the Emulator
     def EMU_command(self, args):
+        from son.monitor.son_emu import Emu
+
         command = args.command
         EMU_class = Emu(SON_EMU_API, ip=SON_EMU_IP, vm=SON_EMU_IN_VM, user=SON_EMU_USER, password=SON_EMU_PASSW)
         # call the EMU class method with the same name as the command arg
@@ -274,6 +280,7 @@ parser.add_argument(
     "--verbose", "-v", dest="verbose",
     action='store_true',
     help="print extra logging")
+trace.add_argument(parser)
 # positional  arguments
 subparsers = parser.add_subparsers(title="son-monitor subcommands",
 description="""init : start/stop the monitoring framework
@@ -513,6 +520,7 @@ flow.set_defaults(func=monitor.EMU_command, command='flow_total')
 def main():
 
     args = parser.parse_args()
+    trace.configure(args, 'son-monitor')
     print(args.func(args))
 
 if __name__ == "__main__":
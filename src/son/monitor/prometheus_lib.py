@@ -34,8 +34,6 @@ import pkg_resources
 import os
 from son.profile.helper import read_yaml
 
-from scipy.stats import t
-import numpy as np
 from math import isnan
 
 # set this to localhost for now
@@ -75,6 +73,10 @@ class Metric(object):
 
         # update CI
         if self.len > 5 :
+            # scipy is slow to import, only needed for confidence intervals
+            from scipy.stats import t
+            import numpy as np
+
             mu = self.average
             sigma = np.std(self.list_values)
             N = self.len
@@ -25,14 +25,24 @@
 # partner consortium (www.sonata-nfv.eu).
 
 import logging
+import functools
 import time
+from son import trace
 
 
 def performance(method):
+    """
+    Decorator measuring each call of a method: its duration is logged and
+    the call is traced as a span, see son.trace.
+    """
+    category = method.__module__.rsplit('.', 1)[0]
+
+    @functools.wraps(method)
     def measure(*args, **kwargs):
         log = logging.getLogger(method.__module__)
         start = time.time()
-        result = method(*args, **kwargs)
+        with trace.span(method.__qualname__, category):
+            result = method(*args, **kwargs)
         log.info('{0} executed in {1:.3f} sec'
                  .format(method.__name__, time.time() - start))
         return result
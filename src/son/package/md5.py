@@ -26,6 +26,7 @@
 
 import hashlib
 import os
+from son import trace
 
 
 def generate_hash(f, cs=128):
@@ -39,6 +40,8 @@ def __generate_hash__(f, cs=128):
     with open(f, "rb") as file:
         for chunk in iter(lambda: file.read(cs), b''):
             hash.update(chunk)
+        trace.count('files_hashed')
+        trace.count('bytes_hashed', file.tell())
     return hash.hexdigest()
 
 
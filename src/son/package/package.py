@@ -31,23 +31,54 @@ import shutil
 import sys
 import zipfile
 import coloredlogs
-import requests
-import validators
+import importlib
 import yaml
 import time
 import atexit
 from contextlib import closing
-from son.validate.validate import Validator
+from son import trace
 from son.package.decorators import performance
 from son.package.md5 import generate_hash
 from son.workspace.project import Project
 from son.workspace.workspace import Workspace
-from son.schema.validator import SchemaValidator
-from son.access.access import AccessClient
 
 log = logging.getLogger(__name__)
 
 
+class _LazyImport(object):
+
+    def __init__(self, module, name):
+        """
+        Placeholder of a class imported on first use, as its module is slow
+        to import and not needed by every command (e.g. the usage).
+        :param module: name of the module of the class
+        :param name: name of the class
+        """
+        self._module = module
+        self._name = name
+        self._obj = None
+
+    def _resolve(self):
+        if self._obj is None:
+            self._obj = getattr(importlib.import_module(self._module),
+                                self._name)
+        return self._obj
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __getattr__(self, attr):
+        # introspection (e.g. by mock) doesn't trigger the import
+        if attr.startswith('_'):
+            raise AttributeError(attr)
+        return getattr(self._resolve(), attr)
+
+
+Validator = _LazyImport('son.validate.validate', 'Validator')
+SchemaValidator = _LazyImport('son.schema.validator', 'SchemaValidator')
+AccessClient = _LazyImport('son.access.access', 'AccessClient')
+
+
 class Packager(object):
 
     def __init__(self, workspace, project=None, services=None, functions=None,
@@ -62,17 +93,14 @@ class Packager(object):
         self._services = services
         self._functions = functions
 
-        # Create a son-access client
-        self._access = AccessClient(self._workspace,
-                                    log_level=self._workspace.log_level)
+        # son-access client and schema validator, created on first use
+        self._access_client = None
+        self._schema_validator_obj = None
 
         # Create a validator
         self._validator = Validator(workspace=workspace)
         self._validator.configure(syntax=True, integrity=False, topology=False)
 
-        # Create a schema validator
-        self._schema_validator = SchemaValidator(workspace)
-
         # Keep track of VNF packaging referenced in NS
         self._ns_vnf_registry = {}
 
@@ -125,6 +153,20 @@ class Packager(object):
     def package_descriptor(self):
         return self._package_descriptor
 
+    @property
+    def _access(self):
+        if self._access_client is None:
+            self._access_client = AccessClient(
+                self._workspace, log_level=self._workspace.log_level)
+        return self._access_client
+
+    @property
+    def _schema_validator(self):
+        if self._schema_validator_obj is None:
+            self._schema_validator_obj = SchemaValidator(self._workspace)
+        return self._schema_validator_obj
+
+    @performance
     def build_package(self):
         """
         Create and set the full package descriptor as a dictionary.
@@ -331,6 +373,7 @@ class Packager(object):
             nsd_filename = nsd_list[0]
             with open(os.path.join(base_path, nsd_filename), 'r') as _file:
                 nsd = yaml.load(_file)
+            trace.count('files_parsed')
 
         # Validate NSD
         log.debug("Validating Service Descriptor NSD='{}'"
@@ -606,6 +649,7 @@ class Packager(object):
         else:
             with open(os.path.join(base_path, vnfd_list[0]), 'r') as _file:
                 vnfd = yaml.load(_file)
+            trace.count('files_parsed')
 
         vnfd_path = os.path.join(os.path.basename(base_path), vnfd_list[0])
 
@@ -643,6 +687,9 @@ class Packager(object):
         pce.append(pce_fd)
 
         if 'virtual_deployment_units' in vnfd:
+            import requests
+            import validators
+
             vdu_list = [vdu for vdu in vnfd['virtual_deployment_units']
                         if vdu['vm_image']]
 
@@ -717,6 +764,7 @@ class Packager(object):
         """
         with open(src_descriptor, "r") as vnfd_file:
             vnf_content = yaml.load(vnfd_file)
+        trace.count('files_parsed')
 
         with open(dst_descriptor, "w") as vnfd_file:
             vnfd_file.write(yaml.dump(vnf_content, default_flow_style=False))
@@ -770,6 +818,7 @@ class Packager(object):
 
                     if not full_path == zip_name:
                         pck.write(full_path, relative_path)
+                        trace.count('files_zipped')
 
         # Validate PD
         log.debug("Validating Package")
@@ -976,7 +1025,10 @@ def main():
         help="create the package with the specific name",
         required=False)
 
+    trace.add_argument(parser)
+
     args = parser.parse_args()
+    trace.configure(args, 'son-package')
 
     if args.workspace:
         ws_root = args.workspace
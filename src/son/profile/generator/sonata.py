@@ -31,6 +31,7 @@ import copy
 import time
 from termcolor import colored
 from tabulate import tabulate
+from son import trace
 from son.profile.helper import read_yaml, write_yaml, relative_path, ensure_dir
 from son.profile.generator import ServiceConfigurationGenerator
 from son.workspace.project import Project
@@ -273,6 +274,7 @@ class SonataServiceConfigurationGenerator(ServiceConfigurationGenerator):
                 ))
         LOG.debug("Applied resource limitations to service '{}'".format(service))
 
+    @trace.traced(category='son.profile')
     def _generate_function_experiments(self, base_service_obj, experiments):
         """
         Generate function experiments according to given experiment descriptions.
@@ -301,6 +303,7 @@ class SonataServiceConfigurationGenerator(ServiceConfigurationGenerator):
                         e.name, ns, ec.run_id))
         return r
 
+    @trace.traced(category='son.profile')
     def _generate_service_experiments(self, base_service_obj, experiments):
         """
         Generate service experiments according to given experiment descriptions.
@@ -324,6 +327,7 @@ class SonataServiceConfigurationGenerator(ServiceConfigurationGenerator):
                         e.name, ns, ec.run_id))
         return r
 
+    @trace.traced(category='son.profile')
     def _pack(self, output_path, service_objs, workspace_dir=Workspace.DEFAULT_WORKSPACE_DIR):
         """
         return: dict<run_id: package_path>
@@ -506,6 +510,7 @@ class SonataService(object):
         LOG.debug("Wrote: {} to {}".format(self, path))
         return path
     
+    @trace.traced(category='son.profile')
     def pack(self, output_path, verbose=False, workspace_dir=Workspace.DEFAULT_WORKSPACE_DIR):
         """
         Creates a *.son file of this service object.
@@ -32,10 +32,9 @@ import coloredlogs
 import time
 from termcolor import colored
 from tabulate import tabulate
+from son import trace
 from son.profile.experiment import ServiceExperiment, FunctionExperiment
 from son.profile.helper import read_yaml
-from son.monitor.profiler import Emu_Profiler as Passive_Emu_Profiler
-from son.profile.emulator import Emulator as Active_Emu_Profiler
 
 LOG = logging.getLogger(__name__)
 
@@ -66,17 +65,23 @@ class ProfileManager(object):
         :return:
         """
         # try to load PED file
-        self.ped = self._load_ped_file(self.args.ped)
-        self._validate_ped_file(self.ped)
-        # load and populate experiment specifications
-        self.service_experiments, self.function_experiments = self._generate_experiment_specifications(self.ped)
-
-        if self.args.mode=="passive":
-            self._passive_execution()
-        elif self.args.mode=="active":
-            self._active_execution()
+        with trace.span('load_ped', 'son.profile', ped=self.args.ped):
+            self.ped = self._load_ped_file(self.args.ped)
+            self._validate_ped_file(self.ped)
+            # load and populate experiment specifications
+            self.service_experiments, self.function_experiments = self._generate_experiment_specifications(self.ped)
+
+        with trace.span(self.args.mode + '_execution', 'son.profile'):
+            if self.args.mode=="passive":
+                self._passive_execution()
+            elif self.args.mode=="active":
+                self._active_execution()
 
     def _passive_execution(self):
+        # the profiler imports the monitoring, plotting and statistics
+        # libraries: only imported when used
+        from son.monitor.profiler import Emu_Profiler as Passive_Emu_Profiler
+
         # execute profiling run on pre-deployed service
         # only service experiments are executed
         for experiment in self.service_experiments:
@@ -89,7 +94,9 @@ class ProfileManager(object):
                                         no_display=self.args.no_display,
                                         graph_only=self.args.graph_only,
                                         results_file=self.args.results_file )
-            profiler.start_experiment()
+            with trace.span('service_experiment', 'son.profile',
+                            experiment=experiment.name):
+                profiler.start_experiment()
 
     def _active_execution(self):
         # generate service configuration using the specified generator module
@@ -109,14 +116,15 @@ class ProfileManager(object):
                 exit(1)
             # generate one service configuration for each experiment based
             # on the service referenced in the PED file.
-            gen_conf_list = cgen.generate(
-                os.path.join(  # ensure that the reference is an absolute path
-                    os.path.dirname(
-                        self.ped.get("ped_path", "/")),
-                        self.ped.get("service_package")),
-                self.function_experiments,
-                self.service_experiments,
-                self.work_dir)
+            with trace.span('generate', 'son.profile'):
+                gen_conf_list = cgen.generate(
+                    os.path.join(  # ensure that the reference is an absolute path
+                        os.path.dirname(
+                            self.ped.get("ped_path", "/")),
+                            self.ped.get("service_package")),
+                    self.function_experiments,
+                    self.service_experiments,
+                    self.work_dir)
             LOG.debug("Generation result: {}".format(gen_conf_list))
             # display generator statistics
             if not self.args.no_display:
@@ -141,8 +149,11 @@ class ProfileManager(object):
             remote_hosts = read_yaml(config_loc).get("target_platforms")
 
             # start the experiment series
+            from son.profile.emulator import Emulator as Active_Emu_Profiler
             profiler = Active_Emu_Profiler(remote_hosts)
-            profiler.do_experiment_series(gen_conf_list)
+            with trace.span('experiment_series', 'son.profile',
+                            experiments=len(gen_conf_list)):
+                profiler.do_experiment_series(gen_conf_list)
 
 
     @staticmethod
@@ -307,6 +318,8 @@ def parse_args(manual_args=None):
         dest="config")
 
 
+    trace.add_argument(parser)
+
     if manual_args is not None:
         return parser.parse_args(manual_args)
     return parser.parse_args()
@@ -318,5 +331,6 @@ def main():
     :return: None
     """
     args = parse_args()
+    trace.configure(args, 'son-profile')
     p = ProfileManager(args)
     p.run()
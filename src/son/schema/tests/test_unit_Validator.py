@@ -24,9 +24,15 @@
 # acknowledge the contributions of their colleagues of the SONATA
 # partner consortium (www.sonata-nfv.eu).
 
+import os
+import shutil
+import tempfile
 import unittest
+import jsonschema
+from jsonschema import SchemaError, ValidationError
 from unittest import mock
-from son.schema.validator import load_local_schema, load_remote_schema
+from son.schema.validator import load_local_schema, load_remote_schema, \
+    clear_schema_cache, compile_schema, validate_schema
 from unittest.mock import patch
 
 
@@ -80,3 +86,42 @@ class UnitLoadSchemaTests(unittest.TestCase):
         m_yaml.load.return_value = sample_dict
         return_dict = load_remote_schema("url")
         self.assertEqual(sample_dict, return_dict)
+
+
+class UnitSchemaCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        clear_schema_cache()
+        self._dir = tempfile.mkdtemp()
+        self._file = os.path.join(self._dir, 'vnfd-schema.yml')
+        with open(self._file, 'w') as _f:
+            _f.write("type: object\nrequired: [name]\n")
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+        clear_schema_cache()
+
+    def test_load_cached_schema(self):
+        schema = load_local_schema(self._file)
+        self.assertIs(load_local_schema(self._file), schema)
+
+        # modified schema files are parsed again
+        with open(self._file, 'w') as _f:
+            _f.write("type: object\nrequired: [name, version]\n")
+        reloaded = load_local_schema(self._file)
+        self.assertIsNot(reloaded, schema)
+        self.assertEqual(reloaded['required'], ['name', 'version'])
+
+    def test_compiled_schema(self):
+        schema = load_local_schema(self._file)
+        self.assertIs(compile_schema(schema), compile_schema(schema))
+
+        validate_schema({'name': 'vnf'}, schema)
+        with self.assertRaises(ValidationError) as ctx:
+            validate_schema({'vendor': 'eu.sonata'}, schema)
+        with self.assertRaises(ValidationError) as expected:
+            jsonschema.validate({'vendor': 'eu.sonata'}, schema)
+        self.assertEqual(ctx.exception.message, expected.exception.message)
+
+        with self.assertRaises(SchemaError):
+            validate_schema({'name': 'vnf'}, {'type': 'unknown'})
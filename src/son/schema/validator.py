@@ -28,16 +28,29 @@ import logging
 import coloredlogs
 import validators
 import os
+import threading
 import yaml
 import jsonschema
 import requests
+from collections import OrderedDict
+from son import trace
 from requests.exceptions import RequestException
 
 from jsonschema import SchemaError
 from jsonschema import ValidationError
+from jsonschema.exceptions import best_match
 
 log = logging.getLogger(__name__)
 
+# parsed local schema files, shared by all validators of the process:
+# {path: ((mtime, size), schema)}
+_schema_cache = dict()
+_schema_lock = threading.Lock()
+
+# compiled (checked) schema validators: {id(schema): (schema, validator)}
+_compiled_cache = OrderedDict()
+_COMPILED_CACHE_SIZE = 16
+
 
 class SchemaValidator(object):
 
@@ -210,7 +223,9 @@ class SchemaValidator(object):
         :return:
         """
         try:
-            jsonschema.validate(descriptor, self.load_schema(schema_id))
+            with trace.span('SchemaValidator.validate', 'son.schema',
+                            schema=schema_id):
+                validate_schema(descriptor, self.load_schema(schema_id))
             return True
 
         except ValidationError as e:
@@ -241,7 +256,7 @@ class SchemaValidator(object):
         # Cycle through templates until a success validation is return
         for schema_id in templates:
             try:
-                jsonschema.validate(descriptor, self.load_schema(schema_id))
+                validate_schema(descriptor, self.load_schema(schema_id))
                 return schema_id
 
             except ValidationError:
@@ -278,6 +293,9 @@ def write_local_schema(schemas_root, filename, schema):
     yaml.dump(schema, schema_f)
     schema_f.close()
 
+    with _schema_lock:
+        _schema_cache.pop(os.path.abspath(filename), None)
+
 
 def load_local_schema(filename):
     """
@@ -292,12 +310,23 @@ def load_local_schema(filename):
         log.warning("Schema file '{}' does not exist.".format(filename))
         raise FileNotFoundError
 
+    # Parsed schemas are shared until the file is modified
+    path = os.path.abspath(filename)
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _schema_lock:
+        if path in _schema_cache and _schema_cache[path][0] == stamp:
+            return _schema_cache[path][1]
+
     # Read schema file and return the schema as a dictionary
+    trace.count('schemas_parsed')
     schema_f = open(filename, 'r')
     schema = yaml.load(schema_f)
     assert isinstance(schema, dict), "Failed to load schema file '{}'. " \
                                      "Not a dictionary.".format(filename)
 
+    with _schema_lock:
+        _schema_cache[path] = (stamp, schema)
     return schema
 
 
@@ -307,9 +336,57 @@ def load_remote_schema(template_url):
     :param template_url: The URL of the required schema
     :return: The loaded schema as a dictionary
     """
+    trace.count('http_calls')
     response = requests.get(template_url)
     response.raise_for_status()
     tf = response.text
     schema = yaml.load(tf)
     assert isinstance(schema, dict)
     return schema
+
+
+def clear_schema_cache():
+    """
+    Forget the parsed and compiled schemas shared by the validators.
+    """
+    with _schema_lock:
+        _schema_cache.clear()
+        _compiled_cache.clear()
+
+
+def compile_schema(schema):
+    """
+    Obtain a validator of a schema. The schema is only checked and
+    compiled once, its validator is shared while it is in use.
+    Schemas must not be modified after being compiled.
+    :param schema: the schema as a dictionary
+    :return: jsonschema validator object
+    """
+    key = id(schema)
+    with _schema_lock:
+        compiled = _compiled_cache.get(key)
+        if compiled and compiled[0] is schema:
+            _compiled_cache.move_to_end(key)
+            return compiled[1]
+
+    cls = jsonschema.validators.validator_for(schema)
+    cls.check_schema(schema)
+    validator = cls(schema)
+
+    with _schema_lock:
+        _compiled_cache[key] = (schema, validator)
+        while len(_compiled_cache) > _COMPILED_CACHE_SIZE:
+            _compiled_cache.popitem(last=False)
+    return validator
+
+
+def validate_schema(descriptor, schema):
+    """
+    Validate a descriptor against a schema, as jsonschema.validate but
+    using the shared compiled validator of the schema.
+    :raises ValidationError: if the descriptor is invalid
+    :raises SchemaError: if the schema is invalid
+    """
+    error = best_match(compile_schema(schema).iter_errors(descriptor))
+    if error is not None:
+        raise error
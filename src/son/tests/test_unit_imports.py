@@ -0,0 +1,128 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+
+import os
+import re
+import sys
+import subprocess
+import unittest
+
+# import time budgets of the console_scripts entry points, in msec, and
+# the (slow) modules that they must not import. The import of the 'son'
+# namespace package (pkg_resources) is shared by all the entry points and
+# isn't part of the budgets. Budgets can be scaled for slow machines with
+# the environment variable SON_IMPORT_BUDGET_SCALE.
+ENTRY_POINTS = {
+    'son-workspace': (150, ['requests', 'networkx', 'jsonschema']),
+    'son-package': (200, ['requests', 'networkx', 'jsonschema', 'Crypto',
+                          'son.validate.validate', 'son.access.access']),
+    'son-monitor': (150, ['docker', 'paramiko', 'scipy', 'numpy',
+                          'matplotlib', 'son.monitor.son_emu',
+                          'son.monitor.son_sp']),
+    'son-profile': (200, ['docker', 'paramiko', 'scipy', 'numpy',
+                          'matplotlib', 'son.monitor.profiler',
+                          'son.profile.emulator']),
+    'son-validate': (100, ['requests', 'networkx', 'jsonschema', 'yaml',
+                           'son.validate.validate']),
+    'son-validate-daemon': (100, ['requests', 'networkx', 'jsonschema',
+                                  'yaml', 'son.validate.validate']),
+    'son-validate-api': (1500, ['redis', 'watchdog', 'Crypto']),
+    'son-access': (150, ['requests', 'jwt', 'Crypto', 'son.access.pull',
+                         'son.access.push']),
+}
+
+# number of measurements of each entry point, the fastest is kept
+RUNS = 3
+
+
+def console_scripts():
+    """
+    Provides the console_scripts entry points of setup.py.
+    :return: dictionary of {script: module}
+    """
+    with open('setup.py', 'r') as _f:
+        setup = _f.read()
+    return dict(re.findall(r"'([\w-]+)=([\w.]+):\w+'", setup))
+
+
+def import_profile(module):
+    """
+    Import a module in a new interpreter, with '-X importtime'.
+    :return: tuple (cumulative import time of the module in msec, without
+             the import of the 'son' namespace package, set of imported
+             modules)
+    """
+    env = dict(os.environ, VAPI_CACHE_TYPE='simple',
+               PYTHONPATH=os.pathsep.join(
+                   [os.path.abspath('src')] +
+                   [p for p in [os.environ.get('PYTHONPATH')] if p]))
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                           'import ' + module],
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          env=env, universal_newlines=True)
+    if proc.returncode != 0:
+        raise ImportError(proc.stderr.strip().splitlines()[-1])
+
+    durations = dict()
+    for line in proc.stderr.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)$',
+                         line)
+        if not match:
+            continue
+        durations[match.group(3)] = int(match.group(1)) / 1000
+    return durations[module] - durations.get('son', 0), set(durations)
+
+
+class UnitImportTimeTests(unittest.TestCase):
+
+    def test_entry_points_budgets(self):
+        scripts = console_scripts()
+        self.assertEqual(sorted(scripts), sorted(ENTRY_POINTS),
+                         "Every entry point requires an import budget")
+
+        scale = float(os.environ.get('SON_IMPORT_BUDGET_SCALE', 1))
+        for script, module in sorted(scripts.items()):
+            budget, forbidden = ENTRY_POINTS[script]
+            with self.subTest(script=script):
+                try:
+                    durations = []
+                    for _ in range(RUNS):
+                        duration, modules = import_profile(module)
+                        durations.append(duration)
+                except ImportError as e:
+                    self.skipTest("'{0}' can't be imported: {1}"
+                                  .format(module, e))
+
+                imported = [name for name in forbidden if
+                            any(m == name or m.startswith(name + '.')
+                                for m in modules)]
+                self.assertEqual(imported, [],
+                                 "'{0}' imports slow modules not needed "
+                                 "by every command".format(script))
+                self.assertLess(min(durations), budget * scale,
+                                "'{0}' exceeds its import budget"
+                                .format(script))
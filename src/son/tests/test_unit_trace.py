@@ -0,0 +1,196 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+
+import os
+import json
+import logging
+import argparse
+import tempfile
+import threading
+import unittest
+from son import trace
+from son.package.decorators import performance
+
+
+class UnitTracerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tracer = trace.Tracer()
+        self.tracer.enable()
+
+    def test_nested_spans(self):
+        """
+        Tests that spans are nested and that their counters are
+        accumulated in their parents.
+        """
+        with self.tracer.span('outer', 'test', target='a') as outer:
+            self.tracer.count('files_parsed')
+            with self.tracer.span('inner', 'test') as inner:
+                self.tracer.count('files_parsed', 2)
+                self.tracer.count('bytes_hashed', 1024)
+                self.assertIs(self.tracer.current(), inner)
+            outer.set(result=True)
+
+        self.assertIsNone(self.tracer.current())
+        self.assertEqual([s.name for s in self.tracer.spans],
+                         ['inner', 'outer'])
+        self.assertIs(inner.parent, outer)
+        self.assertEqual(inner.counters,
+                         {'files_parsed': 2, 'bytes_hashed': 1024})
+        self.assertEqual(outer.counters,
+                         {'files_parsed': 3, 'bytes_hashed': 1024})
+        self.assertEqual(outer.attrs, {'target': 'a', 'result': True})
+        self.assertEqual(self.tracer.totals,
+                         {'files_parsed': 3, 'bytes_hashed': 1024})
+        self.assertLessEqual(outer.start, inner.start)
+        self.assertGreaterEqual(outer.end, inner.end)
+
+    def test_span_error(self):
+        """
+        Tests that a span ended by an exception records it.
+        """
+        with self.assertRaises(ValueError):
+            with self.tracer.span('failing'):
+                raise ValueError()
+        self.assertEqual(self.tracer.spans[0].attrs, {'error': 'ValueError'})
+        self.assertIsNone(self.tracer.current())
+
+    def test_disabled(self):
+        """
+        Tests that spans and counters of a disabled tracer are no-ops.
+        """
+        self.tracer.disable()
+        with self.tracer.span('ignored') as span:
+            span.set(result=False)
+            self.tracer.count('http_calls')
+        self.assertEqual(self.tracer.spans, [])
+        self.assertEqual(self.tracer.totals, {})
+
+    def test_threads(self):
+        """
+        Tests that spans are nested per thread.
+        """
+        def run():
+            with self.tracer.span('thread'):
+                pass
+
+        with self.tracer.span('main'):
+            thread = threading.Thread(target=run)
+            thread.start()
+            thread.join()
+
+        spans = {s.name: s for s in self.tracer.spans}
+        self.assertIsNone(spans['thread'].parent)
+        self.assertNotEqual(spans['thread'].tid, spans['main'].tid)
+
+    def test_chrome_format(self):
+        """
+        Tests the export in the Chrome trace event format.
+        """
+        with self.tracer.span('outer', 'test', target='a'):
+            with self.tracer.span('inner', 'test'):
+                self.tracer.count('http_calls')
+
+        _fd, path = tempfile.mkstemp(suffix='.json')
+        os.close(_fd)
+        self.addCleanup(os.remove, path)
+        self.tracer.export(path)
+        with open(path) as _f:
+            data = json.load(_f)
+
+        events = data['traceEvents']
+        self.assertEqual([e['name'] for e in events], ['outer', 'inner'])
+        for event in events:
+            self.assertEqual(event['ph'], 'X')
+            self.assertEqual(event['cat'], 'test')
+            self.assertEqual(event['pid'], os.getpid())
+            self.assertGreaterEqual(event['dur'], 0)
+        self.assertEqual(events[0]['args'], {'target': 'a', 'http_calls': 1})
+        self.assertLessEqual(events[0]['ts'], events[1]['ts'])
+        self.assertEqual(data['otherData']['counters'], {'http_calls': 1})
+
+    def test_memory(self):
+        """
+        Tests the measurement of the memory allocated within spans.
+        """
+        self.tracer.enable(memory=True)
+        with self.tracer.span('allocate'):
+            data = [bytearray(1024) for _ in range(100)]
+        self.tracer.disable()
+
+        event = self.tracer.to_chrome()['traceEvents'][0]
+        self.assertGreaterEqual(event['args']['memory_bytes'], 100 * 1024)
+        self.assertTrue(self.tracer.to_chrome()['otherData']['memory_top'])
+        del data
+
+
+class UnitTraceToolTests(unittest.TestCase):
+
+    def setUp(self):
+        trace.tracer.clear()
+        trace.tracer.enable()
+        self.addCleanup(trace.tracer.disable)
+        self.addCleanup(trace.tracer.clear)
+
+    def test_traced(self):
+        """
+        Tests the decorators tracing functions.
+        """
+        @trace.traced(category='test')
+        def traced_function():
+            trace.count('files_parsed')
+            return 1
+
+        @performance
+        def measured_function():
+            return traced_function() + 1
+
+        logging.getLogger(__name__).setLevel(logging.WARNING)
+        self.assertEqual(measured_function(), 2)
+
+        spans = trace.tracer.spans
+        self.assertEqual(len(spans), 2)
+        self.assertTrue(spans[0].name.endswith('traced_function'))
+        self.assertEqual(spans[0].category, 'test')
+        self.assertTrue(spans[1].name.endswith('measured_function'))
+        self.assertIs(spans[0].parent, spans[1])
+        self.assertEqual(spans[1].counters, {'files_parsed': 1})
+
+    def test_arguments(self):
+        """
+        Tests that the tracing is only enabled by its CLI option.
+        """
+        trace.tracer.disable()
+        parser = argparse.ArgumentParser()
+        trace.add_argument(parser)
+
+        trace.configure(parser.parse_args([]), 'son-test')
+        self.assertFalse(trace.tracer.enabled)
+
+        args = parser.parse_args(['--trace', 'out.json', '--trace-memory'])
+        self.assertEqual(args.trace, 'out.json')
+        self.assertTrue(args.trace_memory)
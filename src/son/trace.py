@@ -0,0 +1,388 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+
+"""
+Lightweight tracing of the SDK tools. Spans measure nested operations,
+e.g. packaging -> validation -> schema validation, with attributes and
+counters (bytes hashed, files parsed, HTTP calls, ...). Tracing is
+disabled by default and, when disabled, spans and counters are no-ops.
+Traces are exported in the Chrome trace event format, to be loaded in
+chrome://tracing or Perfetto.
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import logging
+import functools
+import threading
+
+log = logging.getLogger(__name__)
+
+# number of allocation sites of the memory report
+MEMORY_TOP = 10
+
+
+class Span(object):
+    __slots__ = ('name', 'category', 'attrs', 'counters', 'parent', 'tid',
+                 'start', 'end', 'memory_start', 'memory_end')
+
+    def __init__(self, name, category, attrs, parent, tid):
+        """
+        Timed operation, nested in its parent span.
+        :param name: name of the operation
+        :param category: category of the operation, e.g. the tool
+        :param attrs: dictionary of attributes
+        :param parent: enclosing span, None for a root span
+        :param tid: identifier of the thread running the operation
+        """
+        self.name = name
+        self.category = category
+        self.attrs = attrs
+        self.counters = {}
+        self.parent = parent
+        self.tid = tid
+        self.start = None
+        self.end = None
+        self.memory_start = None
+        self.memory_end = None
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    def set(self, **attrs):
+        """
+        Set attributes of the span, e.g. once the result is known.
+        """
+        self.attrs.update(attrs)
+
+    def to_event(self, epoch, pid):
+        """
+        Provides the span as a complete event ('X') of the Chrome trace
+        event format.
+        :param epoch: start time of the trace
+        :param pid: process identifier
+        """
+        args = dict(self.attrs)
+        args.update(self.counters)
+        if self.memory_start is not None:
+            args['memory_bytes'] = self.memory_end - self.memory_start
+        return {'name': self.name, 'cat': self.category, 'ph': 'X',
+                'ts': (self.start - epoch) * 1e6,
+                'dur': self.duration * 1e6,
+                'pid': pid, 'tid': self.tid, 'args': args}
+
+
+class _NullSpan(object):
+    """
+    Span of a disabled tracer.
+    """
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_null_span = _NullSpan()
+
+
+class _ActiveSpan(object):
+    __slots__ = ('_tracer', '_span')
+
+    def __init__(self, tracer, span):
+        self._tracer = tracer
+        self._span = span
+
+    def __enter__(self):
+        self._tracer._push(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self._span.attrs['error'] = exc_type.__name__
+        self._tracer._pop(self._span)
+        return False
+
+
+class Tracer(object):
+
+    def __init__(self):
+        """
+        Collects the spans and counters of a process. Spans are nested
+        per thread. Counters are attributed to the innermost span, and
+        accumulated in its parents when it ends.
+        """
+        self.enabled = False
+        self.memory = False
+        self._spans = []
+        self._totals = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._epoch = time.perf_counter()
+        self._memory_top = None
+
+    def enable(self, memory=False):
+        """
+        Start tracing.
+        :param memory: measure the memory allocated within each span, with
+                       tracemalloc. It slows down the traced operations.
+        """
+        if memory:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+        self.memory = memory
+        self.enabled = True
+
+    def disable(self):
+        """
+        Stop tracing. Collected spans are kept.
+        """
+        if self.memory:
+            import tracemalloc
+            self._memory_top = self._memory_report(tracemalloc)
+            tracemalloc.stop()
+        self.enabled = False
+        self.memory = False
+
+    def clear(self):
+        """
+        Discard the collected spans and counters.
+        """
+        with self._lock:
+            self._spans = []
+            self._totals = {}
+            self._memory_top = None
+            self._epoch = time.perf_counter()
+
+    @property
+    def spans(self):
+        """
+        Provides the ended spans, in order of completion.
+        :return: list of Span objects
+        """
+        return list(self._spans)
+
+    @property
+    def totals(self):
+        """
+        Provides the totals of the counters of the process.
+        :return: dictionary of counters
+        """
+        return dict(self._totals)
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current(self):
+        """
+        Provides the innermost span of the calling thread.
+        :return: Span object, None if no span is open
+        """
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def span(self, name, category='son', **attrs):
+        """
+        Provides a context manager measuring an operation.
+        :param name: name of the operation
+        :param category: category of the operation, e.g. the tool
+        :param attrs: attributes of the span
+        :return: context manager, providing the span
+        """
+        if not self.enabled:
+            return _null_span
+        return _ActiveSpan(self, Span(name, category, attrs, self.current(),
+                                      threading.get_ident()))
+
+    def count(self, name, value=1):
+        """
+        Increment a counter of the innermost span and of the process.
+        :param name: counter name, e.g. 'bytes_hashed'
+        :param value: increment
+        """
+        if not self.enabled:
+            return
+        span = self.current()
+        if span is not None:
+            span.counters[name] = span.counters.get(name, 0) + value
+        with self._lock:
+            self._totals[name] = self._totals.get(name, 0) + value
+
+    def _push(self, span):
+        if self.memory:
+            import tracemalloc
+            span.memory_start = tracemalloc.get_traced_memory()[0]
+        self._stack().append(span)
+        span.start = time.perf_counter()
+
+    def _pop(self, span):
+        span.end = time.perf_counter()
+        if span.memory_start is not None:
+            import tracemalloc
+            span.memory_end = tracemalloc.get_traced_memory()[0]
+
+        stack = self._stack()
+        if stack and stack[-1] is span:
+            stack.pop()
+        if span.parent is not None:
+            for name, value in span.counters.items():
+                span.parent.counters[name] = \
+                    span.parent.counters.get(name, 0) + value
+        with self._lock:
+            self._spans.append(span)
+
+    @staticmethod
+    def _memory_report(tracemalloc):
+        snapshot = tracemalloc.take_snapshot()
+        return [{'location': str(stat.traceback), 'size': stat.size,
+                 'count': stat.count}
+                for stat in snapshot.statistics('lineno')[:MEMORY_TOP]]
+
+    def to_chrome(self):
+        """
+        Provides the trace in the Chrome trace event format.
+        :return: dictionary, to be serialized as JSON
+        """
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self._spans)
+            totals = dict(self._totals)
+        events = [span.to_event(self._epoch, pid) for span in spans]
+        events.sort(key=lambda evt: evt['ts'])
+
+        other = {'counters': totals}
+        if self.memory:
+            import tracemalloc
+            other['memory_top'] = self._memory_report(tracemalloc)
+        elif self._memory_top is not None:
+            other['memory_top'] = self._memory_top
+
+        return {'traceEvents': events, 'displayTimeUnit': 'ms',
+                'otherData': other}
+
+    def export(self, path):
+        """
+        Write the trace to a file, in the Chrome trace event format.
+        :param path: output file
+        """
+        with open(path, 'w') as _f:
+            json.dump(self.to_chrome(), _f)
+        log.info("Trace written to '{0}': {1} span(s)"
+                 .format(path, len(self._spans)))
+
+
+# tracer of the process
+tracer = Tracer()
+
+
+def span(name, category='son', **attrs):
+    """
+    Measure an operation with the tracer of the process, see Tracer.span.
+    """
+    return tracer.span(name, category, **attrs)
+
+
+def count(name, value=1):
+    """
+    Increment a counter of the tracer of the process, see Tracer.count.
+    """
+    tracer.count(name, value)
+
+
+def traced(name=None, category='son'):
+    """
+    Decorator measuring each call of a function in a span.
+    :param name: name of the span, the qualified name of the function by
+                 default
+    :param category: category of the span
+    """
+    def decorator(method):
+        span_name = name or method.__qualname__
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return method(*args, **kwargs)
+            with tracer.span(span_name, category):
+                return method(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def add_argument(parser):
+    """
+    Add the tracing options to the argument parser of a tool.
+    :param parser: argparse.ArgumentParser
+    """
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Trace the execution and write it to FILE, in the Chrome "
+             "trace event format (see chrome://tracing)",
+        required=False
+    )
+    parser.add_argument(
+        "--trace-memory",
+        help="Measure the memory allocated within each traced operation "
+             "(slow). Requires --trace",
+        required=False,
+        action="store_true"
+    )
+
+
+def configure(args, name):
+    """
+    Start tracing if requested by the parsed arguments of a tool. The
+    execution of the tool is traced in a root span, and the trace is
+    written when the process exits.
+    :param args: parsed arguments, see 'add_argument'
+    :param name: name of the tool, e.g. 'son-package'
+    """
+    path = getattr(args, 'trace', None)
+    if not path:
+        return
+    tracer.enable(memory=getattr(args, 'trace_memory', False))
+    root = tracer.span(name, 'son', argv=' '.join(sys.argv[1:]))
+    root.__enter__()
+    atexit.register(_finish, root, path)
+
+
+def _finish(root, path):
+    root.__exit__(None, None, None)
+    tracer.disable()
+    tracer.export(path)
@@ -1,3 +1,5 @@
+import gzip
+import base64
 import hashlib
 import os
 import sys
@@ -5,20 +7,27 @@ import json
 import logging
 import coloredlogs
 import atexit
+import multiprocessing
 import urllib.request as urllib2
 import urllib.parse as urlparse
-import shutil
 import time
+import threading
+from collections import OrderedDict
+from networkx import generate_graphml
+from networkx.readwrite import json_graph
 from son.package.md5 import generate_hash
-from flask import Flask, request
-from flask_cache import Cache
+from flask import Flask, Response, g, request
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 from son.validate.validate import Validator, print_result
 from son.workspace.workspace import Workspace
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
 from son.validate.event import EventLogger
+from son.validate.api.jobs import JobQueue, RedisJobQueue
+from son.validate.api.store import MemoryStore, RedisStore
+from son.validate.api.artifacts import ArtifactStore
+from son.validate.api.stream import EventStream, FORMATS as STREAM_FORMATS
+from son import trace
+from son.validate.api.metrics import ValidationMetrics, ValidationProfile
 
 log = logging.getLogger(__name__)
 
@@ -26,60 +35,51 @@ app = Flask(__name__)
 CORS(app)
 app.config.from_pyfile('settings.py')
 
+redis_auth = app.config['REDIS_USER'] + ':' + app.config[
+    'REDIS_PASSWD'] + '@' \
+    if app.config['REDIS_USER'] and app.config['REDIS_PASSWD'] else ''
+redis_url = 'redis://' + redis_auth + app.config['REDIS_HOST'] + \
+            ':' + app.config['REDIS_PORT']
+
 # config cache
 if app.config['CACHE_TYPE'] == 'redis':
-
-    redis_auth = app.config['REDIS_USER'] + ':' + app.config[
-        'REDIS_PASSWD'] + '@' \
-        if app.config['REDIS_USER'] and app.config['REDIS_PASSWD'] else ''
-    redis_url = 'redis://' + redis_auth + app.config['REDIS_HOST'] + \
-                ':' + app.config['REDIS_PORT']
-
-    cache = Cache(app, config={'CACHE_TYPE': 'redis',
-                               'CACHE_DEFAULT_TIMEOUT': 0,
-                               'CACHE_REDIS_URL': redis_url})
+    # redis is only imported if used, as well as watchdog (local mode)
+    import redis
+    cache = RedisStore(redis.StrictRedis.from_url(redis_url))
 
 elif app.config['CACHE_TYPE'] == 'simple':
-    cache = Cache(app, config={'CACHE_TYPE': 'simple',
-                               'CACHE_DEFAULT_TIMEOUT': 0})
+    cache = MemoryStore()
 
 else:
     print("Invalid cache type.")
     sys.exit(1)
 
 
+# content-addressed store of the fetched and uploaded objects
+artifacts = ArtifactStore(
+    app.config['ARTIFACTS_DIR'],
+    max_size=app.config['ARTIFACTS_MAX_SIZE'] * 1024 * 1024,
+    max_age=app.config['ARTIFACTS_MAX_AGE'])
+
+# operational metrics of the service, exported in '/metrics'
+metrics = ValidationMetrics()
+
 # keep temporary request errors
 req_errors = []
 
+# validators of recent validations, kept to generate the network reports
+# on request. Bounded to the most recent TOPOLOGY_CACHE_SIZE validations.
+# Validators reused by later validations (of watches) are not kept.
+topology_sources = OrderedDict()
+topology_lock = threading.Lock()
+
+# queue of asynchronous validation jobs, created on initialization
+job_queue = None
 
-class ValidateWatcher(FileSystemEventHandler):
-    def __init__(self, path, callback, filename=None):
-        self.path = path
-        self.filename = filename
-        self.callback = callback
-        self.observer = Observer()
-        self.observer.schedule(self, self.path,
-                               recursive=False if self.filename else True)
-        self.observer.start()
-        # self.observer.join()
-
-    def on_modified(self, event):
-        print(self.filename)
-        print(event.src_path)
-        print(event)
-
-        self.observer.stop()
-        self.callback(self.path)
-
-        # if not event.is_directory and self.filename and \
-        #         event.src_path.endswith(self.filename):
-        #     self.observer.stop()
-        #     self.callback(self.path)
-        # elif not self.filename and event.is_directory:
-        #     self.observer.stop()
-        #     self.callback(self.path)
-        # else:
-        #     log.error("Internal error: unknown watcher event")
+# watchers and validators of watched paths: the validator of a watch keeps
+# the results of unchanged descriptors between validations
+watchers = dict()
+watch_validators = dict()
 
 
 def initialize(debug=False):
@@ -90,31 +90,53 @@ def initialize(debug=False):
     except:
         sys.exit(1)
 
-    cache.add('debug', debug)
-    cache.add('artifacts', list())
-    cache.add('validations', dict())
-    cache.add('resources', dict())
-    cache.add('latest', dict())
-    cache.add('watches', dict())
+    artifacts.evict()
+
+    warm_up()
+    initialize_jobs()
+
 
-    os.makedirs(app.config['ARTIFACTS_DIR'], exist_ok=True)
-    set_artifact(app.config['ARTIFACTS_DIR'])
+def warm_up():
+    # load the resources shared by all validators of the process (parsed
+    # schemas and event configuration), sparing it to the first requests
+    Validator()
+
+
+def initialize_jobs():
+    global job_queue
+    if app.config['JOB_QUEUE'] == 'redis':
+        if app.config['CACHE_TYPE'] != 'redis':
+            log.error("Redis job queue requires the redis cache type, to "
+                      "share validation results with the workers")
+            sys.exit(1)
+        import redis
+        job_queue = RedisJobQueue(
+            redis.StrictRedis.from_url(redis_url, decode_responses=True),
+            history_ttl=app.config['JOB_HISTORY_TTL'])
+        log.info("Validation jobs: redis queue at {0}:{1}"
+                 .format(app.config['REDIS_HOST'], app.config['REDIS_PORT']))
+        metrics.track_job_queue(job_queue)
+        return
+
+    job_queue = JobQueue(workers=app.config['JOB_WORKERS'],
+                         executor=app.config['JOB_EXECUTOR'],
+                         history=app.config['JOB_HISTORY_SIZE'])
+    metrics.track_job_queue(job_queue)
+    log.info("Validation jobs: {0} {1} worker(s)"
+             .format(app.config['JOB_WORKERS'], app.config['JOB_EXECUTOR']))
 
 
 def install_watcher(watch_path, obj_type, syntax, integrity, topology):
     log.debug("Setting watcher for {0} validation on path: {1}"
               .format(obj_type, watch_path))
-    if os.path.isdir(watch_path):
-        ValidateWatcher(watch_path, _validate_object_from_watch)
-
-    elif os.path.isfile(watch_path):
-        filename = os.path.basename(watch_path)
-        dirname = os.path.dirname(watch_path)
-        ValidateWatcher(dirname, _validate_object_from_watch,
-                        filename=filename)
-
     set_watch(watch_path, obj_type, syntax, integrity, topology)
 
+    if watch_path not in watchers:
+        from son.validate.api.watch import ValidateWatcher
+        watchers[watch_path] = ValidateWatcher(
+            watch_path, _validate_object_from_watch,
+            debounce=app.config['WATCH_DEBOUNCE'])
+
 
 def load_watch_dirs(workspace):
     if not workspace:
@@ -136,78 +158,50 @@ def load_watch_dirs(workspace):
         install_watcher(watch_path, watch['type'], watch['syntax'],
                         watch['integrity'], watch['topology'])
 
-        _validate_object(watch_path, watch_path, watch['type'],
-                         watch['syntax'], watch['topology'],
-                         watch['integrity'])
+        _validate_object_from_watch(watch_path)
 
 
 def set_watch(path, obj_type, syntax, integrity, topology):
     log.debug("Caching watch '{0}".format(path))
-    watches = cache.get('watches')
-
-    if not watches:
-        watches = dict()
-
-    if not watch_exists(path):
-        watches[path] = dict()
-
-    watches[path]['type'] = obj_type
-    watches[path]['syntax'] = syntax
-    watches[path]['integrity'] = integrity
-    watches[path]['topology'] = topology
-
-    cache.set('watches', watches)
+    cache.hset('watches', path, type=obj_type, syntax=syntax,
+               integrity=integrity, topology=topology)
 
 
 def watch_exists(path):
-    if not cache.get('watches'):
-        return False
-    return path in cache.get('watches').keys()
+    return cache.exists('watches', path)
 
 
 def get_watch(path):
-    if not watch_exists(path):
-        return
-    return cache.get('watches')[path]
-
-
-def set_artifact(artifact_path):
-    log.debug("Caching artifact '{0}'".format(artifact_path))
-    artifacts = cache.get('artifacts')
-    if not artifacts:
-        artifacts = list()
-    artifacts.append(artifact_path)
-    cache.set('artifacts', artifacts)
-
-
-def add_artifact_root():
-    artifact_root = os.path.join(app.config['ARTIFACTS_DIR'],
-                                 str(time.time() * 1000))
-    os.makedirs(artifact_root, exist_ok=False)
-    set_artifact(artifact_root)
-    return artifact_root
+    return cache.hget('watches', path)
 
 
 def update_latest(path, vid):
     log.debug("Updating latest validation for {0}: {1}".format(path, vid))
-    latest = cache.get('latest')
-    if not latest:
-        latest = dict()
-
-    latest[path] = vid
-    cache.set('latest', latest)
+    cache.hset('latest', path, vid=vid)
 
 
 def get_resource(rid):
-    if not resource_exists(rid):
-        return
-    return cache.get('resources')[rid]
+    return cache.hget('resources', rid)
+
+
+def get_latest_validation(rid):
+    """
+    Obtain a resource and the id of its latest validation.
+    :return: tuple (resource, validation id). The validation id is None if
+             the resource is unknown or not validated yet, e.g. while its
+             asynchronous validation is running.
+    """
+    resource = get_resource(rid)
+    if not resource:
+        return None, None
+    vid = resource.get('latest_vid')
+    if not vid or not validation_exists(vid):
+        return resource, None
+    return resource, vid
 
 
 def resource_exists(rid):
-    if not cache.get('resources'):
-        return False
-    return rid in cache.get('resources').keys()
+    return cache.exists('resources', rid)
 
 
 def update_resource_validation(rid, vid):
@@ -219,62 +213,37 @@ def update_resource_validation(rid, vid):
         return
 
     log.debug("Updating resource '{0}' to: '{1}'".format(rid, vid))
-    resources = cache.get('resources')
-    resources[rid]['latest_vid'] = vid
-    cache.set('resources', resources)
+    cache.hset('resources', rid, latest_vid=vid)
 
 
 def set_resource(rid, path, obj_type, syntax, integrity, topology):
 
     log.debug("Caching resource {0}".format(rid))
-    resources = cache.get('resources')
-    if not resources:
-        resources = dict()
-
-    if not resource_exists(rid):
-        resources[rid] = dict()
-
-    resources[rid]['path'] = path
-    resources[rid]['type'] = obj_type
-    resources[rid]['syntax'] = syntax
-    resources[rid]['integrity'] = integrity
-    resources[rid]['topology'] = topology
-
-    cache.set('resources', resources)
+    cache.hset('resources', rid, path=path, type=obj_type, syntax=syntax,
+               integrity=integrity, topology=topology)
 
 
 def set_validation(vid, result=None, net_topology=None, net_fwgraph=None):
     assert result or net_topology or net_fwgraph
 
     log.debug("Caching validation '{0}'".format(vid))
-    validations = cache.get('validations')
-
-    if not validations:
-        validations = dict()
-
-    if vid not in validations.keys():
-        validations[vid] = dict()
-
+    reports = dict()
     if result:
-        validations[vid]['result'] = result
+        reports['result'] = result
     if net_topology:
-        validations[vid]['net_topology'] = net_topology
+        reports['net_topology'] = net_topology
     if net_fwgraph:
-        validations[vid]['net_fwgraph'] = net_fwgraph
+        reports['net_fwgraph'] = net_fwgraph
 
-    cache.set('validations', validations)
+    cache.hset('validations', vid, **reports)
 
 
 def validation_exists(vid):
-    if not cache.get('validations'):
-        return False
-    return vid in cache.get('validations').keys()
+    return cache.exists('validations', vid)
 
 
 def get_validation(vid):
-    if not validation_exists(vid):
-        return
-    return cache.get('validations')[vid]
+    return cache.hget('validations', vid)
 
 
 def gen_resource_key(path, otype, s, i, t):
@@ -330,19 +299,26 @@ def process_request():
     return keypath, path
 
 
-def _validate_object_from_watch(path):
+def _validate_object_from_watch(path, changes=None):
     if not watch_exists(path):
         log.error("Invalid cached watch. Cannot proceed with validation")
         return
 
     watch = get_watch(path)
+    validator = watch_validators.get(path)
+    if validator and changes and watch['type'] != 'package':
+        # only changed descriptors and their dependants are validated again
+        validator.invalidate(changes)
+    else:
+        validator = create_validator(watch['syntax'], watch['integrity'],
+                                     watch['topology'],
+                                     debug=app.config['DEBUG'])
+        watch_validators[path] = validator
+
     log.debug("Validating {0} from watch: {1}".format(watch['type'], path))
     result = _validate_object(path, path, watch['type'], watch['syntax'],
-                              watch['integrity'], watch['topology'])
-
-    # re-schedule watcher
-    install_watcher(path, watch['type'], watch['syntax'], watch['integrity'],
-                    watch['topology'])
+                              watch['integrity'], watch['topology'],
+                              validator=validator)
 
     if not result:
         return
@@ -351,10 +327,21 @@ def _validate_object_from_watch(path):
 
 @app.before_request
 def before():
+    g.request_start = time.time()
     log.debug('headers: {0}'.format(request.headers))
     log.debug('body: {0}'.format(request.get_data()))
 
 
+@app.after_request
+def after(response):
+    # requests are labelled by route, unmatched requests are not counted
+    if request.url_rule and 'request_start' in g:
+        metrics.observe_request(request.url_rule.rule, request.method,
+                                response.status_code,
+                                time.time() - g.request_start)
+    return response
+
+
 def _validate_object_from_request(object_type):
 
     assert object_type == 'project' or object_type == 'package' or \
@@ -381,9 +368,42 @@ def _validate_object_from_request(object_type):
                           "set")
         return render_errors(), 400
 
+    run_async = str2bool(request.form['async']) \
+        if 'async' in request.form else False
+
+    stream = get_stream_format()
+    if stream is False:
+        return render_errors(), 400
+    if stream and run_async:
+        req_errors.append("'async' and 'stream' validations are mutually "
+                          "exclusive")
+        return render_errors(), 400
+
     return _validate_object(keypath, path, object_type, syntax, integrity,
                             topology, pkg_signature=pkg_signature,
-                            pkg_pubkey=pkg_pubkey)
+                            pkg_pubkey=pkg_pubkey, run_async=run_async,
+                            stream=stream)
+
+
+def get_stream_format():
+    """
+    Obtain the requested format of the validation stream, from the
+    'stream' parameter. If it's just enabled, server-sent events are
+    streamed to clients accepting them, JSON lines otherwise.
+    :return: stream format, None if not requested or False if invalid
+    """
+    stream = request.form.get('stream')
+    if not stream or stream in STREAM_FORMATS:
+        return stream or None
+    if stream.lower() in ('true', 'false'):
+        if not str2bool(stream):
+            return
+        best = request.accept_mimetypes.best_match(
+            [STREAM_FORMATS['jsonl'], STREAM_FORMATS['sse']])
+        return 'sse' if best == STREAM_FORMATS['sse'] else 'jsonl'
+
+    req_errors.append("Invalid 'stream' parameter: '{0}'".format(stream))
+    return False
 
 
 def _events_config():
@@ -434,7 +454,8 @@ def validate_parameters(obj_type, syntax, integrity, topology):
 
 
 def _validate_object(keypath, path, obj_type, syntax, integrity, topology,
-                     pkg_signature=None, pkg_pubkey=None):
+                     pkg_signature=None, pkg_pubkey=None, run_async=False,
+                     validator=None, stream=None):
     # protect against incorrect parameters
     perrors = validate_parameters(obj_type, syntax, integrity, topology)
     if perrors:
@@ -445,10 +466,23 @@ def _validate_object(keypath, path, obj_type, syntax, integrity, topology,
 
     resource = get_resource(rid)
     validation = get_validation(vid)
+    metrics.observe_cache(bool(resource and validation))
+    job_description = {'resource_id': rid, 'type': obj_type,
+                       'path': keypath}
 
     if resource and validation:
         log.info("Returning cached result for '{0}'".format(vid))
         update_resource_validation(rid, vid)
+        update_latest(keypath, vid)
+        if run_async:
+            job = job_queue.complete(validation['result'],
+                                     description=job_description)
+            return gen_job_status(job), 202
+        if stream:
+            events = EventStream(stream)
+            events.put(gen_stream_result(validation['result']))
+            events.close()
+            return gen_stream_response(events)
         return validation['result']
 
     log.info("Starting validation [type={}, path={}, flags={}"
@@ -458,24 +492,281 @@ def _validate_object(keypath, path, obj_type, syntax, integrity, topology,
 
     set_resource(rid, keypath, obj_type, syntax, integrity, topology)
 
+    if stream:
+        return stream_validation(rid, vid, keypath, path, obj_type, syntax,
+                                 integrity, topology, stream,
+                                 pkg_signature=pkg_signature,
+                                 pkg_pubkey=pkg_pubkey,
+                                 description=job_description)
+
+    if run_async:
+        job = submit_validation(rid, vid, path, obj_type, syntax, integrity,
+                                topology, pkg_signature=pkg_signature,
+                                pkg_pubkey=pkg_pubkey,
+                                description=job_description)
+        return gen_job_status(job), 202
+
+    # the validator of a watch is reused by its next validations: the
+    # network reports of this one are snapshotted right away
+    report = run_validation(rid, path, obj_type, syntax, integrity, topology,
+                            pkg_signature=pkg_signature,
+                            pkg_pubkey=pkg_pubkey, debug=app.config['DEBUG'],
+                            keep_validator=validator is None,
+                            validator=validator)
+    update_latest(keypath, vid)
+    return store_validation(rid, vid, report)
+
+
+def submit_validation(rid, vid, path, obj_type, syntax, integrity,
+                      topology, pkg_signature=None, pkg_pubkey=None,
+                      description=None):
+    """
+    Submit the validation of an object to the job queue.
+    :param description: dictionary describing the job
+    :return: job object
+    """
+    if job_queue.executor_type == 'redis':
+        # workers may run on other hosts, with their own artifact store:
+        # the object is sent along with the job. Identical jobs in flight
+        # are only validated once.
+        return job_queue.submit(
+            {'rid': rid, 'vid': vid, 'artifact': pack_artifact(path),
+             'type': obj_type,
+             'syntax': syntax, 'integrity': integrity, 'topology': topology,
+             'pkg_signature': pkg_signature, 'pkg_pubkey': pkg_pubkey},
+            key=rid + ':' + vid, description=description)
+
+    # validators can't be passed between processes: the topology
+    # report of process pool jobs is generated by the worker
+    keep_validator = job_queue.executor_type == 'thread'
+    return job_queue.submit(
+        run_validation,
+        args=(rid, path, obj_type, syntax, integrity, topology,
+              pkg_signature, pkg_pubkey, app.config['DEBUG'],
+              keep_validator),
+        callback=lambda report: store_validation(rid, vid, report),
+        description=description)
+
+
+def create_validator(syntax, integrity, topology, debug=False,
+                     pkg_signature=None, pkg_pubkey=None):
     validator = Validator()
-    validator.configure(syntax, integrity, topology, debug=app.config['DEBUG'],
+    validator.configure(syntax, integrity, topology, debug=debug,
                         pkg_signature=pkg_signature, pkg_pubkey=pkg_pubkey)
     # remove default dpath
     validator.dpath = None
+    return validator
+
+
+def run_validation(rid, path, obj_type, syntax, integrity, topology,
+                   pkg_signature=None, pkg_pubkey=None, debug=False,
+                   keep_validator=True, validator=None):
+    """
+    Validate an object and generate its reports. It may run in a worker
+    thread or process, as it doesn't access the cache.
+    :param keep_validator: include the validator in the returned reports,
+                           to generate the network reports on request.
+                           Otherwise, they are generated right away, as
+                           required for a validator reused afterwards.
+    :param validator: validator to use, e.g. keeping the results of a
+                      previous validation of the object. By default, a new
+                      validator is created.
+    :return: dictionary of reports
+    """
+    if not validator:
+        validator = create_validator(syntax, integrity, topology,
+                                     debug=debug, pkg_signature=pkg_signature,
+                                     pkg_pubkey=pkg_pubkey)
     val_function = getattr(validator, 'validate_' + obj_type)
 
-    result = val_function(path)
+    profile = ValidationProfile(obj_type)
+    validator.event_context.subscribe(profile)
+    profile.start()
+    try:
+        result = val_function(path)
+    finally:
+        validator.event_context.unsubscribe(profile)
     print_result(validator, result)
-    json_result = gen_report_result(rid, validator)
-    net_topology = gen_report_net_topology(validator)
-    net_fwgraph = gen_report_net_fwgraph(validator)
 
-    set_validation(vid, result=json_result, net_topology=net_topology,
-                   net_fwgraph=net_fwgraph)
+    report = dict()
+    start = time.time()
+    report['result'] = gen_report_result(rid, validator)
+    if keep_validator:
+        report['validator'] = validator
+    else:
+        report['net_topology'] = gen_report_net_topology(validator)
+        report['net_fwgraph'] = gen_report_net_fwgraph(validator)
+    profile.add_stage('report', time.time() - start)
+    profile.stop()
+    report['profile'] = profile.to_dict()
+    return report
+
+
+def stream_validation(rid, vid, keypath, path, obj_type, syntax, integrity,
+                      topology, fmt, pkg_signature=None, pkg_pubkey=None,
+                      description=None):
+    """
+    Validate an object in a job of the job queue, streaming its events and
+    stages as they are produced, followed by the validation result. The
+    events of jobs run by other processes (process pool or redis workers)
+    can't be streamed: their stream only includes the result.
+    :param fmt: format of the stream, 'sse' or 'jsonl'
+    :param description: dictionary describing the job
+    :return: streamed response
+    """
+    events = EventStream(fmt)
+    events.put({'type': 'validation', 'resource_id': rid,
+                'validation_id': vid, 'object_type': obj_type,
+                'path': keypath})
+
+    if job_queue.executor_type != 'thread':
+        job = submit_validation(rid, vid, path, obj_type, syntax, integrity,
+                                topology, pkg_signature=pkg_signature,
+                                pkg_pubkey=pkg_pubkey,
+                                description=description)
+        events.follow(job, gen_stream_job_result)
+        return gen_stream_response(events)
+
+    validator = create_validator(syntax, integrity, topology,
+                                 debug=app.config['DEBUG'],
+                                 pkg_signature=pkg_signature,
+                                 pkg_pubkey=pkg_pubkey)
+    validator.event_context.subscribe(events.put)
+
+    def validate():
+        try:
+            report = run_validation(rid, path, obj_type, syntax, integrity,
+                                    topology, debug=app.config['DEBUG'],
+                                    validator=validator)
+            validator.event_context.unsubscribe(events.put)
+            update_latest(keypath, vid)
+            result = store_validation(rid, vid, report)
+            events.put(gen_stream_result(result))
+            return result
+        except Exception:
+            events.put({'type': 'error',
+                        'message': "Failed to validate '{0}'"
+                                   .format(keypath)})
+            raise
+        finally:
+            events.close()
+
+    job_queue.submit(validate, description=description)
+    return gen_stream_response(events)
+
+
+def run_validation_job(payload):
+    """
+    Handle a validation job of the redis queue, storing its reports in the
+    shared cache.
+    :param payload: job payload, as submitted by '_validate_object'
+    :return: validation result report
+    """
+    path = unpack_artifact(payload['artifact'])
+    report = run_validation(payload['rid'], path, payload['type'],
+                            payload['syntax'], payload['integrity'],
+                            payload['topology'],
+                            pkg_signature=payload['pkg_signature'],
+                            pkg_pubkey=payload['pkg_pubkey'],
+                            debug=app.config['DEBUG'], keep_validator=False)
+    # the metrics are recorded by the service, not by this process
+    job_queue.report_profile(report.pop('profile'))
+    result = store_validation(payload['rid'], payload['vid'], report)
+    return result.decode('utf-8')
+
+
+def run_worker():
+    """
+    Consume validation jobs from the redis queue until interrupted.
+    """
+    warm_up()
+    initialize_jobs()
+    log.info("Validation worker {0} waiting for jobs".format(os.getpid()))
+    try:
+        job_queue.work(run_validation_job)
+    except KeyboardInterrupt:
+        pass
+
+
+def store_validation(rid, vid, report):
+    """
+    Cache the reports of a validation and associate them with the
+    validated resource.
+    :return: validation result report
+    """
+    if 'profile' in report:
+        metrics.observe_validation(report['profile'])
+
+    # network reports are only generated when requested
+    if 'validator' in report:
+        set_topology_source(vid, report['validator'])
+
+    set_validation(vid, result=report['result'],
+                   net_fwgraph=report.get('net_fwgraph'),
+                   net_topology=report.get('net_topology'))
     update_resource_validation(rid, vid)
 
-    return json_result
+    return report['result']
+
+
+def set_topology_source(vid, validator):
+    with topology_lock:
+        topology_sources[vid] = validator
+        topology_sources.move_to_end(vid)
+        while len(topology_sources) > app.config['TOPOLOGY_CACHE_SIZE']:
+            topology_sources.popitem(last=False)
+
+
+def get_net_report(vid, name, obj_type):
+    """
+    Obtain a network report of a validation, generating it on the first
+    request. Generated reports are cached.
+    :param vid: validation id
+    :param name: 'net_topology', 'net_topology_graphml' or 'net_fwgraph'
+    :param obj_type: type of the validated object
+    :return: report payload (bytes) or None if not available
+    """
+    payload = cache.hget('validations', vid, name)
+    if payload:
+        return payload
+
+    start = time.time()
+    if name == 'net_topology_graphml':
+        # derived from the node-link report, which may come from a worker
+        net_topology = get_net_report(vid, 'net_topology', obj_type)
+        if not net_topology:
+            return
+        payload = gen_report_net_topology_graphml(net_topology)
+    else:
+        with topology_lock:
+            validator = topology_sources.get(vid)
+        if not validator:
+            return
+        payload = gen_report_net_topology(validator) \
+            if name == 'net_topology' else gen_report_net_fwgraph(validator)
+
+    metrics.observe_stage(obj_type, 'report', time.time() - start)
+    if payload:
+        cache.hset('validations', vid, **{name: payload})
+    return payload
+
+
+def gen_report_response(vid, name, payload, mimetype):
+    """
+    Build the response of a report, gzip compressed if accepted by the
+    client. Compressed reports are cached along with the report.
+    """
+    headers = {'Vary': 'Accept-Encoding'}
+    if len(payload) >= app.config['GZIP_MIN_SIZE'] and \
+            request.accept_encodings['gzip']:
+        compressed = cache.hget('validations', vid, name + '_gzip')
+        if not compressed:
+            compressed = gzip.compress(payload)
+            cache.hset('validations', vid, **{name + '_gzip': compressed})
+        payload = compressed
+        headers['Content-Encoding'] = 'gzip'
+
+    return Response(payload, mimetype=mimetype, headers=headers)
 
 
 def render_errors():
@@ -493,13 +784,13 @@ def root():
 
 @app.route('/flush/validations', methods=['POST'])
 def flush_validations():
-    cache.set('validations', dict())
+    cache.clear('validations')
     return 'ok', 200
 
 
 @app.route('/flush/artifacts', methods=['POST'])
 def flush_artifacts():
-    cache.set('artifacts', list())
+    artifacts.clear()
     return 'ok', 200
 
 
@@ -523,6 +814,36 @@ def validate_function():
     return _validate_object_from_request('function')
 
 
+@app.route('/jobs/stats', methods=['GET'])
+def jobs_stats():
+    """ retrieve statistics of the validation jobs queue """
+    return json.dumps(job_queue.stats(), sort_keys=True,
+                      indent=4, separators=(',', ': ')).encode('utf-8')
+
+
+@app.route('/jobs/<string:job_id>', methods=['GET'])
+def job_status(job_id):
+    """ retrieve the status of a validation job, optionally waiting
+    (long-polling) up to 'wait' seconds for it to finish """
+    job = job_queue.get(job_id)
+    if not job:
+        return '', 404
+
+    try:
+        wait = float(request.args.get('wait', 0))
+    except ValueError:
+        return "Invalid 'wait' parameter", 400
+    if wait > 0 and not job.finished:
+        job.wait(min(wait, app.config['JOB_MAX_WAIT']))
+
+    return gen_job_status(job), 200 if job.finished else 202
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_export():
+    return Response(metrics.export(), content_type=metrics.content_type)
+
+
 @app.route('/events/config', methods=['POST'])
 def events_config():
     return _events_config()
@@ -553,9 +874,8 @@ def report():
 
 @app.route('/report/result/<string:resource_id>', methods=['GET'])
 def report_result(resource_id):
-    vid = get_resource(resource_id)['latest_vid']
-    if (not validation_exists(vid) or
-            'result' not in get_validation(vid).keys()):
+    resource, vid = get_latest_validation(resource_id)
+    if not vid or 'result' not in get_validation(vid).keys():
         return '', 404
 
     return get_validation(vid)['result']
@@ -563,30 +883,44 @@ def report_result(resource_id):
 
 @app.route('/report/topology/<string:resource_id>', methods=['GET'])
 def report_topology(resource_id):
-    vid = get_resource(resource_id)['latest_vid']
-    if (not validation_exists(vid) or
-            'net_topology' not in get_validation(vid).keys()):
+    resource, vid = get_latest_validation(resource_id)
+    if not vid:
+        return '', 404
+
+    report_format = request.args.get('format', 'json')
+    if report_format not in ('json', 'graphml'):
+        return "Invalid 'format' parameter", 400
+    name = 'net_topology' if report_format == 'json' \
+        else 'net_topology_graphml'
+
+    net_topology = get_net_report(vid, name, resource['type'])
+    if not net_topology:
         return '', 404
-    return get_validation(vid)['net_topology']
+    return gen_report_response(
+        vid, name, net_topology,
+        'application/json' if report_format == 'json' else 'application/xml')
 
 
 @app.route('/report/fwgraph/<string:resource_id>', methods=['GET'])
 def report_fwgraph(resource_id):
-    vid = get_resource(resource_id)['latest_vid']
-    if (not validation_exists(vid) or
-            'net_fwgraph' not in get_validation(vid).keys()):
+    resource, vid = get_latest_validation(resource_id)
+    if not vid:
+        return '', 404
+    net_fwgraph = get_net_report(vid, 'net_fwgraph', resource['type'])
+    if not net_fwgraph:
         return '', 404
-    return get_validation(vid)['net_fwgraph']
+    return gen_report_response(vid, 'net_fwgraph', net_fwgraph,
+                               'application/json')
 
 
 def gen_watches():
     # retrieve dictionary of watched resources, in the format:
     # path: { type | syntax | integrity | topology }
     report = dict()
-    watches = cache.get('watches')
+    watches = cache.items('watches')
     if not watches:
         return '', 204
-    for path, watch in watches.items():
+    for path, watch in watches:
         report[path] = dict()
         report[path]['type'] = watch['type']
         report[path]['syntax'] = watch['syntax']
@@ -601,11 +935,11 @@ def gen_validations():
     # retrieve dictionary of cached validations, in the format:
     # validation_id: { type | path | syntax | integrity | topology }
     report = dict()
-    validations = cache.get('validations')
+    validations = cache.items('validations')
     if not validations:
         return '', 204
 
-    for vid, validation in validations.items():
+    for vid, validation in validations:
         report[vid] = dict()
         report[vid]['type'] = validation['type']
         report[vid]['path'] = validation['path']
@@ -620,17 +954,16 @@ def gen_validations():
 def gen_report():
     # resource_id {type | path | syntax | integrity | topology }
     report = dict()
-    resources = cache.get('resources')
-    validations = cache.get('validations')
+    resources = cache.items('resources')
 
-    if not resources or not validations:
+    if not resources:
         return '', 204
 
-    for rid, resource in resources.items():
+    for rid, resource in resources:
 
         # omit resources that don't have a validation available
-        vid = resource['latest_vid']
-        if not validation_exists(vid):
+        vid = resource.get('latest_vid')
+        if not vid or not validation_exists(vid):
             continue
 
         report[rid] = dict()
@@ -644,6 +977,42 @@ def gen_report():
                       indent=4, separators=(',', ': ')).encode('utf-8')
 
 
+def gen_job_status(job):
+    status = job.to_dict()
+    # embed the json result report
+    result = status.get('result')
+    if type(result) is bytes:
+        result = result.decode('utf-8')
+    if type(result) is str:
+        status['result'] = json.loads(result)
+
+    return json.dumps(status, sort_keys=True,
+                      indent=4, separators=(',', ': ')).encode('utf-8')
+
+
+def gen_stream_result(result):
+    return {'type': 'result', 'result': json.loads(result.decode('utf-8'))}
+
+
+def gen_stream_job_result(job):
+    """
+    Provides the stream record of the outcome of a finished job.
+    """
+    status = json.loads(gen_job_status(job).decode('utf-8'))
+    if status['status'] != 'done':
+        return {'type': 'error',
+                'message': "Failed to validate '{0}'"
+                           .format(status.get('path'))}
+    return {'type': 'result', 'result': status['result']}
+
+
+def gen_stream_response(events):
+    # proxies must not buffer the stream
+    return Response(iter(events), mimetype=events.mimetype,
+                    headers={'Cache-Control': 'no-cache',
+                             'X-Accel-Buffering': 'no'})
+
+
 def gen_report_result(resource_id, validator):
 
     print("building result report for {0}".format(resource_id))
@@ -661,89 +1030,88 @@ def gen_report_result(resource_id, validator):
 
 
 def gen_report_net_topology(validator):
-    report = list()
+    # TODO: temp patch for returning only the topology of the first service
     for sid, service in validator.storage.services.items():
-        graph_repr = ''
-        if not service.complete_graph:
+        # topology graph is only available if topology was validated
+        if not service.graph:
             return
-        for line in service.complete_graph:
-            if not line:
-                continue
-            graph_repr += line
-        report.append(graph_repr)
+        return gen_compact_json(
+            json_graph.node_link_data(service.complete_topology_graph()))
 
-    # TODO: temp patch for returning only the topology of the first service
-    if len(report) > 0:
-        report = report[0]
-        return report
+    return gen_compact_json([])
 
-    return json.dumps(report, sort_keys=True,
-                      indent=4, separators=(',', ': ')).encode('utf-8')
+
+def gen_report_net_topology_graphml(net_topology):
+    report = json.loads(net_topology.decode('utf-8'))
+    if not report:
+        return
+    graph = json_graph.node_link_graph(report)
+    return ''.join(generate_graphml(graph, prettyprint=False))\
+        .encode('utf-8')
 
 
 def gen_report_net_fwgraph(validator):
-    report = list()
+    # TODO: temp patch for returning only the fwgraph of the first service
     for sid, service in validator.storage.services.items():
-        report.append(service.fw_graphs)
+        return gen_compact_json(service.fw_graphs)
+
+    return gen_compact_json([])
 
-    # TODO: temp patch for returning only the fwgraph of the first service
-    if len(report) > 0:
-        report = report[0]
 
+def gen_compact_json(report):
     return json.dumps(report, sort_keys=True,
-                      indent=4, separators=(',', ': ')).encode('utf-8')
+                      separators=(',', ':')).encode('utf-8')
 
 
 def get_local(path):
-    artifact_root = add_artifact_root()
-    if os.path.isfile(path):
-        filepath = os.path.join(artifact_root, os.path.basename(path))
-        log.debug("Copying local file: '{0}'".format(filepath))
-        shutil.copyfile(path, filepath)
-        set_artifact(filepath)
-
-    elif os.path.isdir(path):
-        dirname = os.path.basename(os.path.abspath(path))
-        filepath = os.path.join(artifact_root, dirname)
-        log.debug("Copying local tree: '{0}'".format(filepath))
-        shutil.copytree(path, filepath)
-        set_artifact(filepath)
-        for root, dirs, files in os.walk(filepath):
-            for d in dirs:
-                set_artifact(os.path.join(root, d))
-            for f in files:
-                set_artifact(os.path.join(root, f))
-    else:
+    if not os.path.isfile(path) and not os.path.isdir(path):
         req_errors.append("Invalid local path: '{0}'".format(path))
         log.error("Invalid local path: '{0}'".format(path))
         return
 
+    if app.config['ARTIFACTS_IN_PLACE']:
+        # validation doesn't modify the object: no copy is required
+        return os.path.abspath(path)
+
+    if os.path.isfile(path):
+        filepath = artifacts.put_file(path)
+    else:
+        filepath = artifacts.put_tree(path)
+    log.debug("Stored local object: '{0}'".format(filepath))
     return filepath
 
 
 def get_file(file):
     filename = secure_filename(file.filename)
-    filepath = os.path.join(add_artifact_root(), filename)
-    file.save(filepath)
-    set_artifact(filepath)
-    return filepath
+    return artifacts.put_stream(file.stream, filename)
 
 
 def get_url(url):
     u = urllib2.urlopen(url)
     scheme, netloc, path, query, fragment = urlparse.urlsplit(url)
-    filepath = os.path.join(add_artifact_root(), os.path.basename(path))
+    try:
+        return artifacts.put_stream(u, os.path.basename(path))
+    finally:
+        u.close()
 
-    with open(filepath, 'wb') as f:
-        block_sz = 8192
-        while True:
-            buffer = u.read(block_sz)
-            if not buffer:
-                break
-            f.write(buffer)
 
-    set_artifact(filepath)
-    return filepath
+def pack_artifact(path):
+    """
+    Pack an object to validate in a job payload.
+    :return: JSON serializable dictionary
+    """
+    return {'name': os.path.basename(os.path.normpath(path)),
+            'tree': os.path.isdir(path),
+            'data': base64.b64encode(artifacts.pack(path)).decode('ascii')}
+
+
+def unpack_artifact(artifact):
+    """
+    Store an object packed in a job payload by 'pack_artifact'.
+    :return: path of the object
+    """
+    return artifacts.put_packed(base64.b64decode(artifact['data']),
+                                artifact['name'], tree=artifact['tree'])
 
 
 def remove_file(filepath):
@@ -758,18 +1126,9 @@ def get_flags(syntax, integrity, topology):
 
 @atexit.register
 def remove_artifacts():
-    log.info("Removing artifacts")
-    artifacts = cache.get('artifacts')
-    if not artifacts:
-        return
-    for artifact in artifacts[::-1]:
-        try:
-            os.remove(artifact) if os.path.isfile(artifact) \
-                else os.rmdir(artifact)
-            log.debug("DELETED '{}'".format(artifact))
-        except OSError:
-            log.debug("FAILED '{}".format(artifact))
-            pass
+    # the store persists between runs, only temporary files are removed
+    log.info("Removing temporary artifacts")
+    artifacts.remove_temp()
 
 
 def main():
@@ -781,13 +1140,14 @@ def main():
     )
     parser.add_argument(
         "--mode",
-        choices=['stateless', 'local'],
+        choices=['stateless', 'local', 'worker'],
         default='stateless',
         help="Specify the mode of operation. 'stateless' mode will run as "
              "a stateless service only. 'local' mode will run as a "
              "service and will also provide automatic monitoring and "
              "validation of local SDK projects, services, etc. that are "
-             "configured in the developer workspace",
+             "configured in the developer workspace. 'worker' mode will "
+             "only run validation jobs taken from the redis job queue",
         required=False
     )
 
@@ -815,6 +1175,22 @@ def main():
         default=Workspace.DEFAULT_WORKSPACE_DIR,
         required=False
     )
+    parser.add_argument(
+        "--workers",
+        default=app.config['JOB_WORKERS'],
+        type=int,
+        help="Number of workers running asynchronous validation jobs. "
+             "In 'worker' mode, number of worker processes",
+        required=False
+    )
+    parser.add_argument(
+        "--executor",
+        choices=['thread', 'process'],
+        default=app.config['JOB_EXECUTOR'],
+        help="Type of workers running asynchronous validation jobs: "
+             "threads or processes",
+        required=False
+    )
     parser.add_argument(
         "--debug",
         default=app.config['DEBUG'],
@@ -822,11 +1198,26 @@ def main():
         required=False,
         action="store_true"
     )
+    trace.add_argument(parser)
 
     args = parser.parse_args()
+    trace.configure(args, 'son-validate-api')
 
     coloredlogs.install(level='debug' if args.debug else 'info')
     app.config['DEBUG'] = True if args.debug else False
+    app.config['JOB_WORKERS'] = args.workers
+    app.config['JOB_EXECUTOR'] = args.executor
+
+    if args.mode == 'worker':
+        # workers share the cache of the service: don't initialize it
+        app.config['JOB_QUEUE'] = 'redis'
+        workers = [multiprocessing.Process(target=run_worker)
+                   for _ in range(max(args.workers, 1))]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return
 
     initialize(debug=args.debug)
 
@@ -845,6 +1236,7 @@ def main():
         port=args.port,
         debug=args.debug,
         use_reloader=False,
+        threaded=True,
     )
 
     # enforce debug (if is the case) after app init
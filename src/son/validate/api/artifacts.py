@@ -0,0 +1,341 @@
+import io
+import os
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+import zipfile
+import threading
+
+log = logging.getLogger(__name__)
+
+
+class ArtifactStore(object):
+
+    def __init__(self, root, max_size=None, max_age=None, grace=300):
+        """
+        Initialize a content-addressed store of the validation artifacts
+        (uploaded files, downloaded files and snapshots of local objects).
+        The content of each file is stored once, as a blob named by its
+        digest. Artifacts are exposed as views of the blobs, hard-linked
+        (or copied if the filesystem doesn't support it) under their
+        original names, as the validator relies on file names and
+        extensions. Identical artifacts share the same view.
+        :param root: directory of the store
+        :param max_size: maximum size of the store, in bytes. Least
+                         recently used views are evicted beyond it.
+        :param max_age: time, in seconds, after which unused views
+                        are evicted
+        :param grace: time, in seconds, during which a used view is not
+                      evicted for size, so that pending validations may
+                      still read it
+        """
+        self.root = root
+        self.max_size = max_size
+        self.max_age = max_age
+        self.grace = grace
+
+        self._blobs = os.path.join(root, 'blobs')
+        self._views = os.path.join(root, 'views')
+        self._tmp_root = os.path.join(root, 'tmp')
+        self._lock = threading.RLock()
+
+    @property
+    def _tmp(self):
+        # temporary files of each process, e.g. of forked workers
+        return os.path.join(self._tmp_root, str(os.getpid()))
+
+    def put_file(self, path, name=None):
+        """
+        Store a copy of a local file.
+        :param path: file to store
+        :param name: name of the artifact, default is the file name
+        :return: path of the artifact
+        """
+        with open(path, 'rb') as f:
+            return self.put_stream(f, name or os.path.basename(path))
+
+    def put_stream(self, stream, name, chunk_size=65536):
+        """
+        Store the content read from a stream, e.g. an upload or a download.
+        The content is hashed while written, without being held in memory.
+        :param stream: binary file-like object
+        :param name: file name of the artifact
+        :return: path of the artifact
+        """
+        tmp_path, digest = self._write_temp(stream, chunk_size)
+        try:
+            with self._lock:
+                blob = self._add_blob(tmp_path, digest)
+                return self._view(digest, {name: blob})[name]
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def put_tree(self, path):
+        """
+        Store a snapshot of a local directory.
+        :param path: directory to store
+        :return: path of the artifact directory
+        """
+        path = os.path.abspath(path)
+        dirname = os.path.basename(path)
+
+        # files are hashed while copied, so that a file modified meanwhile
+        # is stored under the digest of the copied content. Blobs aren't
+        # collected until their view is created.
+        with self._lock:
+            digests = dict()
+            blobs = dict()
+            dirs = [dirname]
+            for root, subdirs, files in os.walk(path):
+                relroot = os.path.join(dirname, os.path.relpath(root, path))
+                dirs.extend(os.path.normpath(os.path.join(relroot, d))
+                            for d in subdirs)
+                for filename in files:
+                    relpath = os.path.normpath(os.path.join(relroot,
+                                                            filename))
+                    with open(os.path.join(root, filename), 'rb') as f:
+                        tmp_path, digest = self._write_temp(f)
+                    try:
+                        blobs[relpath] = self._add_blob(tmp_path, digest)
+                    finally:
+                        if os.path.exists(tmp_path):
+                            os.remove(tmp_path)
+                    digests[relpath] = digest
+
+            # a tree is identified by its names and contents
+            tree_digest = hashlib.sha256()
+            for relpath in sorted(dirs):
+                tree_digest.update(relpath.encode('utf-8') + b'/')
+            for relpath in sorted(digests):
+                tree_digest.update(relpath.encode('utf-8'))
+                tree_digest.update(digests[relpath].encode('utf-8'))
+            view_id = tree_digest.hexdigest()
+
+            self._view(view_id, blobs, dirs=dirs)
+        return os.path.join(self._views, view_id, dirname)
+
+    @staticmethod
+    def pack(path):
+        """
+        Provides the content of an artifact, to be stored by the store of
+        another host (e.g. of a worker). Directories are packed as a zip
+        archive.
+        :param path: artifact file or directory
+        :return: packed content (bytes)
+        """
+        if not os.path.isdir(path):
+            with open(path, 'rb') as f:
+                return f.read()
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for root, subdirs, files in os.walk(path):
+                for name in subdirs + files:
+                    filepath = os.path.join(root, name)
+                    archive.write(filepath, os.path.relpath(filepath, path))
+        return buffer.getvalue()
+
+    def put_packed(self, data, name, tree=False):
+        """
+        Store an artifact packed by 'pack'.
+        :param data: packed content (bytes)
+        :param name: file or directory name of the artifact
+        :param tree: the artifact is a directory
+        :return: path of the artifact
+        """
+        if not tree:
+            return self.put_stream(io.BytesIO(data), name)
+
+        os.makedirs(self._tmp, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=self._tmp)
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                archive.extractall(os.path.join(tmp_dir, name))
+            return self.put_tree(os.path.join(tmp_dir, name))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _blob_path(self, digest):
+        return os.path.join(self._blobs, digest[:2], digest)
+
+    def _write_temp(self, stream, chunk_size=65536):
+        """
+        Write the content read from a stream to a temporary file of this
+        process, hashing it while written.
+        :return: tuple (temporary file path, digest)
+        """
+        digest = hashlib.sha256()
+        os.makedirs(self._tmp, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in iter(lambda: stream.read(chunk_size), b''):
+                    digest.update(chunk)
+                    f.write(chunk)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        return tmp_path, digest.hexdigest()
+
+    def _add_blob(self, path, digest):
+        """
+        Move a temporary file to the blob of its digest, unless the blob
+        is already stored. Blobs are never partially visible.
+        """
+        blob = self._blob_path(digest)
+        with self._lock:
+            if os.path.isfile(blob):
+                return blob
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            os.replace(path, blob)
+        return blob
+
+    def _view(self, view_id, blobs, dirs=()):
+        """
+        Create (or reuse) a view of blobs.
+        :param view_id: identifier of the view
+        :param blobs: dictionary of {relative path: blob}
+        :param dirs: relative paths of the directories of the view
+        :return: dictionary of {relative path: path in view}
+        """
+        view_dir = os.path.join(self._views, view_id)
+        paths = {relpath: os.path.join(view_dir, relpath)
+                 for relpath in blobs}
+
+        with self._lock:
+            for relpath in dirs:
+                os.makedirs(os.path.join(view_dir, relpath), exist_ok=True)
+            for relpath, blob in blobs.items():
+                filepath = paths[relpath]
+                if os.path.isfile(filepath):
+                    continue
+                os.makedirs(os.path.dirname(filepath), exist_ok=True)
+                try:
+                    os.link(blob, filepath)
+                except OSError:
+                    shutil.copyfile(blob, filepath)
+            # last use of a view is its modification time
+            os.makedirs(view_dir, exist_ok=True)
+            os.utime(view_dir)
+
+        log.debug("Artifact view '{0}' ({1} file(s))"
+                  .format(view_id, len(blobs)))
+        self.evict()
+        return paths
+
+    def size(self):
+        """
+        Provides the disk usage of the store, counting shared files once.
+        """
+        inodes = dict()
+        for root, dirs, files in os.walk(self.root):
+            for filename in files:
+                try:
+                    st = os.stat(os.path.join(root, filename))
+                except OSError:
+                    continue
+                inodes[(st.st_dev, st.st_ino)] = st.st_size
+        return sum(inodes.values())
+
+    def evict(self):
+        """
+        Remove expired views, then least recently used views while the
+        store exceeds its maximum size. Blobs no longer referenced by any
+        view are removed.
+        :return: number of evicted views
+        """
+        if not (self.max_size or self.max_age) or \
+                not os.path.isdir(self._views):
+            return 0
+
+        with self._lock:
+            now = time.time()
+            views = []
+            for view_id in os.listdir(self._views):
+                view_dir = os.path.join(self._views, view_id)
+                try:
+                    views.append((os.stat(view_dir).st_mtime, view_dir))
+                except OSError:
+                    continue
+            views.sort()
+
+            # the store is walked once, reduced by the space released by
+            # each evicted view. Unreferenced blobs are removed at the end.
+            size = self.size() if self.max_size else 0
+            evicted = 0
+            if self.max_age:
+                while views and now - views[0][0] > self.max_age:
+                    size -= self._remove_view(views.pop(0)[1])
+                    evicted += 1
+
+            if self.max_size:
+                while views and now - views[0][0] > self.grace and \
+                        size > self.max_size:
+                    size -= self._remove_view(views.pop(0)[1])
+                    evicted += 1
+
+            if evicted:
+                self._collect_blobs()
+
+        if evicted:
+            log.debug("Evicted {0} artifact view(s)".format(evicted))
+        return evicted
+
+    @staticmethod
+    def _remove_view(view_dir):
+        """
+        Remove a view.
+        :return: disk space released once unreferenced blobs are removed,
+                 in bytes
+        """
+        # {inode: [links in view, links, size]}
+        inodes = dict()
+        for root, dirs, files in os.walk(view_dir):
+            for filename in files:
+                try:
+                    st = os.stat(os.path.join(root, filename))
+                except OSError:
+                    continue
+                inode = inodes.setdefault((st.st_dev, st.st_ino),
+                                          [0, st.st_nlink, st.st_size])
+                inode[0] += 1
+        shutil.rmtree(view_dir, ignore_errors=True)
+
+        # a blob is released unless linked by other views. Copies of blobs
+        # (without hard link support) are released along with the view.
+        return sum(size for links_in_view, links, size in inodes.values()
+                   if links - links_in_view <= 1)
+
+    def _collect_blobs(self):
+        for root, dirs, files in os.walk(self._blobs):
+            for filename in files:
+                blob = os.path.join(root, filename)
+                try:
+                    # blobs are only hard-linked by views. Without hard
+                    # link support, views hold copies of the blobs.
+                    if os.stat(blob).st_nlink == 1:
+                        os.remove(blob)
+                except OSError:
+                    continue
+
+    def clear(self):
+        """
+        Remove all artifacts of the store.
+        """
+        with self._lock:
+            for directory in (self._blobs, self._views, self._tmp_root):
+                shutil.rmtree(directory, ignore_errors=True)
+            try:
+                os.rmdir(self.root)
+            except OSError:
+                pass
+
+    def remove_temp(self):
+        """
+        Remove the temporary files of this process, e.g. left by an
+        interrupted upload. Artifacts are kept.
+        """
+        shutil.rmtree(self._tmp, ignore_errors=True)
@@ -0,0 +1,668 @@
+import json
+import uuid
+import time
+import queue
+import logging
+import threading
+import multiprocessing
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+log = logging.getLogger(__name__)
+
+# job states
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+# number of recent jobs considered in latency statistics
+LATENCY_WINDOW = 1000
+
+# queue of the start times of the jobs of a pool process, see JobQueue
+_process_starts = None
+
+
+class Job(object):
+
+    def __init__(self, job_id, description=None):
+        """
+        Initialize a validation job.
+        :param job_id: job identifier
+        :param description: dictionary describing the job, included in its
+                            status (e.g. validation type and path)
+        """
+        self._id = job_id
+        self._description = description if description else dict()
+        self._done = threading.Event()
+
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def finished(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Block until the job is finished or the timeout expires.
+        :param timeout: maximum time to wait, in seconds
+        :return: True if the job is finished
+        """
+        return self._done.wait(timeout)
+
+    def start(self, started_at=None):
+        self.status = RUNNING
+        self.started_at = started_at if started_at else time.time()
+
+    def finish(self, result=None, error=None):
+        self.status = FAILED if error else DONE
+        self.result = result
+        self.error = error
+        if not self.started_at:
+            self.started_at = time.time()
+        self.finished_at = time.time()
+        self._done.set()
+
+    def to_dict(self):
+        """
+        Provides the job status, including the result if it's finished.
+        """
+        status = dict(self._description)
+        status['job_id'] = self.id
+        status['status'] = self.status
+        status['submitted_at'] = self.submitted_at
+        status['started_at'] = self.started_at
+        status['finished_at'] = self.finished_at
+        if self.status == DONE:
+            status['result'] = self.result
+        elif self.status == FAILED:
+            status['error'] = self.error
+        return status
+
+
+class JobQueue(object):
+
+    def __init__(self, workers=4, executor='thread', history=1000):
+        """
+        Initialize a queue of validation jobs, executed by a pool of
+        workers.
+        :param workers: number of concurrent workers
+        :param executor: type of workers: 'thread' or 'process'. Functions
+                         submitted to a process pool and their results
+                         must be picklable.
+        :param history: number of finished jobs kept for status requests
+        """
+        assert executor == 'thread' or executor == 'process'
+
+        self._executor_type = executor
+        self._workers = workers
+        self._history = history
+        if executor == 'process':
+            # pool processes report when they start running a job
+            self._starts = multiprocessing.Queue()
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_process,
+                initargs=(self._starts,))
+        else:
+            self._starts = None
+            self._executor = ThreadPoolExecutor(max_workers=workers)
+
+        self._jobs = OrderedDict()
+        # finished jobs, in the order they're forgotten beyond the history
+        self._finished = deque()
+        self._lock = threading.RLock()
+
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._wait_times = deque(maxlen=LATENCY_WINDOW)
+        self._run_times = deque(maxlen=LATENCY_WINDOW)
+
+    @property
+    def executor_type(self):
+        return self._executor_type
+
+    def submit(self, fn, args=(), callback=None, description=None):
+        """
+        Submit a job to be executed by the worker pool.
+        :param fn: function to execute
+        :param args: arguments of the function
+        :param callback: function invoked in this process with the result
+                         of 'fn'. Its return value is the job result.
+        :param description: dictionary describing the job
+        :return: job object
+        """
+        job = self._add_job(description)
+        with self._lock:
+            self._pending += 1
+
+        if self._executor_type == 'thread':
+            # threads report when they actually start running the job
+            future = self._executor.submit(self._run, job, fn, args)
+        else:
+            # processes report their start time, and along with the result
+            future = self._executor.submit(_timed_call, job.id, fn, args)
+
+        future.add_done_callback(
+            lambda f: self._finish(job, f, callback))
+        return job
+
+    def complete(self, result, description=None):
+        """
+        Register a job that is already finished, e.g. whose result was
+        already cached.
+        :param result: job result
+        :param description: dictionary describing the job
+        :return: job object
+        """
+        job = self._add_job(description)
+        job.finish(result=result)
+        self._forget(job)
+        return job
+
+    def get(self, job_id):
+        """
+        Obtain the job of the provided id.
+        :return: job object, None if unknown
+        """
+        self._read_starts()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+        if self._starts:
+            self._starts.close()
+
+    def collect_profiles(self):
+        """
+        Provides the validation profiles reported by the workers since the
+        last collection. Jobs of this queue run in this process, their
+        profiles are recorded by their callback.
+        :return: list of profile dictionaries
+        """
+        return []
+
+    def stats(self):
+        """
+        Provides statistics of the queue: depth, number of running,
+        completed and failed jobs, and latencies (in seconds) of recent
+        jobs while queued ('wait') and running ('run').
+        :return: statistics dictionary
+        """
+        self._read_starts()
+        with self._lock:
+            return {'executor': self._executor_type,
+                    'workers': self._workers,
+                    'queue_depth': self._pending,
+                    'running': self._running,
+                    'completed': self._completed,
+                    'failed': self._failed,
+                    'latency': {'wait': latency_stats(self._wait_times),
+                                'run': latency_stats(self._run_times)}}
+
+    def _add_job(self, description):
+        job = Job(str(uuid.uuid4()), description=description)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._trim()
+        return job
+
+    def _forget(self, job):
+        """
+        Register a finished job, to be forgotten beyond the history.
+        """
+        with self._lock:
+            self._finished.append(job.id)
+            self._trim()
+
+    def _trim(self):
+        # forget the jobs finished first. Unfinished jobs (e.g. stuck)
+        # are kept, without holding back the others.
+        while len(self._jobs) > self._history and self._finished:
+            self._jobs.pop(self._finished.popleft(), None)
+
+    def _run(self, job, fn, args):
+        self._started(job)
+        return fn(*args)
+
+    def _started(self, job, started_at=None):
+        with self._lock:
+            # the start of a process pool job may be reported twice
+            if job.status != QUEUED:
+                return
+            job.start(started_at)
+            self._pending -= 1
+            self._running += 1
+            self._wait_times.append(job.started_at - job.submitted_at)
+
+    def _read_starts(self):
+        """
+        Account the jobs started by the pool processes since last read.
+        """
+        while self._starts:
+            try:
+                job_id, started_at = self._starts.get_nowait()
+            except (queue.Empty, OSError, ValueError):
+                return
+            with self._lock:
+                job = self._jobs.get(job_id)
+            if job:
+                self._started(job, started_at)
+
+    def _finish(self, job, future, callback):
+        result = error = None
+        try:
+            result = future.result()
+            if self._executor_type == 'process':
+                started_at, result = result
+                self._started(job, started_at)
+            if callback:
+                result = callback(result)
+        except Exception as e:
+            log.exception("Validation job '{0}' failed".format(job.id))
+            error = str(e) or type(e).__name__
+
+        # jobs failing in a process pool didn't report their start
+        self._started(job)
+
+        job.finish(result=result, error=error)
+        with self._lock:
+            self._running -= 1
+            if error:
+                self._failed += 1
+            else:
+                self._completed += 1
+            self._run_times.append(job.finished_at - job.started_at)
+        self._forget(job)
+
+
+def _init_process(starts):
+    global _process_starts
+    _process_starts = starts
+
+
+def _timed_call(job_id, fn, args):
+    """
+    Execute a function in a pool process, reporting its start time right
+    away, and providing it along with the result.
+    """
+    started_at = time.time()
+    if _process_starts is not None:
+        _process_starts.put((job_id, started_at))
+    return started_at, fn(*args)
+
+
+def latency_stats(samples):
+    """
+    Summarize latency samples.
+    :param samples: iterable of durations, in seconds
+    :return: dictionary with count, mean, p50, p99 and max
+    """
+    samples = sorted(samples)
+    if not samples:
+        return {'count': 0, 'mean': None, 'p50': None, 'p99': None,
+                'max': None}
+
+    def percentile(p):
+        return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+    return {'count': len(samples),
+            'mean': sum(samples) / len(samples),
+            'p50': percentile(0.50),
+            'p99': percentile(0.99),
+            'max': samples[-1]}
+
+
+class RedisJob(object):
+
+    def __init__(self, queue, job_id):
+        """
+        View of a job stored in a Redis job queue.
+        :param queue: RedisJobQueue object
+        :param job_id: job identifier
+        """
+        self._queue = queue
+        self._id = job_id
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def status(self):
+        return self._queue.client.hget(self._queue.job_key(self._id),
+                                       'status')
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    @property
+    def result(self):
+        return self.to_dict().get('result')
+
+    def wait(self, timeout=None):
+        """
+        Block until the job is finished or the timeout expires, polling
+        its status.
+        :param timeout: maximum time to wait, in seconds
+        :return: True if the job is finished
+        """
+        deadline = time.time() + timeout if timeout is not None else None
+        while not self.finished:
+            if deadline and time.time() >= deadline:
+                return False
+            time.sleep(RedisJobQueue.POLL_INTERVAL)
+        return True
+
+    def to_dict(self):
+        """
+        Provides the job status, including the result if it's finished.
+        """
+        fields = self._queue.client.hgetall(self._queue.job_key(self._id))
+        status = json.loads(fields.get('description') or '{}')
+        status['job_id'] = self.id
+        status['status'] = fields.get('status')
+        for attr in ('submitted_at', 'started_at', 'finished_at'):
+            status[attr] = float(fields[attr]) if fields.get(attr) else None
+        if status['status'] == DONE:
+            status['result'] = fields.get('result')
+        elif status['status'] == FAILED:
+            status['error'] = fields.get('error')
+        return status
+
+
+class RedisJobQueue(object):
+
+    # interval between status checks of jobs being waited for
+    POLL_INTERVAL = 0.1
+
+    # interval between recoveries of the jobs of crashed workers, seconds
+    RECOVER_INTERVAL = 60
+
+    def __init__(self, client, namespace='son-validate:jobs',
+                 history_ttl=86400, inflight_ttl=3600, max_run_time=3600):
+        """
+        Initialize a queue of validation jobs stored in Redis, allowing
+        worker processes of several hosts to drain a shared backlog.
+        Job payloads and results must be JSON serializable strings.
+        :param client: Redis client, created with 'decode_responses=True'
+        :param namespace: prefix of the keys of this queue
+        :param history_ttl: time (in seconds) finished jobs are kept for
+                            status requests
+        :param inflight_ttl: time (in seconds) after which an unfinished
+                             job no longer deduplicates identical jobs,
+                             e.g. if its worker died
+        :param max_run_time: time (in seconds) after which a running job
+                             is considered lost, e.g. its worker died, and
+                             is queued again
+        """
+        self.client = client
+        self._ns = namespace
+        self._history_ttl = history_ttl
+        self._inflight_ttl = inflight_ttl
+        self._max_run_time = max_run_time
+
+    @property
+    def executor_type(self):
+        return 'redis'
+
+    def job_key(self, job_id):
+        return '{0}:job:{1}'.format(self._ns, job_id)
+
+    def _key(self, name):
+        return '{0}:{1}'.format(self._ns, name)
+
+    def submit(self, payload, key=None, description=None):
+        """
+        Submit a job to the queue. If an unfinished job with the same key
+        exists, no job is submitted and the existing job is returned.
+        :param payload: JSON serializable job payload, provided to the
+                        worker handler
+        :param key: deduplication key of identical jobs
+        :param description: dictionary describing the job
+        :return: RedisJob object
+        """
+        job_id = str(uuid.uuid4())
+        if key:
+            inflight_key = self._key('inflight:' + key)
+            if not self.client.set(inflight_key, job_id, nx=True,
+                                   ex=self._inflight_ttl):
+                existing = self.client.get(inflight_key)
+                if existing:
+                    log.debug("Job '{0}' already in flight".format(key))
+                    return RedisJob(self, existing)
+                # the in-flight job finished meanwhile
+                self.client.set(inflight_key, job_id, ex=self._inflight_ttl)
+
+        self.client.hset(self.job_key(job_id), mapping={
+            'status': QUEUED,
+            'submitted_at': time.time(),
+            'description': json.dumps(description or dict()),
+            'payload': json.dumps(payload),
+            'key': key or ''})
+        self.client.lpush(self._key('queue'), job_id)
+        return RedisJob(self, job_id)
+
+    def complete(self, result, description=None):
+        """
+        Register a job that is already finished, e.g. whose result was
+        already cached.
+        :return: RedisJob object
+        """
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        self.client.hset(self.job_key(job_id), mapping={
+            'status': DONE,
+            'submitted_at': now,
+            'started_at': now,
+            'finished_at': now,
+            'description': json.dumps(description or dict()),
+            'result': result})
+        self.client.expire(self.job_key(job_id), self._history_ttl)
+        return RedisJob(self, job_id)
+
+    def get(self, job_id):
+        """
+        Obtain the job of the provided id.
+        :return: RedisJob object, None if unknown
+        """
+        if not self.client.exists(self.job_key(job_id)):
+            return
+        return RedisJob(self, job_id)
+
+    def shutdown(self, wait=True):
+        pass
+
+    def fetch(self, timeout=5):
+        """
+        Take the next job from the queue and mark it as running. The job
+        is kept in the list of processed jobs until finished, so that it's
+        queued again if its worker dies, see 'recover'.
+        :param timeout: maximum time to wait for a job, in seconds
+        :return: tuple (job id, payload), None if the queue is empty
+        """
+        job_id = self.client.brpoplpush(self._key('queue'),
+                                        self._key('processing'),
+                                        timeout=timeout)
+        if not job_id:
+            return
+        job_key = self.job_key(job_id)
+
+        started_at = time.time()
+        self.client.hset(job_key, mapping={'status': RUNNING,
+                                           'started_at': started_at})
+        self.client.hincrby(self._key('stats'), 'running', 1)
+
+        submitted_at = self.client.hget(job_key, 'submitted_at')
+        self._add_latency('wait', started_at - float(submitted_at))
+
+        return job_id, json.loads(self.client.hget(job_key, 'payload'))
+
+    def finish(self, job_id, result=None, error=None):
+        """
+        Store the outcome of a job fetched by a worker.
+        """
+        job_key = self.job_key(job_id)
+        finished_at = time.time()
+        fields = {'status': FAILED if error else DONE,
+                  'finished_at': finished_at}
+        if error:
+            fields['error'] = error
+        elif result is not None:
+            fields['result'] = result
+        self.client.hset(job_key, mapping=fields)
+        # the payload (e.g. the validated artifact) is no longer needed
+        self.client.hdel(job_key, 'payload')
+        self.client.expire(job_key, self._history_ttl)
+
+        # stop deduplicating jobs against this one
+        key = self.client.hget(job_key, 'key')
+        if key:
+            inflight_key = self._key('inflight:' + key)
+            if self.client.get(inflight_key) == job_id:
+                self.client.delete(inflight_key)
+
+        stats_key = self._key('stats')
+        self.client.hincrby(stats_key, 'running', -1)
+        self.client.hincrby(stats_key, 'failed' if error else 'completed', 1)
+        started_at = self.client.hget(job_key, 'started_at')
+        if started_at:
+            self._add_latency('run', finished_at - float(started_at))
+
+        # acknowledge the job, once its outcome is stored
+        self.client.lrem(self._key('processing'), 1, job_id)
+
+    def recover(self):
+        """
+        Queue again the jobs taken by workers that didn't finish them
+        within 'max_run_time', e.g. because they died. Each job is
+        recovered by a single worker.
+        :return: number of jobs queued again
+        """
+        processing = self._key('processing')
+        now = time.time()
+        recovered = 0
+        for job_id in self.client.lrange(processing, 0, -1):
+            job_key = self.job_key(job_id)
+            status = self.client.hget(job_key, 'status')
+            # jobs just taken aren't marked as running yet
+            since = self.client.hget(job_key, 'started_at') or \
+                self.client.hget(job_key, 'submitted_at')
+            if status in (QUEUED, RUNNING) and \
+                    now - float(since) < self._max_run_time:
+                continue
+            if not self.client.lrem(processing, 1, job_id):
+                # recovered by another worker
+                continue
+            if status not in (QUEUED, RUNNING):
+                # finished but not acknowledged, or expired
+                continue
+
+            log.warning("Validation job '{0}' lost by its worker, queuing "
+                        "it again".format(job_id))
+            self.client.hset(job_key, 'status', QUEUED)
+            self.client.hdel(job_key, 'started_at')
+            if status == RUNNING:
+                self.client.hincrby(self._key('stats'), 'running', -1)
+            # taken next, as it was queued first
+            self.client.rpush(self._key('queue'), job_id)
+            recovered += 1
+        return recovered
+
+    def work(self, handler, max_jobs=None, timeout=5, stop=None):
+        """
+        Consume jobs from the queue until 'max_jobs' are processed or the
+        'stop' event is set.
+        :param handler: function invoked with the payload of each job.
+                        Its return value is the job result.
+        :param max_jobs: maximum number of jobs to process (None:
+                         unlimited)
+        :param timeout: maximum time to wait for each job, in seconds
+        :param stop: threading.Event to stop the worker
+        :return: number of processed jobs
+        """
+        processed = 0
+        recovered_at = 0
+        while not (stop and stop.is_set()):
+            if time.time() - recovered_at >= self.RECOVER_INTERVAL:
+                self.recover()
+                recovered_at = time.time()
+
+            fetched = self.fetch(timeout=timeout)
+            if not fetched:
+                continue
+            job_id, payload = fetched
+
+            result = error = None
+            try:
+                result = handler(payload)
+            except Exception as e:
+                log.exception("Validation job '{0}' failed".format(job_id))
+                error = str(e) or type(e).__name__
+            self.finish(job_id, result=result, error=error)
+
+            processed += 1
+            if max_jobs and processed >= max_jobs:
+                break
+        return processed
+
+    def report_profile(self, profile):
+        """
+        Report the profile of a validation run by a worker, to be recorded
+        in the metrics of the service, see 'collect_profiles'. Profiles
+        not collected are bounded to the most recent LATENCY_WINDOW.
+        :param profile: JSON serializable profile dictionary
+        """
+        key = self._key('profiles')
+        self.client.lpush(key, json.dumps(profile))
+        self.client.ltrim(key, 0, LATENCY_WINDOW - 1)
+
+    def collect_profiles(self):
+        """
+        Provides the validation profiles reported by the workers since the
+        last collection, each one being provided to a single collector.
+        :return: list of profile dictionaries, oldest first
+        """
+        key = self._key('profiles')
+        pipe = self.client.pipeline(transaction=True)
+        pipe.lrange(key, 0, -1)
+        pipe.delete(key)
+        profiles = pipe.execute()[0]
+        return [json.loads(profile) for profile in reversed(profiles)]
+
+    def stats(self):
+        """
+        Provides statistics of the queue, shared by all its workers.
+        :return: statistics dictionary, as in JobQueue.stats
+        """
+        counters = self.client.hgetall(self._key('stats'))
+        return {'executor': self.executor_type,
+                'workers': None,
+                'queue_depth': self.client.llen(self._key('queue')),
+                'running': int(counters.get('running', 0)),
+                'completed': int(counters.get('completed', 0)),
+                'failed': int(counters.get('failed', 0)),
+                'latency': {
+                    'wait': latency_stats(self._latencies('wait')),
+                    'run': latency_stats(self._latencies('run'))}}
+
+    def _add_latency(self, name, value):
+        key = self._key('latency:' + name)
+        self.client.lpush(key, value)
+        self.client.ltrim(key, 0, LATENCY_WINDOW - 1)
+
+    def _latencies(self, name):
+        return [float(value) for value in
+                self.client.lrange(self._key('latency:' + name), 0, -1)]
@@ -0,0 +1,166 @@
+import time
+import logging
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, \
+    ProcessCollector, generate_latest, CONTENT_TYPE_LATEST
+from son.validate.util import resident_memory
+
+log = logging.getLogger(__name__)
+
+NAMESPACE = 'son_validate_api'
+
+# buckets of durations, in seconds
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                    2.5, 5.0, 10.0, 30.0, 60.0, float('inf'))
+
+# buckets of memory growth, in bytes (64 KB to 1 GB)
+MEMORY_BUCKETS = tuple(64 * 1024 * 4 ** n for n in range(8)) + \
+    (float('inf'),)
+
+# CPU time of the calling thread, if supported
+thread_time = getattr(time, 'thread_time', time.process_time)
+
+
+class ValidationProfile(object):
+
+    def __init__(self, object_type):
+        """
+        Profile of a single validation: durations of its stages and the
+        resources it used. It is registered as a listener of the event
+        context of the validator, and measures the thread it runs in.
+        The profile is exported as a (picklable) dictionary, as the
+        validation may run in a worker process.
+        :param object_type: type of the validated object
+        """
+        self.object_type = object_type
+        self.stages = list()
+        self._cpu = None
+        self._memory = None
+        self.cpu_seconds = None
+        self.memory_bytes = None
+
+    def __call__(self, record):
+        if record['type'] == 'stage' and 'duration' in record:
+            self.stages.append((record['object_type'], record['stage'],
+                                record['duration']))
+
+    def add_stage(self, stage, duration, object_type=None):
+        self.stages.append((object_type or self.object_type, stage,
+                            duration))
+
+    def start(self):
+        self._cpu = thread_time()
+        self._memory = resident_memory()
+
+    def stop(self):
+        self.cpu_seconds = thread_time() - self._cpu
+        # memory released by the validation isn't accounted
+        self.memory_bytes = max(resident_memory() - self._memory, 0)
+
+    def to_dict(self):
+        return {'object_type': self.object_type,
+                'stages': list(self.stages),
+                'cpu_seconds': self.cpu_seconds,
+                'memory_bytes': self.memory_bytes}
+
+
+class ValidationMetrics(object):
+
+    def __init__(self, registry=None):
+        """
+        Prometheus metrics of the validation service.
+        :param registry: collector registry of the metrics. By default, a
+                         new registry is created, including the metrics of
+                         the process (CPU, memory, etc.).
+        """
+        if registry is None:
+            registry = CollectorRegistry()
+            ProcessCollector(registry=registry)
+        self.registry = registry
+
+        self.requests = Counter(
+            'requests_total', 'Requests handled by the service',
+            ['endpoint', 'method', 'status'], namespace=NAMESPACE,
+            registry=registry)
+        self.request_duration = Histogram(
+            'request_duration_seconds', 'Time to handle a request',
+            ['endpoint'], namespace=NAMESPACE, buckets=DURATION_BUCKETS,
+            registry=registry)
+        self.result_cache = Counter(
+            'result_cache_requests_total',
+            'Lookups of cached validation results, by result (hit, miss)',
+            ['result'], namespace=NAMESPACE, registry=registry)
+        self.queue_depth = Gauge(
+            'job_queue_depth', 'Validation jobs waiting in the job queue',
+            namespace=NAMESPACE, registry=registry)
+        self.jobs_running = Gauge(
+            'jobs_running', 'Validation jobs running',
+            namespace=NAMESPACE, registry=registry)
+        self.stage_duration = Histogram(
+            'stage_duration_seconds',
+            'Duration of the validation stages (struct, signature, syntax, '
+            'integrity, topology and report generation)',
+            ['object_type', 'stage'], namespace=NAMESPACE,
+            buckets=DURATION_BUCKETS, registry=registry)
+        self.validation_cpu = Histogram(
+            'validation_cpu_seconds', 'CPU time of a validation',
+            ['object_type'], namespace=NAMESPACE, buckets=DURATION_BUCKETS,
+            registry=registry)
+        self.validation_memory = Histogram(
+            'validation_memory_bytes',
+            'Growth of the resident memory of the process during a '
+            'validation', ['object_type'], namespace=NAMESPACE,
+            buckets=MEMORY_BUCKETS, registry=registry)
+
+        self._job_queue = None
+
+    @property
+    def content_type(self):
+        return CONTENT_TYPE_LATEST
+
+    def track_job_queue(self, job_queue):
+        """
+        Export the depth and running jobs of a job queue, read when the
+        metrics are collected, along with the profiles of the validations
+        run by its (remote) workers.
+        :param job_queue: JobQueue or RedisJobQueue
+        """
+        self._job_queue = job_queue
+
+    def observe_request(self, endpoint, method, status, duration):
+        self.requests.labels(endpoint, method, status).inc()
+        self.request_duration.labels(endpoint).observe(duration)
+
+    def observe_cache(self, hit):
+        self.result_cache.labels('hit' if hit else 'miss').inc()
+
+    def observe_stage(self, object_type, stage, duration):
+        self.stage_duration.labels(object_type, stage).observe(duration)
+
+    def observe_validation(self, profile):
+        """
+        Record the profile of a validation.
+        :param profile: profile dictionary, see ValidationProfile
+        """
+        for object_type, stage, duration in profile['stages']:
+            self.observe_stage(object_type, stage, duration)
+        if profile['cpu_seconds'] is not None:
+            self.validation_cpu.labels(profile['object_type']).observe(
+                profile['cpu_seconds'])
+        if profile['memory_bytes'] is not None:
+            self.validation_memory.labels(profile['object_type']).observe(
+                profile['memory_bytes'])
+
+    def export(self):
+        """
+        Provides the metrics in the Prometheus text format.
+        """
+        if self._job_queue:
+            try:
+                stats = self._job_queue.stats()
+                self.queue_depth.set(stats['queue_depth'])
+                self.jobs_running.set(stats['running'])
+                for profile in self._job_queue.collect_profiles():
+                    self.observe_validation(profile)
+            except Exception:
+                log.exception("Failed to read job queue statistics")
+        return generate_latest(self.registry)
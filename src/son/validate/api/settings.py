@@ -9,5 +9,21 @@ REDIS_PASSWD = os.environ.get('VAPI_REDIS_PASSWORD') or ''
 CACHE_TYPE = os.environ.get('VAPI_CACHE_TYPE') or 'redis'
 ARTIFACTS_DIR = os.environ.get('VAPI_ARTIFACTS_DIR') or \
                 os.path.join(os.getcwd(), 'artifacts')
+ARTIFACTS_MAX_SIZE = int(os.environ.get('VAPI_ARTIFACTS_MAX_SIZE') or 1024)
+ARTIFACTS_MAX_AGE = int(os.environ.get('VAPI_ARTIFACTS_MAX_AGE') or 3600)
+ARTIFACTS_IN_PLACE = (os.environ.get('VAPI_ARTIFACTS_IN_PLACE') or
+                      'true').lower() in ('true', '1', 'yes')
+
+TOPOLOGY_CACHE_SIZE = int(os.environ.get('VAPI_TOPOLOGY_CACHE_SIZE') or 10)
+GZIP_MIN_SIZE = int(os.environ.get('VAPI_GZIP_MIN_SIZE') or 1024)
+
+JOB_QUEUE = os.environ.get('VAPI_JOB_QUEUE') or 'local'
+JOB_WORKERS = int(os.environ.get('VAPI_JOB_WORKERS') or 4)
+JOB_EXECUTOR = os.environ.get('VAPI_JOB_EXECUTOR') or 'thread'
+JOB_HISTORY_SIZE = int(os.environ.get('VAPI_JOB_HISTORY_SIZE') or 1000)
+JOB_HISTORY_TTL = int(os.environ.get('VAPI_JOB_HISTORY_TTL') or 86400)
+JOB_MAX_WAIT = int(os.environ.get('VAPI_JOB_MAX_WAIT') or 30)
+
+WATCH_DEBOUNCE = float(os.environ.get('VAPI_WATCH_DEBOUNCE') or 0.5)
 
 DEBUG = os.environ.get('VAPI_DEBUG') or False
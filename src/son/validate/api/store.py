@@ -0,0 +1,168 @@
+import pickle
+import logging
+import threading
+from collections import OrderedDict
+
+log = logging.getLogger(__name__)
+
+
+class MemoryStore(object):
+
+    def __init__(self):
+        """
+        Initialize an in-memory store of the validation service. Items of
+        a collection (e.g. 'resources') are stored and updated per key and
+        field, instead of replacing the whole collection.
+        """
+        self._collections = dict()
+        self._lists = dict()
+        self._lock = threading.Lock()
+
+    def clear(self, collection=None):
+        """
+        Remove all items of a collection (or of all collections).
+        """
+        with self._lock:
+            if collection:
+                self._collections.pop(collection, None)
+                self._lists.pop(collection, None)
+            else:
+                self._collections.clear()
+                self._lists.clear()
+
+    def hset(self, collection, key, **fields):
+        """
+        Set fields of an item, creating it if it doesn't exist.
+        Other fields of the item are kept.
+        """
+        with self._lock:
+            items = self._collections.setdefault(collection, OrderedDict())
+            items.setdefault(key, dict()).update(fields)
+
+    def hget(self, collection, key, field=None):
+        """
+        Obtain an item, or one of its fields.
+        :return: copy of the item fields dict, field value or None if
+                 it doesn't exist
+        """
+        with self._lock:
+            item = self._collections.get(collection, dict()).get(key)
+            if item is None:
+                return
+            return item.get(field) if field else dict(item)
+
+    def exists(self, collection, key):
+        with self._lock:
+            return key in self._collections.get(collection, dict())
+
+    def items(self, collection):
+        """
+        Provides all items of a collection.
+        :return: list of tuples (key, item fields dict)
+        """
+        with self._lock:
+            return [(key, dict(item)) for key, item in
+                    self._collections.get(collection, dict()).items()]
+
+    def append(self, collection, value):
+        """
+        Append a value to a list collection.
+        """
+        with self._lock:
+            self._lists.setdefault(collection, list()).append(value)
+
+    def members(self, collection):
+        """
+        Provides the values of a list collection, in insertion order.
+        """
+        with self._lock:
+            return list(self._lists.get(collection, list()))
+
+
+class RedisStore(object):
+
+    def __init__(self, client, namespace='son-validate'):
+        """
+        Initialize a store of the validation service in Redis.
+        Each item is a Redis hash, so that a field is updated atomically
+        without transferring the rest of the collection. The keys of each
+        collection are indexed in a Redis set. Field values are pickled.
+        :param client: Redis client, created with 'decode_responses=False'
+        :param namespace: prefix of the Redis keys of the store
+        """
+        self._client = client
+        self._ns = namespace
+
+    def _key(self, collection, key=None):
+        if key is None:
+            return '{0}:{1}'.format(self._ns, collection)
+        return '{0}:{1}:{2}'.format(self._ns, collection, key)
+
+    def clear(self, collection=None):
+        """
+        Remove all items of a collection (or of all collections).
+        """
+        pattern = self._key(collection) + '*' if collection \
+            else self._ns + ':*'
+        keys = list(self._client.scan_iter(match=pattern))
+        if keys:
+            self._client.delete(*keys)
+
+    def hset(self, collection, key, **fields):
+        """
+        Set fields of an item, creating it if it doesn't exist.
+        Other fields of the item are kept.
+        """
+        pipe = self._client.pipeline(transaction=True)
+        pipe.hset(self._key(collection, key), mapping={
+            field: pickle.dumps(value) for field, value in fields.items()})
+        pipe.sadd(self._key(collection), key)
+        pipe.execute()
+
+    def hget(self, collection, key, field=None):
+        """
+        Obtain an item, or one of its fields.
+        :return: item fields dict, field value or None if it doesn't exist
+        """
+        if field:
+            value = self._client.hget(self._key(collection, key), field)
+            return pickle.loads(value) if value is not None else None
+
+        fields = self._client.hgetall(self._key(collection, key))
+        if not fields:
+            return
+        return self._load(fields)
+
+    def exists(self, collection, key):
+        return bool(self._client.exists(self._key(collection, key)))
+
+    def items(self, collection):
+        """
+        Provides all items of a collection.
+        :return: list of tuples (key, item fields dict)
+        """
+        keys = sorted(key.decode('utf-8') if type(key) is bytes else key
+                      for key in self._client.smembers(self._key(collection)))
+        pipe = self._client.pipeline(transaction=False)
+        for key in keys:
+            pipe.hgetall(self._key(collection, key))
+        return [(key, self._load(fields))
+                for key, fields in zip(keys, pipe.execute()) if fields]
+
+    def append(self, collection, value):
+        """
+        Append a value to a list collection.
+        """
+        self._client.rpush(self._key(collection), pickle.dumps(value))
+
+    def members(self, collection):
+        """
+        Provides the values of a list collection, in insertion order.
+        """
+        return [pickle.loads(value) for value in
+                self._client.lrange(self._key(collection), 0, -1)]
+
+    @staticmethod
+    def _load(fields):
+        return {(field.decode('utf-8') if type(field) is bytes else field):
+                pickle.loads(value) for field, value in fields.items()}
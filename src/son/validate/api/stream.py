@@ -0,0 +1,89 @@
+import json
+import queue
+import logging
+
+log = logging.getLogger(__name__)
+
+# formats of the event streams: server-sent events and JSON lines
+FORMATS = {'sse': 'text/event-stream',
+           'jsonl': 'application/x-ndjson'}
+
+# time to wait for a record before sending a keep-alive, in seconds
+HEARTBEAT = 15
+
+
+class EventStream(object):
+
+    def __init__(self, fmt='jsonl', heartbeat=HEARTBEAT):
+        """
+        Stream of the progress records of a validation (events, stages and
+        the final result), pushed by the validating thread and consumed,
+        as they are produced, by the response of a request.
+        :param fmt: format of the stream, 'sse' or 'jsonl'
+        :param heartbeat: time, in seconds, after which a keep-alive is
+                          sent if no record was produced. Keep-alives are
+                          only sent by 'sse' streams.
+        """
+        assert fmt in FORMATS
+        self.format = fmt
+        self.heartbeat = heartbeat
+        self._queue = queue.Queue()
+        self._job = None
+        self._outcome = None
+
+    @property
+    def mimetype(self):
+        return FORMATS[self.format]
+
+    def put(self, record):
+        """
+        Push a record to the stream. It may be registered as a listener of
+        an event context.
+        :param record: dictionary, with its kind in the 'type' key
+        """
+        self._queue.put(record)
+
+    def close(self):
+        """
+        End the stream, once all pushed records are consumed.
+        """
+        self._queue.put(None)
+
+    def follow(self, job, outcome):
+        """
+        End the stream with the outcome of a job, once the job is finished
+        and the records pushed before are consumed. The job is waited for
+        by the consumer of the stream, e.g. if it's run by another process
+        whose records can't be pushed.
+        :param job: job object, see son.validate.api.jobs
+        :param outcome: function providing the record of the finished job
+        """
+        self._job = job
+        self._outcome = outcome
+
+    def __iter__(self):
+        while True:
+            if self._job and self._queue.empty():
+                if not self._job.wait(self.heartbeat):
+                    if self.format == 'sse':
+                        yield ': keep-alive\n\n'
+                    continue
+                self.put(self._outcome(self._job))
+                self.close()
+                self._job = None
+            try:
+                record = self._queue.get(timeout=self.heartbeat)
+            except queue.Empty:
+                if self.format == 'sse':
+                    yield ': keep-alive\n\n'
+                continue
+            if record is None:
+                return
+            yield self.format_record(record, self.format)
+
+    @staticmethod
+    def format_record(record, fmt):
+        data = json.dumps(record, sort_keys=True)
+        if fmt == 'sse':
+            return 'event: {0}\ndata: {1}\n\n'.format(record['type'], data)
+        return data + '\n'
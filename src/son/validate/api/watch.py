@@ -0,0 +1,112 @@
+import os
+import logging
+import threading
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
+
+log = logging.getLogger(__name__)
+
+# default time to wait for further changes before validating
+DEBOUNCE = 0.5
+
+# extensions of the descriptor files of watched directories
+EXTENSIONS = ('.yml', '.yaml')
+
+
+class ValidateWatcher(FileSystemEventHandler):
+
+    def __init__(self, path, callback, debounce=DEBOUNCE, observer=True):
+        """
+        Watch a validation object (project, package, service or function)
+        for changes. Bursts of changes, e.g. by an editor saving files, are
+        coalesced: the callback is invoked once no change occurred for
+        'debounce' seconds, with the set of changed files. The watcher
+        keeps observing the object until stopped.
+        :param path: watched file or directory
+        :param callback: function invoked with (path, set of changed files)
+        :param debounce: time to wait for further changes, in seconds
+        :param observer: start a filesystem observer. If False, changes
+                         must be notified with 'changed'.
+        """
+        self.path = path
+        self.callback = callback
+        self.debounce = debounce
+
+        # files are watched through their directory
+        self.filename = None
+        watch_dir = path
+        if os.path.isfile(path):
+            self.filename = os.path.basename(path)
+            watch_dir = os.path.dirname(os.path.abspath(path))
+
+        self._changes = set()
+        self._timer = None
+        self._lock = threading.Lock()
+        # callbacks of the same watcher don't overlap
+        self._run_lock = threading.Lock()
+
+        self.observer = None
+        if observer:
+            self.observer = Observer()
+            self.observer.schedule(self, watch_dir,
+                                   recursive=False if self.filename else True)
+            self.observer.start()
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        self.changed(event.src_path)
+        dest_path = getattr(event, 'dest_path', None)
+        if dest_path:
+            self.changed(dest_path)
+
+    def changed(self, path):
+        """
+        Notify the change of a file, (re)starting the debounce timer.
+        Changes of files other than descriptors are ignored.
+        :param path: modified, created or removed file
+        """
+        name = os.path.basename(path)
+        if self.filename:
+            if name != self.filename:
+                return
+        # only descriptors of watched directories are validated, ignoring
+        # other files (e.g. of git or editors) and hidden directories
+        elif not name.endswith(EXTENSIONS) or \
+                any(part.startswith('.') for part in
+                    os.path.relpath(path, self.path).split(os.sep)):
+            return
+
+        with self._lock:
+            self._changes.add(path)
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self._flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush(self):
+        with self._run_lock:
+            with self._lock:
+                changes = self._changes
+                self._changes = set()
+                self._timer = None
+            if not changes:
+                return
+
+            log.debug("Changes in watched path '{0}': {1}"
+                      .format(self.path, changes))
+            try:
+                self.callback(self.path, changes)
+            except Exception:
+                log.exception("Failed to validate watched path '{0}'"
+                              .format(self.path))
+
+    def stop(self):
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+        if self.observer:
+            self.observer.stop()
+            self.observer.join()
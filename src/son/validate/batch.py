@@ -0,0 +1,274 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+import os
+import glob
+import json
+import time
+import shutil
+import logging
+import tempfile
+import traceback
+import multiprocessing
+from xml.etree import ElementTree
+from son.validate.validate import Validator
+from son.workspace.workspace import Workspace
+
+log = logging.getLogger(__name__)
+
+OBJECT_TYPES = ['project', 'package', 'service', 'function']
+
+# configuration of the validations of the calling process (or worker)
+_config = None
+_workspace = None
+
+
+def infer_type(path):
+    """
+    Infer the type of a validation target: packages ('.son' files) and
+    projects (directories with a project descriptor).
+    :return: object type or None if it can't be inferred
+    """
+    if os.path.isfile(path) and path.endswith('.son'):
+        return 'package'
+    if os.path.isdir(path) and \
+            os.path.isfile(os.path.join(path, 'project.yml')):
+        return 'project'
+
+
+def expand_targets(patterns, obj_type=None, dext='yml'):
+    """
+    Expand the targets of a batch validation. Glob patterns are expanded
+    (recursively with '**') and function directories are expanded into
+    their descriptor files, so that each function is validated separately.
+    :param patterns: paths or glob patterns
+    :param obj_type: type of all targets. If None, it is inferred for each
+                     target, see 'infer_type'.
+    :param dext: extension of the descriptor files of function directories
+    :return: list of (path, object type) tuples. Unknown types are None.
+    """
+    targets = []
+    for pattern in patterns:
+        paths = sorted(glob.glob(pattern, recursive=True)) \
+            if glob.has_magic(pattern) else [pattern]
+        if not paths:
+            log.warning("No targets match '{0}'".format(pattern))
+
+        for path in paths:
+            target_type = obj_type or infer_type(path)
+            if target_type == 'function' and os.path.isdir(path):
+                targets.extend(
+                    (filepath, 'function') for filepath in sorted(glob.glob(
+                        os.path.join(path, '**', '*.' + dext),
+                        recursive=True)))
+                continue
+            targets.append((path, target_type))
+
+    return targets
+
+
+def _init_worker(config):
+    """
+    Initialize a worker of the batch: load the workspace and the resources
+    shared by its validators (parsed schemas and event configuration).
+    """
+    global _config, _workspace
+    _config = config
+
+    _workspace = None
+    if config['workspace_path']:
+        _workspace = Workspace.__create_from_descriptor__(
+            config['workspace_path'])
+    if not _workspace:
+        _workspace = Workspace('.', log_level='info')
+    # progress of each validation isn't of interest in a batch
+    if not config['debug']:
+        _workspace.log_level = 'warning'
+
+    Validator(workspace=_workspace)
+
+
+def validate_target(target):
+    """
+    Validate a target of the batch, in the configuration of the worker.
+    Failures are reported in the result, not raised.
+    :param target: tuple (index, path, object type)
+    :return: result dictionary
+    """
+    index, path, obj_type = target
+    result = {'index': index, 'target': path, 'type': obj_type,
+              'error_count': 0, 'warning_count': 0}
+    start = time.time()
+
+    # files extracted from packages are removed after each target
+    tmp_dir = tempfile.mkdtemp(prefix='son-validate-batch-')
+    prev_tmp_dir = tempfile.tempdir
+    tempfile.tempdir = tmp_dir
+    try:
+        if not os.path.exists(path):
+            raise ValueError("Target '{0}' doesn't exist".format(path))
+        if obj_type not in OBJECT_TYPES:
+            raise ValueError("Unknown type of target '{0}'".format(path))
+
+        validator = Validator(workspace=_workspace)
+        validator.configure(syntax=_config['syntax'],
+                            integrity=_config['integrity'],
+                            topology=_config['topology'],
+                            dpath=_config['dpath'], dext=_config['dext'],
+                            debug=True if _config['debug'] else None,
+                            max_event_details=_config['max_event_details'])
+
+        valid = getattr(validator, 'validate_' + obj_type)(path)
+        result['status'] = 'passed' if valid and \
+            not validator.error_count else 'failed'
+        result['error_count'] = validator.error_count
+        result['warning_count'] = validator.warning_count
+        result['errors'] = validator.errors
+        result['warnings'] = validator.warnings
+
+    except Exception as e:
+        result['status'] = 'error'
+        result['message'] = str(e)
+        if not isinstance(e, ValueError):
+            result['traceback'] = traceback.format_exc()
+
+    finally:
+        tempfile.tempdir = prev_tmp_dir
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    result['duration'] = time.time() - start
+    return result
+
+
+def validate_batch(targets, jobs=None, syntax=True, integrity=True,
+                   topology=True, workspace_path=None, dpath=None,
+                   dext=None, max_event_details=None, debug=False,
+                   progress=None):
+    """
+    Validate many targets across a pool of worker processes. Each worker
+    keeps its schemas loaded for all its validations. Validation carries on
+    past failures.
+    :param targets: list of (path, object type) tuples, see
+                    'expand_targets'
+    :param jobs: number of worker processes. Default: number of CPUs.
+                 With 1 job, targets are validated by the calling process.
+    :param progress: function called with the result of each target, as
+                     it's validated
+    :return: summary dictionary, with the results of all targets
+    """
+    config = {'syntax': syntax, 'integrity': integrity,
+              'topology': topology, 'workspace_path': workspace_path,
+              'dpath': dpath, 'dext': dext,
+              'max_event_details': max_event_details, 'debug': debug}
+    jobs = max(1, min(jobs or multiprocessing.cpu_count(), len(targets) or 1))
+    tasks = [(index, path, obj_type)
+             for index, (path, obj_type) in enumerate(targets)]
+
+    start = time.time()
+    results = [None] * len(tasks)
+    if jobs == 1:
+        _init_worker(config)
+        outcomes = map(validate_target, tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(jobs, initializer=_init_worker,
+                                    initargs=(config,))
+        outcomes = pool.imap_unordered(validate_target, tasks)
+
+    try:
+        for result in outcomes:
+            results[result.pop('index')] = result
+            if progress:
+                progress(result)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    counts = {status: len([r for r in results if r['status'] == status])
+              for status in ('passed', 'failed', 'error')}
+    return {'targets': len(results),
+            'passed': counts['passed'],
+            'failed': counts['failed'],
+            'errors': counts['error'],
+            'jobs': jobs,
+            'duration': time.time() - start,
+            'results': results}
+
+
+def write_json(summary, filename):
+    with open(filename, 'w') as _f:
+        json.dump(summary, _f, sort_keys=True, indent=4,
+                  separators=(',', ': '))
+        _f.write('\n')
+
+
+def write_junit(summary, filename):
+    """
+    Write the summary of a batch validation as a JUnit XML report: each
+    target is a test case, failing if the validation reported errors.
+    """
+    suite = ElementTree.Element(
+        'testsuite', name='son-validate', tests=str(summary['targets']),
+        failures=str(summary['failed']), errors=str(summary['errors']),
+        time='{0:.3f}'.format(summary['duration']))
+
+    for result in summary['results']:
+        case = ElementTree.SubElement(
+            suite, 'testcase', classname='son-validate.{0}'
+            .format(result['type']), name=result['target'],
+            time='{0:.3f}'.format(result['duration']))
+
+        if result['status'] == 'failed':
+            failure = ElementTree.SubElement(
+                case, 'failure', message="{0} error(s), {1} warning(s)"
+                .format(result['error_count'], result['warning_count']))
+            failure.text = '\n'.join(
+                '{0}: {1}'.format(event['header'], detail['message'])
+                for event in result['errors']
+                for detail in event['detail'] or [{'message': ''}])
+        elif result['status'] == 'error':
+            error = ElementTree.SubElement(case, 'error',
+                                           message=result['message'])
+            error.text = result.get('traceback')
+
+        if result.get('warnings'):
+            output = ElementTree.SubElement(case, 'system-out')
+            output.text = '\n'.join(
+                'WARNING {0}: {1}'.format(event['header'], detail['message'])
+                for event in result['warnings']
+                for detail in event['detail'] or [{'message': ''}])
+
+    ElementTree.ElementTree(suite).write(filename, encoding='utf-8',
+                                         xml_declaration=True)
+
+
+def print_progress(result):
+    print("{0:<7} {1} [{2} error(s), {3} warning(s), {4:.2f}s]{5}"
+          .format(result['status'].upper(), result['target'],
+                  result['error_count'], result['warning_count'],
+                  result['duration'],
+                  ': ' + result['message'] if 'message' in result else ''))
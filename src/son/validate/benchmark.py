@@ -0,0 +1,701 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+import gc
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import logging
+import argparse
+import resource
+import tempfile
+import tracemalloc
+import itertools
+import multiprocessing
+import yaml
+import networkx as nx
+from son.validate import event
+from son.validate import cycles as fgcycles
+from son.validate.validate import Validator
+from son.schema.validator import clear_schema_cache
+from son.validate.storage import DescriptorStorage
+from son.validate.util import resident_memory
+from son.workspace.workspace import Workspace
+
+log = logging.getLogger(__name__)
+
+
+def latency_summary(samples):
+    """
+    Summarize latency samples.
+    :param samples: list of durations, in seconds
+    :return: dictionary with count, and mean, p50, p99 and max in msec
+    """
+    samples = sorted(samples)
+    if not samples:
+        return {'count': 0}
+
+    def percentile(p):
+        return samples[min(len(samples) - 1, int(p * len(samples)))] * 1000
+
+    return {'count': len(samples),
+            'mean_ms': sum(samples) / len(samples) * 1000,
+            'p50_ms': percentile(0.50),
+            'p99_ms': percentile(0.99),
+            'max_ms': samples[-1] * 1000}
+
+
+def bench_requests(path, obj_type, runs=50, warm=True, workspace=None,
+                   syntax=True, integrity=True, topology=True):
+    """
+    Time validations as performed by the validation service: a new
+    validator is created for each validation (request).
+    :param path: path of the object to validate
+    :param obj_type: 'project', 'package', 'service' or 'function'
+    :param runs: number of validations
+    :param warm: if False, the resources shared by validators (parsed
+                 schemas and event configuration) are dropped before each
+                 validation, as if they were loaded for every request
+    :param workspace: workspace of the validators
+    :return: latency summary, as in 'latency_summary'
+    """
+    samples = []
+    for _ in range(runs):
+        if not warm:
+            clear_schema_cache()
+            event.clear_eventcfg_cache()
+
+        start = time.perf_counter()
+        validator = Validator(workspace=workspace)
+        validator.configure(syntax, integrity, topology)
+        validator.dpath = None
+        getattr(validator, 'validate_' + obj_type)(path)
+        samples.append(time.perf_counter() - start)
+
+    return latency_summary(samples)
+
+
+def write_synthetic_service(root, num_vnfs, num_vdus, num_cps=2,
+                            num_bridges=0, num_paths=0, cycle_density=0.0,
+                            seed=0, prefix=''):
+    """
+    Writes a synthetic service to the specified directory. The service
+    chains 'num_vnfs' functions, each with 'num_vdus' units. Every unit
+    exposes an input and an output interface, linked to a matching
+    connection point of its function.
+    Additional interfaces of the units are exposed by their function as
+    'vdu<u>-cp<k>' and may be attached to E-LAN bridges of the service.
+    A fraction of the functions, given by 'cycle_density', is linked back
+    to an earlier function (at least two hops away). Forwarding paths
+    take these links in turn, closing cycles between functions.
+    :param root: directory of the service
+    :param num_vnfs: number of functions
+    :param num_vdus: number of units per function
+    :param num_cps: number of connection points per unit (at least 2)
+    :param num_bridges: number of E-LAN bridges of the service. Requires
+                        at least 3 connection points per unit.
+    :param num_paths: number of forwarding paths. The first path follows
+                      the chain of functions. If 0, the service has no
+                      forwarding graphs.
+    :param cycle_density: fraction of functions linked back, from 0 to 1
+    :param seed: seed of the random placement of the back links
+    :param prefix: prefix of the names of the service and its functions,
+                   e.g. to write distinct services of a catalogue
+    :return: service descriptor filename, list of function filenames
+    """
+    if num_vnfs < 1 or num_vdus < 1:
+        raise ValueError("A synthetic service requires at least one "
+                         "function and one unit per function")
+    if num_cps < 2:
+        raise ValueError("Units require at least 2 connection points")
+    if num_bridges and num_cps < 3:
+        raise ValueError("Bridges require at least 3 connection points "
+                         "per unit")
+
+    rand = random.Random(seed)
+    functions_dir = os.path.join(root, 'functions')
+    os.makedirs(functions_dir, exist_ok=True)
+
+    vnfd_files = []
+    network_functions = []
+    virtual_links = []
+    prev_cp = 'input'
+    extra_cps = ['cp{0}'.format(k) for k in range(2, num_cps)]
+
+    for f in range(num_vnfs):
+        vdus = []
+        cps = []
+        vlinks = []
+        for u in range(num_vdus):
+            vdus.append({'id': 'vdu{0}'.format(u),
+                         'vm_image': 'image',
+                         'connection_points': [{'id': d} for d in
+                                               ['in', 'out'] + extra_cps]})
+            for d in ['in', 'out'] + extra_cps:
+                if d in ('in', 'out'):
+                    cp = '{0}{1}'.format(d, u)
+                else:
+                    cp = 'vdu{0}-{1}'.format(u, d)
+                cps.append({'id': cp})
+                vlinks.append({'id': 'vl-' + cp,
+                               'connectivity_type': 'E-Line',
+                               'connection_points_reference':
+                                   ['vdu{0}:{1}'.format(u, d), cp]})
+
+        vnfd = {'descriptor_version': 'vnfd-schema-01',
+                'vendor': 'eu.sonata-nfv',
+                'name': '{0}vnf{1}'.format(prefix, f),
+                'version': '0.1', 'virtual_deployment_units': vdus,
+                'connection_points': cps, 'virtual_links': vlinks}
+        vnfd_file = os.path.join(functions_dir,
+                                 '{0}vnf{1}.yml'.format(prefix, f))
+        with open(vnfd_file, 'w') as _f:
+            yaml.dump(vnfd, _f)
+        vnfd_files.append(vnfd_file)
+
+        vnf_id = 'vnf_{0}'.format(f)
+        network_functions.append({'vnf_id': vnf_id,
+                                  'vnf_vendor': 'eu.sonata-nfv',
+                                  'vnf_name': '{0}vnf{1}'.format(prefix, f),
+                                  'vnf_version': '0.1'})
+        for u in range(num_vdus):
+            virtual_links.append(
+                {'id': 'vl-{0}-{1}'.format(vnf_id, u),
+                 'connectivity_type': 'E-Line',
+                 'connection_points_reference':
+                     [prev_cp, '{0}:in{1}'.format(vnf_id, u)]})
+            prev_cp = '{0}:out{1}'.format(vnf_id, u)
+
+    virtual_links.append({'id': 'vl-output',
+                          'connectivity_type': 'E-Line',
+                          'connection_points_reference': [prev_cp, 'output']})
+
+    # bridges are spread over the units and their additional interfaces
+    for b in range(num_bridges):
+        u = b % num_vdus
+        d = extra_cps[(b // num_vdus) % len(extra_cps)]
+        virtual_links.append(
+            {'id': 'br{0}'.format(b),
+             'connectivity_type': 'E-LAN',
+             'connection_points_reference':
+                 ['vnf_{0}:vdu{1}-{2}'.format(f, u, d)
+                  for f in range(num_vnfs)]})
+
+    # links back from the output of a function to the input of an
+    # earlier one: (from function, to function)
+    last_out = 'out{0}'.format(num_vdus - 1)
+    back_links = []
+    for f in range(2, num_vnfs):
+        if rand.random() < cycle_density:
+            back_links.append((f, rand.randint(0, f - 2)))
+    for src, dst in back_links:
+        virtual_links.append(
+            {'id': 'vl-back-{0}-{1}'.format(src, dst),
+             'connectivity_type': 'E-Line',
+             'connection_points_reference':
+                 ['vnf_{0}:{1}'.format(src, last_out),
+                  'vnf_{0}:in0'.format(dst)]})
+
+    nsd = {'descriptor_version': '1.0',
+           'vendor': 'eu.sonata-nfv', 'name': prefix + 'synthetic',
+           'version': '0.1',
+           'network_functions': network_functions,
+           'connection_points': [{'id': 'input'}, {'id': 'output'}],
+           'virtual_links': virtual_links}
+
+    if num_paths:
+        fw_paths = []
+        for p in range(num_paths):
+            # functions traversed by the path
+            vnfs = list(range(num_vnfs))
+            if p and back_links:
+                src, dst = back_links[(p - 1) % len(back_links)]
+                vnfs = list(range(src + 1)) + list(range(dst, num_vnfs))
+
+            path = ['input']
+            for f in vnfs:
+                path += ['vnf_{0}:in0'.format(f),
+                         'vnf_{0}:{1}'.format(f, last_out)]
+            path.append('output')
+            fw_paths.append(
+                {'fp_id': 'fg01:fp{0:02d}'.format(p), 'policy': 'none',
+                 'connection_points': [{'connection_point_ref': cp,
+                                        'position': pos + 1}
+                                       for pos, cp in enumerate(path)]})
+
+        nsd['forwarding_graphs'] = [
+            {'fg_id': 'fg01', 'number_of_endpoints': 2,
+             'number_of_virtual_links': len(virtual_links),
+             'constituent_vnfs': [nf['vnf_id'] for nf in network_functions],
+             'network_forwarding_paths': fw_paths}]
+
+    nsd_file = os.path.join(root, 'nsd.yml')
+    with open(nsd_file, 'w') as _f:
+        yaml.dump(nsd, _f)
+
+    return nsd_file, vnfd_files
+
+
+def load_service(storage, nsd_file, vnfd_files):
+    """
+    Loads a service and its functions into storage, as done by the
+    integrity validation.
+    """
+    service = storage.create_service(nsd_file)
+    vnf_ids = {}
+    for nf in service.content['network_functions']:
+        vnf_ids[nf['vnf_name']] = nf['vnf_id']
+
+    for vnfd_file in vnfd_files:
+        func = storage.create_function(vnfd_file)
+        func.load_connection_points()
+        func.load_units()
+        func.load_unit_connection_points()
+        func.load_virtual_links()
+        service.associate_function(func, vnf_ids[func.content['name']])
+
+    service.load_connection_points()
+    service.load_virtual_links()
+    return service
+
+
+def forwarding_graph(service):
+    """
+    Build the directed graph between the functions of the forwarding paths
+    of a service, as analysed for cycles by the topology validation.
+    :param service: service object
+    :return: networkx.DiGraph
+    """
+    fpg = nx.DiGraph()
+    for fw_graph in service.content.get('forwarding_graphs', []):
+        for fw_path in fw_graph.get('network_forwarding_paths', []):
+            cps = sorted(fw_path['connection_points'],
+                         key=lambda cp: cp['position'])
+            nodes = [cp['connection_point_ref'].split(':')[0] for cp in cps]
+            # interfaces of the same function are a single node
+            nodes = [node for node, _ in itertools.groupby(nodes)]
+            fpg.add_nodes_from(nodes)
+            fpg.add_edges_from(zip(nodes, nodes[1:]))
+    return fpg
+
+
+def bench_synthetic(runs=10, workspace=None, max_cycles=10000, **params):
+    """
+    Benchmark the validation of a synthetic service. Times the syntax,
+    integrity and topology stages of validations of the service, the
+    construction of its topology graph at each level and the enumeration
+    of the cycles of its forwarding graph, and records the peak memory
+    allocated by a validation.
+    :param runs: number of repetitions of each measurement
+    :param workspace: workspace of the validators
+    :param max_cycles: maximum number of cycles enumerated by
+                       networkx.simple_cycles
+    :param params: parameters of the synthetic service, as in
+                   'write_synthetic_service'
+    :return: dictionary of results
+    """
+    root = tempfile.mkdtemp(prefix='son-benchmark-')
+    try:
+        nsd_file, vnfd_files = write_synthetic_service(root, **params)
+        functions_dir = os.path.dirname(vnfd_files[0])
+
+        # validation stages, as reported to the event context
+        stages = dict()
+
+        def record_stage(record):
+            if record['type'] == 'stage' and 'duration' in record:
+                key = '{0}.{1}'.format(record['object_type'],
+                                       record['stage'])
+                stages.setdefault(key, []).append(record['duration'])
+
+        def validate():
+            validator = Validator(workspace=workspace)
+            validator.configure(syntax=True, integrity=True, topology=True,
+                                dpath=functions_dir, dext='yml')
+            validator.event_context.subscribe(record_stage)
+            validator.validate_service(nsd_file)
+            return validator
+
+        validation = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            validator = validate()
+            validation.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            validate()
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        errors = validator.error_count
+        warnings = validator.warning_count
+
+        # topology graphs, built without the cache of the service
+        service = load_service(DescriptorStorage(), nsd_file, vnfd_files)
+        topology = dict()
+        size = dict()
+        for level in range(4):
+            samples = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                graph = service.build_topology_graph(level=level,
+                                                     bridges=True)
+                samples.append(time.perf_counter() - start)
+            key = 'level{0}'.format(level)
+            topology[key] = latency_summary(samples)
+            size[key] = {'nodes': graph.number_of_nodes(),
+                         'edges': graph.number_of_edges()}
+
+        # cycles of the forwarding graph
+        fpg = forwarding_graph(service)
+        bounded = []
+        unbounded = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            found, truncated = fgcycles.find_cycles(fpg, min_length=3)
+            bounded.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            count = sum(1 for _ in itertools.islice(nx.simple_cycles(fpg),
+                                                    max_cycles))
+            unbounded.append(time.perf_counter() - start)
+
+        return {'params': dict(params, runs=runs),
+                'size': dict(size,
+                             functions=len(vnfd_files),
+                             forwarding_graph={
+                                 'nodes': fpg.number_of_nodes(),
+                                 'edges': fpg.number_of_edges()}),
+                'result': {'errors': errors, 'warnings': warnings},
+                'stages': dict({key: latency_summary(samples)
+                                for key, samples in stages.items()},
+                               validation=latency_summary(validation)),
+                'topology': topology,
+                'cycles': {'find_cycles': dict(latency_summary(bounded),
+                                               cycles=len(found),
+                                               truncated=truncated),
+                           'simple_cycles': dict(latency_summary(unbounded),
+                                                 cycles=count,
+                                                 truncated=count >=
+                                                 max_cycles)},
+                'memory': {'peak_bytes': peak_bytes,
+                           'max_rss_bytes': resource.getrusage(
+                               resource.RUSAGE_SELF).ru_maxrss * 1024}}
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_interconnect(sizes=(250, 1000), runs=10, num_vnfs=2):
+    """
+    Benchmark the construction of the level 1 topology graph of synthetic
+    services with a growing number of units, and thus of connection
+    points, per function.
+    :param sizes: numbers of units per function
+    :param runs: number of repetitions of each measurement
+    :param num_vnfs: number of functions of each service
+    :return: dictionary of results, by number of units
+    """
+    root = tempfile.mkdtemp(prefix='son-benchmark-')
+    try:
+        results = dict()
+        for num_vdus in sizes:
+            nsd_file, vnfd_files = write_synthetic_service(
+                os.path.join(root, str(num_vdus)), num_vnfs, num_vdus)
+            service = load_service(DescriptorStorage(), nsd_file, vnfd_files)
+
+            samples = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                graph = service.build_topology_graph(level=1, bridges=False)
+                samples.append(time.perf_counter() - start)
+            results[num_vdus] = dict(latency_summary(samples),
+                                     nodes=graph.number_of_nodes(),
+                                     edges=graph.number_of_edges())
+        return {'params': {'sizes': list(sizes), 'runs': runs,
+                           'num_vnfs': num_vnfs},
+                'topology': results}
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def write_synthetic_catalogue(root, num_services, **params):
+    """
+    Writes a catalogue of distinct synthetic services, as in
+    'write_synthetic_service'. Service descriptors are written to the
+    'ns' directory of the catalogue and function descriptors to 'vnf'.
+    :param root: directory of the catalogue
+    :param num_services: number of services
+    :param params: parameters of each service
+    :return: tuple (service directory, function directory, number of
+             descriptors)
+    """
+    ns_path = os.path.join(root, 'ns')
+    vnf_path = os.path.join(root, 'vnf')
+    os.makedirs(ns_path, exist_ok=True)
+
+    num_descriptors = 0
+    for s in range(num_services):
+        prefix = 's{0}-'.format(s)
+        nsd_file, vnfd_files = write_synthetic_service(
+            os.path.join(vnf_path, prefix[:-1]), prefix=prefix,
+            **dict(params, seed=params.get('seed', 0) + s))
+        os.rename(nsd_file, os.path.join(ns_path, prefix + 'nsd.yml'))
+        num_descriptors += 1 + len(vnfd_files)
+
+    return ns_path, vnf_path, num_descriptors
+
+
+def _validate_catalogue(ns_path, vnf_path, workspace, release, trace):
+    """
+    Validate a catalogue, measuring the memory retained by the validator.
+    Runs in a child process, for the growth of its resident memory to be
+    due to the validation only.
+    """
+    gc.collect()
+    rss = resident_memory()
+    if trace:
+        tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        validator = Validator(workspace=workspace)
+        validator.configure(syntax=True, integrity=True, topology=True,
+                            dext='yml', release_descriptors=release)
+        validator.validate_catalogue(ns_path, vnf_path)
+        duration = time.perf_counter() - start
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] if trace else None
+    finally:
+        tracemalloc.stop()
+
+    return {'duration': duration,
+            'errors': validator.error_count,
+            'retained_bytes': retained,
+            'rss_bytes': resident_memory() - rss}
+
+
+def bench_catalogue(num_services=20, workspace=None, **params):
+    """
+    Benchmark the memory used to validate a catalogue of synthetic
+    services in one process: the resident memory and the memory retained
+    by the validator (traced by tracemalloc), per descriptor, with and
+    without releasing the descriptors once validated. Each measurement is
+    performed in a new (forked) process.
+    :param num_services: number of services of the catalogue
+    :param workspace: workspace of the validators
+    :param params: parameters of the synthetic services, as in
+                   'write_synthetic_service'
+    :return: dictionary of results
+    """
+    root = tempfile.mkdtemp(prefix='son-benchmark-')
+    try:
+        ns_path, vnf_path, num_descriptors = write_synthetic_catalogue(
+            root, num_services, **params)
+
+        # schemas are loaded once, before forking
+        Validator(workspace=workspace)
+
+        results = {'params': dict(params, services=num_services),
+                   'descriptors': num_descriptors}
+        ctx = multiprocessing.get_context('fork')
+        for release in (False, True):
+            run = dict()
+            for trace in (False, True):
+                pool = ctx.Pool(1)
+                try:
+                    run[trace] = pool.apply(
+                        _validate_catalogue,
+                        (ns_path, vnf_path, workspace, release, trace))
+                finally:
+                    pool.terminate()
+
+            results['released' if release else 'retained'] = {
+                'duration': run[False]['duration'],
+                'errors': run[False]['errors'],
+                'rss_bytes': run[False]['rss_bytes'],
+                'rss_bytes_per_descriptor':
+                    run[False]['rss_bytes'] // num_descriptors,
+                'retained_bytes': run[True]['retained_bytes'],
+                'retained_bytes_per_descriptor':
+                    run[True]['retained_bytes'] // num_descriptors}
+        return results
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark of the SONATA validator. Reports latencies "
+                    "in JSON format.")
+    parser.add_argument(
+        "path",
+        nargs='?',
+        help="Path of the object to validate"
+    )
+    parser.add_argument(
+        "--type",
+        choices=['project', 'package', 'service', 'function'],
+        default='function',
+        help="Type of the object to validate. Default: function"
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=50,
+        help="Number of validations of each benchmark. Default: 50"
+    )
+    parser.add_argument(
+        "--schemas",
+        help="Directory of the local schema files. Default: the workspace "
+             "default"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        help="File to write the results to. Default: standard output"
+    )
+    synthetic = parser.add_argument_group(
+        "synthetic service",
+        "Benchmark the validation stages, topology graphs and cycle "
+        "analysis of a generated service, instead of 'path'")
+    synthetic.add_argument(
+        "--synthetic",
+        action='store_true',
+        help="Benchmark a synthetic service"
+    )
+    synthetic.add_argument(
+        "--vnfs",
+        type=int,
+        default=10,
+        help="Number of functions. Default: 10"
+    )
+    synthetic.add_argument(
+        "--vdus",
+        type=int,
+        default=2,
+        help="Number of units per function. Default: 2"
+    )
+    synthetic.add_argument(
+        "--cps",
+        type=int,
+        default=3,
+        help="Number of connection points per unit. Default: 3"
+    )
+    synthetic.add_argument(
+        "--bridges",
+        type=int,
+        default=1,
+        help="Number of E-LAN bridges. Default: 1"
+    )
+    synthetic.add_argument(
+        "--paths",
+        type=int,
+        default=4,
+        help="Number of forwarding paths. Default: 4"
+    )
+    synthetic.add_argument(
+        "--cycle-density",
+        type=float,
+        default=0.3,
+        help="Fraction of functions linked back to an earlier function, "
+             "creating cycles. Default: 0.3"
+    )
+    synthetic.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed of the generated service. Default: 0"
+    )
+    synthetic.add_argument(
+        "--catalogue",
+        type=int,
+        metavar="SERVICES",
+        help="Measure the memory used per descriptor to validate a "
+             "catalogue of SERVICES synthetic services, instead of the "
+             "latencies of a single service"
+    )
+    synthetic.add_argument(
+        "--interconnect",
+        type=int,
+        nargs='+',
+        metavar="VDUS",
+        help="Measure the construction of the level 1 topology graph of "
+             "services of '--vnfs' functions with VDUS units each, instead "
+             "of the latencies of a single service"
+    )
+    args = parser.parse_args()
+    if not args.path and not args.synthetic and not args.catalogue and \
+            not args.interconnect:
+        parser.error("either 'path', '--synthetic', '--catalogue' or "
+                     "'--interconnect' must be specified")
+
+    workspace = Workspace('.', log_level='error')
+    if args.schemas:
+        workspace.config['schemas_local_master'] = args.schemas
+
+    # validation events are not of interest
+    logging.disable(logging.ERROR)
+
+    if args.catalogue:
+        results = {'catalogue': bench_catalogue(
+            num_services=args.catalogue, workspace=workspace,
+            num_vnfs=args.vnfs, num_vdus=args.vdus, num_cps=args.cps,
+            num_bridges=args.bridges, num_paths=args.paths,
+            cycle_density=args.cycle_density, seed=args.seed)}
+    elif args.interconnect:
+        results = {'interconnect': bench_interconnect(
+            sizes=args.interconnect, runs=args.runs, num_vnfs=args.vnfs)}
+    elif args.synthetic:
+        results = {'synthetic': bench_synthetic(
+            runs=args.runs, workspace=workspace, num_vnfs=args.vnfs,
+            num_vdus=args.vdus, num_cps=args.cps,
+            num_bridges=args.bridges, num_paths=args.paths,
+            cycle_density=args.cycle_density, seed=args.seed)}
+    else:
+        results = {'path': args.path,
+                   'type': args.type,
+                   'requests': {
+                       'cold': bench_requests(args.path, args.type,
+                                              runs=args.runs, warm=False,
+                                              workspace=workspace),
+                       'warm': bench_requests(args.path, args.type,
+                                              runs=args.runs, warm=True,
+                                              workspace=workspace)}}
+
+    output = json.dumps(results, sort_keys=True, indent=4,
+                        separators=(',', ': '))
+    if args.output:
+        with open(args.output, 'w') as _f:
+            _f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,51 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+
+import os
+import sys
+from son.validate import daemon
+
+
+def main():
+    """
+    Entry point of son-validate. Validations are forwarded to the local
+    validation daemon if it is running, and performed in-process
+    otherwise. The environment variable 'SON_VALIDATE_DAEMON' selects the
+    behaviour: 'on' (default), 'off' to never use the daemon, or 'auto' to
+    also start it in the background for the next validations.
+    """
+    mode = os.environ.get('SON_VALIDATE_DAEMON', 'on').lower()
+    if mode != 'off':
+        code = daemon.forward(sys.argv[1:])
+        if code is not None:
+            sys.exit(code)
+        if mode == 'auto':
+            daemon.start(wait=False)
+
+    # the validator is only imported if the daemon can't be used
+    from son.validate.validate import main as validate_main
+    validate_main()
@@ -0,0 +1,135 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+import time
+import logging
+import networkx as nx
+from son import trace
+
+log = logging.getLogger(__name__)
+
+# default limits of the cycle analysis
+DEFAULT_MAX_CYCLES = 100     # cycles reported per strongly connected component
+DEFAULT_MAX_LENGTH = None    # nodes per cycle (unbounded)
+DEFAULT_TIMEOUT = 5          # seconds for the whole analysis
+
+# number of search steps between deadline checks
+_DEADLINE_CHECK_STEPS = 1000
+
+
+@trace.traced(category='son.validate')
+def find_cycles(graph, min_length=1, max_length=DEFAULT_MAX_LENGTH,
+                max_cycles=DEFAULT_MAX_CYCLES, timeout=DEFAULT_TIMEOUT):
+    """
+    Finds simple cycles of a directed graph within bounded limits.
+    The graph is first split into strongly connected components, since a
+    cycle never crosses components. Each component is then searched for at
+    most 'max_cycles' representative cycles. Components smaller than
+    'min_length' are skipped, as they can't contain a cycle long enough.
+    :param graph: directed graph (networkx.DiGraph)
+    :param min_length: minimum number of nodes of a reported cycle
+    :param max_length: maximum number of nodes of a cycle (None: unbounded)
+    :param max_cycles: maximum number of cycles reported per component
+                       (None: unbounded)
+    :param timeout: time budget in seconds for the whole analysis
+                    (None: unbounded)
+    :return: tuple (list of cycles, truncated). Each cycle is a list of
+             nodes, as in networkx.simple_cycles. 'truncated' is True if a
+             limit was reached and more cycles may exist.
+    """
+    deadline = time.time() + timeout if timeout else None
+    cycles = []
+    truncated = False
+
+    components = sorted((sorted(c) for c in
+                         nx.strongly_connected_components(graph)
+                         if len(c) >= min_length),
+                        key=lambda c: c[0])
+
+    for component in components:
+        comp_cycles, comp_truncated = _component_cycles(
+            graph, component, min_length, max_length, max_cycles, deadline)
+        cycles += comp_cycles
+        truncated = truncated or comp_truncated
+
+        if deadline and time.time() > deadline:
+            log.warning("Cycle analysis exceeded the time budget of {0} sec"
+                        .format(timeout))
+            return cycles, True
+
+    return cycles, truncated
+
+
+def _component_cycles(graph, nodes, min_length, max_length, max_cycles,
+                      deadline):
+    """
+    Enumerates the simple cycles of a strongly connected component.
+    Each cycle is reported once, rooted at its lowest ordered node: the
+    search from a start node only visits nodes ordered after it.
+    :param nodes: sorted list of nodes of the component
+    :return: tuple (list of cycles, truncated)
+    """
+    order = {node: idx for idx, node in enumerate(nodes)}
+    cycles = []
+    steps = 0
+
+    for start in nodes:
+        path = [start]
+        on_path = {start}
+        stack = [iter(graph.successors(start))]
+
+        while stack:
+            steps += 1
+            if deadline and steps % _DEADLINE_CHECK_STEPS == 0 and \
+                    time.time() > deadline:
+                return cycles, True
+
+            try:
+                node = next(stack[-1])
+            except StopIteration:
+                stack.pop()
+                on_path.discard(path.pop())
+                continue
+
+            if node == start:
+                if len(path) >= min_length:
+                    cycles.append(list(path))
+                    if max_cycles and len(cycles) >= max_cycles:
+                        return cycles, True
+                continue
+
+            if node not in order or order[node] < order[start] or \
+                    node in on_path:
+                continue
+
+            if max_length and len(path) >= max_length:
+                continue
+
+            path.append(node)
+            on_path.add(node)
+            stack.append(iter(graph.successors(node)))
+
+    return cycles, False
@@ -0,0 +1,438 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+
+import io
+import os
+import sys
+import json
+import time
+import errno
+import shutil
+import hashlib
+import socket
+import logging
+import argparse
+import tempfile
+import traceback
+import subprocess
+from son import trace
+
+log = logging.getLogger(__name__)
+
+# time without requests after which the daemon exits, in seconds
+IDLE_TIMEOUT = 1800
+
+# time to wait for the daemon to accept a connection, in seconds
+CONNECT_TIMEOUT = 0.5
+
+# time to wait for a started daemon to be ready, in seconds
+START_TIMEOUT = 30
+
+# CLI arguments which are always validated in-process: batches already
+# run in their own worker processes, and traces are taken of the process
+# running the command
+LOCAL_ARGS = ('--batch', '--trace', '--trace-memory')
+
+
+def socket_path():
+    """
+    Provides the path of the socket of the daemon of the current user.
+    It can be set with the environment variable 'SON_VALIDATE_SOCKET'.
+    """
+    path = os.environ.get('SON_VALIDATE_SOCKET')
+    if path:
+        return path
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return os.path.join(runtime_dir,
+                        'son-validate-{0}.sock'.format(os.getuid()))
+
+
+def code_stamp():
+    """
+    Identifies the installed validator code: the modules (and data files)
+    of the son package, which the validator depends on. A daemon running
+    other code than the CLI is stopped instead of being used.
+    :return: digest of the names, modification times and sizes of the files
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    stamp = hashlib.sha1()
+    for path, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d not in ('tests', '__pycache__'))
+        for filename in sorted(files):
+            if not filename.endswith(('.py', '.yml')):
+                continue
+            filepath = os.path.join(path, filename)
+            try:
+                st = os.stat(filepath)
+            except OSError:
+                continue
+            stamp.update('{0}:{1}:{2}\n'.format(
+                os.path.relpath(filepath, root), st.st_mtime_ns,
+                st.st_size).encode('utf-8'))
+    return stamp.hexdigest()
+
+
+def _connect(path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+
+def _send(sock, message):
+    sock.sendall(json.dumps(message).encode('utf-8') + b'\n')
+
+
+def request(message, path=None):
+    """
+    Send a control request (ping, stop) to the daemon.
+    :param message: request dictionary, with its command in 'command'
+    :param path: socket of the daemon, default is 'socket_path()'
+    :return: response dictionary, or None if the daemon isn't running
+    """
+    sock = _connect(path or socket_path())
+    if not sock:
+        return None
+    try:
+        _send(sock, message)
+        with sock.makefile('rb') as f:
+            line = f.readline()
+        return json.loads(line.decode('utf-8')) if line else None
+    except (OSError, ValueError):
+        return None
+    finally:
+        sock.close()
+
+
+def forward(argv, path=None, stdout=None, stderr=None):
+    """
+    Forward a son-validate command line to the daemon. Its output is
+    written, as it is produced, to the standard output and error.
+    :param argv: arguments of son-validate
+    :param path: socket of the daemon, default is 'socket_path()'
+    :return: exit code, or None if the command wasn't handled by a daemon
+             (not running or running other code)
+    """
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    if any(arg.split('=', 1)[0] in LOCAL_ARGS for arg in argv):
+        return None
+
+    sock = _connect(path or socket_path())
+    if not sock:
+        return None
+
+    output = False
+    try:
+        _send(sock, {'command': 'validate', 'argv': list(argv),
+                     'cwd': os.getcwd(), 'code': code_stamp()})
+        with sock.makefile('rb') as f:
+            for line in f:
+                message = json.loads(line.decode('utf-8'))
+                if 'data' in message:
+                    stream = stderr if message['stream'] == 'stderr' \
+                        else stdout
+                    stream.write(message['data'])
+                    stream.flush()
+                    output = True
+                elif 'exit' in message:
+                    return message['exit']
+    except (OSError, ValueError):
+        pass
+    finally:
+        sock.close()
+
+    # output can't be taken back: don't validate again
+    if output:
+        stderr.write("Lost connection to the validation daemon\n")
+        return 1
+    return None
+
+
+def start(path=None, idle_timeout=IDLE_TIMEOUT, wait=True):
+    """
+    Start a daemon in the background, detached from the calling process.
+    :param path: socket of the daemon, default is 'socket_path()'
+    :param idle_timeout: time without requests after which it exits
+    :param wait: wait for the daemon to be ready
+    :return: True if the daemon is running
+    """
+    path = path or socket_path()
+    if request({'command': 'ping'}, path):
+        return True
+
+    subprocess.Popen([sys.executable, '-m', 'son.validate.daemon',
+                      '--socket', path, '--idle-timeout', str(idle_timeout),
+                      'run'],
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL, start_new_session=True)
+    if not wait:
+        return True
+
+    deadline = time.time() + START_TIMEOUT
+    while time.time() < deadline:
+        if request({'command': 'ping'}, path):
+            return True
+        time.sleep(0.05)
+    return False
+
+
+class _StreamWriter(io.TextIOBase):
+
+    def __init__(self, sock, stream):
+        """
+        Text stream sending what is written to a client of the daemon.
+        :param sock: socket of the client
+        :param stream: 'stdout' or 'stderr'
+        """
+        self._sock = sock
+        self._stream = stream
+
+    def writable(self):
+        return True
+
+    def isatty(self):
+        return False
+
+    def write(self, data):
+        if data:
+            try:
+                _send(self._sock, {'stream': self._stream, 'data': data})
+            except OSError:
+                # the client is gone, the validation completes regardless
+                pass
+        return len(data)
+
+
+class ValidateDaemon(object):
+
+    def __init__(self, path=None, idle_timeout=IDLE_TIMEOUT):
+        """
+        Local daemon running son-validate command lines, forwarded by the
+        CLI through a Unix socket. It keeps the imported modules, parsed
+        schemas and event configuration loaded between validations.
+        Requests are served one at a time, as each one runs with its own
+        working directory and standard streams.
+        :param path: socket of the daemon, default is 'socket_path()'
+        :param idle_timeout: time, in seconds, without requests after which
+                             the daemon exits. None: never.
+        """
+        self.path = path or socket_path()
+        self.idle_timeout = idle_timeout
+        self.code = code_stamp()
+        self._running = False
+        self._sock = None
+
+    def bind(self):
+        """
+        Bind the socket of the daemon, readable by its user only. A socket
+        left by a terminated daemon is replaced.
+        """
+        if os.path.exists(self.path):
+            if request({'command': 'ping'}, self.path):
+                raise RuntimeError("A daemon is already running on '{0}'"
+                                   .format(self.path))
+            os.remove(self.path)
+
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o177)
+        try:
+            self._sock.bind(self.path)
+        finally:
+            os.umask(umask)
+        self._sock.listen(8)
+
+    def warm(self):
+        """
+        Load the resources shared by the validations.
+        """
+        from son.validate.validate import Validator
+        Validator()
+
+    def serve(self):
+        """
+        Serve requests until stopped or idle.
+        """
+        if not self._sock:
+            self.bind()
+        self.warm()
+        log.info("Validation daemon listening on '{0}'".format(self.path))
+
+        self._running = True
+        self._sock.settimeout(self.idle_timeout)
+        try:
+            while self._running:
+                try:
+                    conn, _ = self._sock.accept()
+                except socket.timeout:
+                    log.info("Validation daemon idle for {0} sec, exiting"
+                             .format(self.idle_timeout))
+                    break
+                with conn:
+                    conn.settimeout(None)
+                    try:
+                        self.handle(conn)
+                    except Exception:
+                        log.exception("Failed to handle request")
+        finally:
+            self.close()
+
+    def close(self):
+        self._running = False
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+            try:
+                os.remove(self.path)
+            except OSError as e:
+                if e.errno != errno.ENOENT:
+                    raise
+
+    def handle(self, conn):
+        with conn.makefile('rb') as f:
+            line = f.readline()
+        if not line:
+            return
+        message = json.loads(line.decode('utf-8'))
+        command = message.get('command')
+
+        if command == 'ping':
+            _send(conn, {'pid': os.getpid(), 'path': self.path})
+        elif command == 'stop':
+            self._running = False
+            _send(conn, {'pid': os.getpid()})
+        elif command == 'validate':
+            if message.get('code') != self.code:
+                log.info("Validator code changed, exiting")
+                self._running = False
+                return
+            _send(conn, {'exit': self.run(conn, message['argv'],
+                                          message['cwd'])})
+
+    def run(self, conn, argv, cwd):
+        """
+        Run a son-validate command line, as the CLI would.
+        :return: exit code
+        """
+        from son.validate import validate
+
+        prev = (sys.argv, sys.stdout, sys.stderr, os.getcwd(),
+                tempfile.tempdir)
+        # files extracted from packages are removed after each request
+        tmp_dir = tempfile.mkdtemp(prefix='son-validate-daemon-')
+        try:
+            os.chdir(cwd)
+            tempfile.tempdir = tmp_dir
+            sys.argv = ['son-validate'] + argv
+            sys.stdout = _StreamWriter(conn, 'stdout')
+            sys.stderr = _StreamWriter(conn, 'stderr')
+            try:
+                validate.main()
+                code = 0
+            except SystemExit as e:
+                if e.code is None or isinstance(e.code, int):
+                    code = e.code or 0
+                else:
+                    sys.stderr.write('{0}\n'.format(e.code))
+                    code = 1
+            except Exception:
+                traceback.print_exc()
+                code = 1
+        finally:
+            sys.argv, sys.stdout, sys.stderr, cwd, tempfile.tempdir = prev
+            os.chdir(cwd)
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        return code
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Local daemon of son-validate. While it runs, "
+                    "son-validate forwards its validations to the daemon, "
+                    "which keeps the validator loaded between them.")
+    parser.add_argument(
+        "command",
+        choices=['start', 'stop', 'status', 'run'],
+        help="'start' the daemon in the background, 'stop' it, show its "
+             "'status' or 'run' it in the foreground"
+    )
+    parser.add_argument(
+        "--socket",
+        default=socket_path(),
+        help="Unix socket of the daemon. Default: '{0}'"
+             .format(socket_path())
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=int,
+        default=IDLE_TIMEOUT,
+        help="Time, in seconds, without requests after which the daemon "
+             "exits. 0: never. Default: {0}".format(IDLE_TIMEOUT)
+    )
+    trace.add_argument(parser)
+    args = parser.parse_args()
+    trace.configure(args, 'son-validate-daemon')
+
+    if args.command == 'run':
+        logging.basicConfig(level=logging.INFO)
+        try:
+            ValidateDaemon(args.socket,
+                           idle_timeout=args.idle_timeout or None).serve()
+        except RuntimeError as e:
+            log.error(e)
+            return 1
+
+    elif args.command == 'start':
+        if not start(args.socket, idle_timeout=args.idle_timeout):
+            print("Failed to start the validation daemon")
+            return 1
+        print("Validation daemon running on '{0}'".format(args.socket))
+
+    elif args.command == 'stop':
+        if request({'command': 'stop'}, args.socket) is None:
+            print("Validation daemon isn't running")
+            return 1
+        print("Validation daemon stopped")
+
+    elif args.command == 'status':
+        response = request({'command': 'ping'}, args.socket)
+        if response is None:
+            print("Validation daemon isn't running")
+            return 1
+        print("Validation daemon running on '{0}' (pid {1})"
+              .format(response['path'], response['pid']))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,42 +1,139 @@
 import yaml
 import logging
 import os
-import pkg_resources
+import threading
 import uuid
+from contextlib import contextmanager
 
 log = logging.getLogger(__name__)
 
-
-class EventLogger(object):
-
-    def __init__(self, name):
-        self._name = name
-        self._log = logging.getLogger(name)
+# levels of events
+LEVELS = ('error', 'warning', 'none')
+
+# parsed event configuration files: {path: ((mtime, size), eventdict)}
+_eventcfg_cache = dict()
+_eventcfg_lock = threading.Lock()
+
+
+def clear_eventcfg_cache():
+    """
+    Forget the parsed event configuration files.
+    """
+    with _eventcfg_lock:
+        _eventcfg_cache.clear()
+
+
+class EventContext(object):
+
+    def __init__(self, eventdict=None, max_details=None):
+        """
+        Initialize an event context. A context collects the events of a
+        single validation, isolating them from other validations running
+        in the same process.
+        Events are indexed by level, so that errors and warnings are
+        provided, and counted, without filtering all events.
+        :param eventdict: event configuration. If not specified, the
+                          (cached) event configuration files are loaded.
+        :param max_details: maximum number of detail messages stored per
+                            event (None: unlimited). Further messages are
+                            only counted, in the event key 'detail_dropped'.
+        """
         self._events = dict()
+        self._levels = {level: list() for level in LEVELS}
+        self._eventdict = eventdict if eventdict is not None \
+            else EventLogger.load_eventcfg()
+        self.max_details = max_details
+        self._listeners = list()
 
-        # load events config
-        self._eventdict = self.load_eventcfg()
+    @property
+    def events(self):
+        return self._events
 
     @property
     def errors(self):
-        return list(filter(lambda event: event['level'] == 'error',
-                           self._events.values()))
+        return list(self._levels['error'])
 
     @property
     def warnings(self):
-        return list(filter(lambda event: event['level'] == 'warning',
-                    self._events.values()))
+        return list(self._levels['warning'])
+
+    @property
+    def error_count(self):
+        return len(self._levels['error'])
+
+    @property
+    def warning_count(self):
+        return len(self._levels['warning'])
 
     def reset(self):
         self._events.clear()
-        self._eventdict = self.load_eventcfg()
-
-    def log(self, header, msg, source_id, event_code, event_id=None,
-            detail_event_id=None):
+        for events in self._levels.values():
+            events.clear()
+        self._eventdict = EventLogger.load_eventcfg()
+
+    def remove(self, match):
+        """
+        Remove the events of some sources, e.g. of descriptors to be
+        validated again.
+        :param match: function receiving a source id, returning True if
+                      its events are to be removed
+        :return: number of removed events
+        """
+        keys = [key for key in self._events if match(key[0])]
+        if not keys:
+            return 0
+
+        for key in keys:
+            del self._events[key]
+        for level, events in self._levels.items():
+            self._levels[level] = [event for event in events
+                                   if not match(event['source_id'])]
+        return len(keys)
+
+    def subscribe(self, listener):
+        """
+        Register a listener notified, as they happen, of the events stored
+        in the context and of other validation progress records (e.g.
+        validation stages). Listeners are called in the validating thread.
+        :param listener: function receiving a record dictionary, with its
+                         kind in the 'type' key
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def notify(self, kind, **record):
+        """
+        Notify a progress record to the listeners of the context.
+        :param kind: kind of record, e.g. 'event' or 'stage'
+        """
+        if not self._listeners:
+            return
+        record['type'] = kind
+        for listener in list(self._listeners):
+            try:
+                listener(record)
+            except Exception:
+                log.exception("Event listener failed")
+
+    def add(self, header, msg, source_id, event_code, event_id=None,
+            detail_event_id=None, msg_args=None):
+        """
+        Store an event occurrence in the context.
+        The message is only formatted, with 'msg_args', if it is stored:
+        messages of events with level 'none' and messages exceeding the
+        'max_details' limit are discarded.
+        :return: tuple (event level, True if the event is new,
+                        formatted message or None if discarded)
+        """
         level = self._eventdict[event_code]
-        key = self.get_key(source_id, event_code, level)
+        key = (source_id, event_code, level)
 
-        if key not in self._events.keys():
+        event = self._events.get(key)
+        new = event is None
+        if new:
             event = self._events[key] = dict()
             event['source_id'] = source_id
             event['event_code'] = event_code
@@ -44,22 +141,125 @@ class EventLogger(object):
             event['event_id'] = event_id if event_id else source_id
             event['header'] = header
             event['detail'] = list()
+            self._levels.setdefault(level, list()).append(event)
 
-            # log header upon new key
-            if level == 'error':
-                self._log.error(header)
-            elif level == 'warning':
-                self._log.warning(header)
-            elif level == 'none':
-                pass
+        if not msg or level == 'none':
+            if new and level != 'none':
+                self._notify_event(event, None, None)
+            return level, new, None
 
-        else:
-            event = self._events[key]
+        if self.max_details is not None and \
+                len(event['detail']) >= self.max_details:
+            event['detail_dropped'] = event.get('detail_dropped', 0) + 1
+            if new:
+                self._notify_event(event, None, None)
+            return level, new, None
+
+        if msg_args:
+            msg = msg.format(*msg_args)
+
+        msg_dict = dict()
+        msg_dict['message'] = msg
+        msg_dict['detail_event_id'] = detail_event_id \
+            if detail_event_id else event['event_id']
+        event['detail'].append(msg_dict)
+        self._notify_event(event, msg, msg_dict['detail_event_id'])
+
+        return level, new, msg
+
+    def _notify_event(self, event, msg, detail_event_id):
+        if not self._listeners:
+            return
+        self.notify('event', source_id=event['source_id'],
+                    event_code=event['event_code'], level=event['level'],
+                    event_id=event['event_id'], header=event['header'],
+                    message=msg, detail_event_id=detail_event_id)
+
+
+class EventLogger(object):
+
+    def __init__(self, name):
+        self._name = name
+        self._log = logging.getLogger(name)
+
+        # events logged outside of an explicit context
+        self._default_context = EventContext()
+
+        # context of each thread, see 'context'
+        self._local = threading.local()
+
+    @property
+    def current_context(self):
+        """
+        Provides the event context of the calling thread. If no context
+        was activated, the default (process-wide) context is used.
+        """
+        ctx = getattr(self._local, 'context', None)
+        return ctx if ctx is not None else self._default_context
+
+    @contextmanager
+    def context(self, ctx):
+        """
+        Activate an event context in the calling thread. Events logged
+        within the 'with' block are stored in the provided context.
+        Contexts may be nested, the previous one is restored on exit.
+        :param ctx: EventContext object
+        """
+        prev_ctx = getattr(self._local, 'context', None)
+        self._local.context = ctx
+        try:
+            yield ctx
+        finally:
+            self._local.context = prev_ctx
+
+    @property
+    def errors(self):
+        return self.current_context.errors
+
+    @property
+    def warnings(self):
+        return self.current_context.warnings
+
+    def reset(self):
+        self.current_context.reset()
+
+    @property
+    def error_count(self):
+        return self.current_context.error_count
+
+    @property
+    def warning_count(self):
+        return self.current_context.warning_count
+
+    def log(self, header, msg, source_id, event_code, event_id=None,
+            detail_event_id=None, msg_args=None):
+        """
+        Log an event in the current context.
+        :param header: event header, shared by all occurrences
+        :param msg: detail message of this occurrence. If 'msg_args' is
+                    provided, it's a format string that is only formatted
+                    when the message is stored.
+        :param source_id: id of the descriptor originating the event
+        :param event_code: event code, defined in eventcfg.yml
+        :param event_id: id of the event (default: source_id)
+        :param detail_event_id: id of this occurrence (default: event_id)
+        :param msg_args: arguments to format 'msg'
+        """
+        level, new, msg = self.current_context.add(
+            header, msg, source_id, event_code, event_id=event_id,
+            detail_event_id=detail_event_id, msg_args=msg_args)
+
+        # log header upon new key
+        if new:
+            self._log_message(level, header)
 
         if not msg:
             return
 
         # log message
+        self._log_message(level, msg)
+
+    def _log_message(self, level, msg):
         if level == 'error':
             self._log.error(msg)
         elif level == 'warning':
@@ -67,25 +267,18 @@ class EventLogger(object):
         elif level == 'none':
             pass
 
-        msg_dict = dict()
-        msg_dict['message'] = msg
-        msg_dict['detail_event_id'] = detail_event_id \
-            if detail_event_id else event['event_id']
-        event['detail'].append(msg_dict)
-
     @staticmethod
     def load_eventcfg():
         filename = 'eventcfg.yml'
-        configpath = pkg_resources.resource_filename(
-            __name__, os.path.join('eventcfg.yml'))
-        with open(configpath, 'r') as _f:
-            eventdict = yaml.load(_f)
+        # the package isn't zip safe: its data files are on disk
+        configpath = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                  filename)
+        eventdict = dict(EventLogger._read_eventcfg(configpath))
 
         # if existent, load custom eventcfg.yml
         configpath = filename
         if os.path.isfile(configpath):
-            with open(configpath, 'r') as _f:
-                custom_eventdict = yaml.load(_f)
+            custom_eventdict = EventLogger._read_eventcfg(configpath)
 
             # check if all events of custom config are valid
             for cevent, cvalue in custom_eventdict.items():
@@ -105,12 +298,38 @@ class EventLogger(object):
 
         return eventdict
 
+    @staticmethod
+    def _read_eventcfg(configpath):
+        """
+        Read an event configuration file. Parsed files are cached and only
+        read again if modified.
+        :param configpath: configuration filename
+        :return: event configuration dict (shared, must not be modified)
+        """
+        path = os.path.abspath(configpath)
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+
+        with _eventcfg_lock:
+            if path in _eventcfg_cache and _eventcfg_cache[path][0] == stamp:
+                return _eventcfg_cache[path][1]
+
+        with open(path, 'r') as _f:
+            eventdict = yaml.load(_f)
+
+        with _eventcfg_lock:
+            _eventcfg_cache[path] = (stamp, eventdict)
+        return eventdict
+
     @staticmethod
     def dump_eventcfg(eventdict):
         filename = "eventcfg.yml"
         with open(filename, 'w') as _f:
             yaml.dump(eventdict, _f, default_flow_style=False)
 
+        with _eventcfg_lock:
+            _eventcfg_cache.pop(os.path.abspath(filename), None)
+
     @staticmethod
     def get_key(source_id, event_code, level):
         return source_id + '-' + event_code + '-' + level
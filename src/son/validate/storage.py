@@ -25,18 +25,32 @@
 # partner consortium (www.sonata-nfv.eu).
 
 import os
+import sys
 import logging
+import itertools
 import networkx as nx
 import validators
 import requests
-from collections import OrderedDict
-from son.validate.util import descriptor_id, read_descriptor_file
+from collections import OrderedDict, namedtuple
+from son import trace
+from son.validate.util import descriptor_id, read_descriptor_file, \
+    file_stamp
 from son.validate import event
 
 log = logging.getLogger(__name__)
 evtlog = event.get_logger('validator.events')
 
 
+def intern_id(value):
+    """
+    Intern an identifier read from a descriptor, so that identifiers
+    repeated across descriptors (e.g. 'eth0' or 'mgmt') are stored once.
+    :param value: identifier
+    :return: interned identifier, unchanged if not a string
+    """
+    return sys.intern(value) if type(value) is str else value
+
+
 class DescriptorStorage(object):
 
     def __init__(self):
@@ -49,6 +63,11 @@ class DescriptorStorage(object):
         self._functions = {}
         self._units = {}
 
+        # functions indexed by descriptor filename, to avoid re-reading
+        # descriptors that are already stored: {path: (stamp, function)}
+        self._function_files = {}
+        self._reads_saved = 0
+
     @property
     def packages(self):
         """
@@ -73,6 +92,15 @@ class DescriptorStorage(object):
         """
         return self._functions
 
+    @property
+    def reads_saved(self):
+        """
+        Provides the number of descriptor files that were not read (and
+        parsed) again because they were already stored.
+        :return: number of saved reads
+        """
+        return self._reads_saved
+
     def service(self, sid):
         """
         Obtain the service for the provided service id
@@ -115,8 +143,10 @@ class DescriptorStorage(object):
         if not new_service.content or not new_service.id:
             return
 
-        if new_service.id in self._services:
-            return self._services[new_service.id]
+        # a released service can't be validated again, it's replaced
+        stored = self._services.get(new_service.id)
+        if stored and stored.content is not None:
+            return stored
 
         self._services[new_service.id] = new_service
         return new_service
@@ -127,7 +157,7 @@ class DescriptorStorage(object):
         :param fid: function id
         :return: function descriptor object
         """
-        if fid not in self._functions[fid]:
+        if fid not in self._functions:
             log.error("Function id='{0}' is not stored.".format(fid))
             return
         return self.functions[fid]
@@ -136,29 +166,72 @@ class DescriptorStorage(object):
         """
         Create and store a function based on the provided descriptor filename.
         If a function is already stored with the same id, it will return the
-        stored function.
+        stored function. Descriptor files that were already stored are not
+        read again, unless they were modified since.
         :param descriptor_file: function descriptor filename
         :return: created function object or, if id exists, the stored function.
         """
         if not os.path.isfile(descriptor_file):
             return
+
+        path = os.path.realpath(descriptor_file)
+        stamp = file_stamp(path)
+        if path in self._function_files:
+            if self._function_files[path][0] == stamp:
+                self._reads_saved += 1
+                return self._function_files[path][1]
+            self.remove_function_file(path)
+
         new_function = Function(descriptor_file)
         if new_function.id in self._functions.keys():
-            return self._functions[new_function.id]
+            new_function = self._functions[new_function.id]
+        else:
+            self._functions[new_function.id] = new_function
 
-        self._functions[new_function.id] = new_function
+        self._function_files[path] = (stamp, new_function)
         return new_function
 
+    def remove_service(self, sid):
+        """
+        Remove a stored service, e.g. to read its descriptor again.
+        :param sid: service id
+        :return: removed service object, None if not stored
+        """
+        return self._services.pop(sid, None)
+
+    def remove_function_file(self, descriptor_file):
+        """
+        Remove the function read from a descriptor file, e.g. because the
+        file was modified.
+        :param descriptor_file: function descriptor filename
+        :return: removed function object, None if not stored
+        """
+        path = os.path.realpath(descriptor_file)
+        stamp, func = self._function_files.pop(path, (None, None))
+        if not func:
+            return
+
+        # keep the function if it's also stored for another file
+        if self._functions.get(func.id) is func and \
+                all(func is not stored
+                    for _, stored in self._function_files.values()):
+            del self._functions[func.id]
+        return func
+
 
 class Node:
+    __slots__ = ('_id', '_cps')
+
     def __init__(self, nid):
         """
         Initialize a node object.
-        A node holds multiple network connection points
+        A node holds multiple network connection points, stored once in an
+        (insertion ordered) dictionary used for both their order and
+        lookups.
         :param nid: node id
         """
         self._id = nid
-        self._connection_points = []
+        self._cps = {}
 
     @property
     def id(self):
@@ -174,18 +247,26 @@ class Node:
         Provides a list of interfaces associated with the node.
         :return: interface list
         """
-        return self._connection_points
+        return list(self._cps)
 
     @connection_points.setter
     def connection_points(self, value):
-        self._connection_points = value
+        self._cps = dict.fromkeys(intern_id(cp) for cp in value)
+
+    def has_connection_point(self, cp):
+        """
+        Indicates whether the interface is associated with the node.
+        :param cp: connection point ID
+        :return: True if the connection point is declared, False otherwise
+        """
+        return cp in self._cps
 
     def add_connection_point(self, cp):
         """
         Associate a new interface to the node.
         :param cp: connection point ID
         """
-        if cp in self.connection_points:
+        if cp in self._cps:
             evtlog.log("Duplicate connection point",
                        "The CP id='{0}' is already stored in node "
                        "id='{1}'".format(cp, self.id),
@@ -207,12 +288,14 @@ class Node:
         log.debug("Node id='{0}': adding connection point '{1}'"
                   .format(self.id, cp))
 
-        self._connection_points.append(cp)
+        self._cps[intern_id(cp)] = None
 
         return True
 
 
 class VLink:
+    __slots__ = ('_id', '_cpr_pair')
+
     def __init__(self, vl_id, cpr_u, cpr_v):
         """
         Initialize a vlink object.
@@ -221,8 +304,8 @@ class VLink:
         :param cpr_u: connection point reference u
         :param cpr_v: connection point reference v
         """
-        self._id = vl_id
-        self._cpr_pair = [cpr_u, cpr_v]
+        self._id = intern_id(vl_id)
+        self._cpr_pair = (intern_id(cpr_u), intern_id(cpr_v))
 
     def __repr__(self):
         return self.__str__()
@@ -238,8 +321,8 @@ class VLink:
     def connection_point_refs(self):
         """
         The two connection points references composing the vlink
-        in a list format [u, v]
-        :return: list (size 2) of connection point references
+        in a tuple format (u, v)
+        :return: tuple (size 2) of connection point references
         """
         return self._cpr_pair
 
@@ -259,6 +342,8 @@ class VLink:
 
 
 class VBridge:
+    __slots__ = ('_id', '_cp_refs')
+
     def __init__(self, vb_id, cp_refs):
         """
         Initialize a vbridge object.
@@ -267,8 +352,8 @@ class VBridge:
         assert vb_id
         assert cp_refs
 
-        self._id = vb_id
-        self._cp_refs = cp_refs
+        self._id = intern_id(vb_id)
+        self._cp_refs = tuple(intern_id(cpr) for cpr in cp_refs)
 
     def __repr__(self):
         return self.__str__()
@@ -285,7 +370,105 @@ class VBridge:
         return self._cp_refs
 
 
+# resolved connection point reference:
+#   prefix: vnf_id (service) or unit id (function), None if not prefixed
+#   cp: connection point id, without prefix
+#   owner: node that owns the connection point, None if unknown
+#   declared: whether the connection point is declared by its owner
+CPRef = namedtuple('CPRef', ['prefix', 'cp', 'owner', 'declared'])
+
+
+class CPIndex:
+    __slots__ = ('_descriptor', '_vlink_refs', '_vbridge_refs',
+                 '_vlink_ref_set', '_vbridge_ref_set', '_refs')
+
+    def __init__(self, descriptor):
+        """
+        Initialize a connection point index of a descriptor.
+        The index is built once, from the connection points and links loaded
+        in the descriptor, and is immutable: modifying the descriptor
+        discards it (see Descriptor.invalidate_cache).
+        It provides hash-based lookups of connection point references,
+        replacing the linear scans of connection point lists.
+        :param descriptor: descriptor object (Service or Function)
+        """
+        self._descriptor = descriptor
+
+        vlink_refs = []
+        for vl in descriptor.vlinks.values():
+            vlink_refs += vl.connection_point_refs
+        vbridge_refs = []
+        for vb in descriptor.vbridges.values():
+            vbridge_refs += vb.connection_point_refs
+
+        self._vlink_refs = tuple(vlink_refs)
+        self._vbridge_refs = tuple(vbridge_refs)
+        self._vlink_ref_set = frozenset(vlink_refs)
+        self._vbridge_ref_set = frozenset(vbridge_refs)
+
+        self._refs = {}
+        for cpr in itertools.chain(self._vlink_ref_set,
+                                   self._vbridge_ref_set):
+            self._refs[cpr] = self._resolve(cpr)
+
+    @property
+    def vlink_refs(self):
+        """
+        Connection point references of the vlinks, in declaration order.
+        :return: tuple of connection point references
+        """
+        return self._vlink_refs
+
+    @property
+    def vbridge_refs(self):
+        """
+        Connection point references of the vbridges, in declaration order.
+        :return: tuple of connection point references
+        """
+        return self._vbridge_refs
+
+    def in_vlinks(self, cpr):
+        """
+        Indicates whether a connection point reference is used in vlinks.
+        """
+        return cpr in self._vlink_ref_set
+
+    def in_vbridges(self, cpr):
+        """
+        Indicates whether a connection point reference is used in vbridges.
+        """
+        return cpr in self._vbridge_ref_set
+
+    def resolve(self, cpr):
+        """
+        Resolve a connection point reference to its owning node.
+        References used in links are resolved when the index is built,
+        others (e.g. from forwarding paths) are resolved on request.
+        :param cpr: connection point reference, e.g. 'vnf_id:cp' or 'cp'
+        :return: CPRef tuple
+        """
+        if cpr in self._refs:
+            return self._refs[cpr]
+        return self._resolve(cpr)
+
+    def _resolve(self, cpr):
+        s_cpr = cpr.split(':')
+        if len(s_cpr) == 1:
+            return CPRef(None, cpr, self._descriptor,
+                         self._descriptor.has_connection_point(cpr))
+        if len(s_cpr) > 2:
+            return CPRef(None, cpr, None, False)
+
+        owner = self._descriptor.cp_owner(s_cpr[0])
+        return CPRef(s_cpr[0], s_cpr[1], owner,
+                     owner is not None and
+                     owner.has_connection_point(s_cpr[1]))
+
+
 class Descriptor(Node):
+    __slots__ = ('_content', '_name', '_filename', '_complete_graph',
+                 '_graph', '_graphs', '_cp_index', '_vlinks', '_vbridges')
+
     def __init__(self, descriptor_file):
         """
         Initialize a generic descriptor object.
@@ -298,11 +481,14 @@ class Descriptor(Node):
         """
         self._id = None
         self._content = None
+        self._name = None
         self._filename = None
         self.filename = descriptor_file
         super().__init__(self.id)
         self._complete_graph = None
         self._graph = None
+        self._graphs = {}
+        self._cp_index = None
         self._vlinks = {}
         self._vbridges = {}
 
@@ -314,10 +500,18 @@ class Descriptor(Node):
         """
         return self._id
 
+    @property
+    def name(self):
+        """
+        Name of the descriptor, kept when its content is released.
+        :return: descriptor name
+        """
+        return self._name
+
     @property
     def content(self):
         """
-        Descriptor dictionary.
+        Descriptor dictionary. None once released, see 'release'.
         :return: descriptor dict
         """
         return self._content
@@ -330,7 +524,8 @@ class Descriptor(Node):
         :param value: descriptor dict
         """
         self._content = value
-        self._id = descriptor_id(self._content)
+        self._id = intern_id(descriptor_id(self._content))
+        self._name = intern_id(self._content.get('name'))
 
     @property
     def filename(self):
@@ -370,17 +565,39 @@ class Descriptor(Node):
 
     @property
     def vlink_cp_refs(self):
-        vlink_cps = []
-        for vl_id, vl in self.vlinks.items():
-            vlink_cps += vl.connection_point_refs
-        return vlink_cps
+        """
+        Connection point references of the vlinks of the descriptor.
+        :return: tuple of connection point references
+        """
+        return self.cp_index.vlink_refs
 
     @property
     def vbridge_cp_refs(self):
-        vbridge_cp_references = []
-        for vb_id, vb in self.vbridges.items():
-            vbridge_cp_references += vb.connection_point_refs
-        return vbridge_cp_references
+        """
+        Connection point references of the vbridges of the descriptor.
+        :return: tuple of connection point references
+        """
+        return self.cp_index.vbridge_refs
+
+    @property
+    def cp_index(self):
+        """
+        Connection point index of the descriptor. Built on first access,
+        after the connection points and links are loaded.
+        :return: CPIndex object
+        """
+        if self._cp_index is None:
+            self._cp_index = CPIndex(self)
+        return self._cp_index
+
+    def cp_owner(self, prefix):
+        """
+        Provides the node owning the connection points referenced with the
+        provided prefix, e.g. the function of 'vnf_id:cp'.
+        :param prefix: connection point reference prefix
+        :return: node object, None if not found
+        """
+        return
 
     @property
     def graph(self):
@@ -407,6 +624,30 @@ class Descriptor(Node):
     def complete_graph(self, value):
         self._complete_graph = value
 
+    def invalidate_cache(self):
+        """
+        Discard the memoised topology graphs and connection point index of
+        the descriptor. Must be invoked whenever connection points or links
+        are modified.
+        """
+        self._graphs.clear()
+        self._complete_graph = None
+        self._cp_index = None
+
+    def release(self, content=True):
+        """
+        Release the memory held by a validated descriptor: its topology
+        graphs, connection point index and, optionally, its parsed content.
+        Connection points and links are kept, so that graphs and index are
+        built again on request. The content isn't read again: validation
+        stages can't be performed on a released descriptor.
+        :param content: whether to release the parsed content
+        """
+        self.invalidate_cache()
+        self._graph = None
+        if content:
+            self._content = None
+
     def load_connection_points(self):
         """
         Load connection points of the descriptor.
@@ -414,6 +655,7 @@ class Descriptor(Node):
         """
         if 'connection_points' not in self.content:
             return
+        self.invalidate_cache()
         for cp in self.content['connection_points']:
             if not self.add_connection_point(cp['id']):
                 return
@@ -456,6 +698,7 @@ class Descriptor(Node):
                 return
 
         self._vbridges[vb_id] = VBridge(vb_id, cp_refs)
+        self.invalidate_cache()
         return True
 
     def add_vlink(self, vl_id, cp_refs):
@@ -495,6 +738,7 @@ class Descriptor(Node):
                 return
 
         self._vlinks[vl_id] = VLink(vl_id, cp_refs[0], cp_refs[1])
+        self.invalidate_cache()
         return True
 
     def load_virtual_links(self):
@@ -533,15 +777,16 @@ class Descriptor(Node):
         'virtual_links'. Should only be invoked after connection points
         are loaded.
         """
+        index = self.cp_index
         unused_cps = []
         for cp in self.connection_points:
-            if cp not in self.vlink_cp_refs and \
-                    cp not in self.vbridge_cp_refs:
+            if not index.in_vlinks(cp) and not index.in_vbridges(cp):
                 unused_cps.append(cp)
         return unused_cps
 
 
 class Package(Descriptor):
+    __slots__ = ()
 
     def __init__(self, descriptor_file):
         """
@@ -609,6 +854,7 @@ class Package(Descriptor):
 
 
 class Service(Descriptor):
+    __slots__ = ('_functions', '_vnf_id_map', '_fid_map', '_fw_graphs')
 
     def __init__(self, descriptor_file):
         """
@@ -618,6 +864,7 @@ class Service(Descriptor):
         super().__init__(descriptor_file)
         self._functions = {}
         self._vnf_id_map = {}
+        self._fid_map = {}
         self._fw_graphs = list()
 
     @property
@@ -636,6 +883,32 @@ class Service(Descriptor):
         """
         return self._fw_graphs
 
+    def complete_topology_graph(self):
+        """
+        Build the complete topology graph of the service (VDU level, with
+        bridges).
+        :return: topology graph
+        """
+        return self.topology_graph(level=3, bridges=True,
+                                   vdu_inner_connections=False)
+
+    @property
+    def complete_graph(self):
+        """
+        GraphML representation of the complete topology graph of the
+        service. Generated on first access.
+        :return: GraphML string
+        """
+        if self._complete_graph is None:
+            self._complete_graph = ''.join(
+                nx.generate_graphml(self.complete_topology_graph(),
+                                    encoding='utf-8', prettyprint=True))
+        return self._complete_graph
+
+    @complete_graph.setter
+    def complete_graph(self, value):
+        self._complete_graph = value
+
     @property
     def all_function_connection_points(self):
         func_cps = []
@@ -656,16 +929,16 @@ class Service(Descriptor):
             return
         return self._functions[self._vnf_id_map[vnf_id]]
 
+    def cp_owner(self, prefix):
+        return self.mapped_function(prefix)
+
     def vnf_id(self, func):
         """
         Provides the vnf id associated with the provided function.
         :param func: function object
         :return: vnf id
         """
-        for vnf_id, fid in self._vnf_id_map.items():
-            if fid == func.id:
-                return vnf_id
-        return
+        return self._fid_map.get(func.id)
 
     def associate_function(self, func, vnf_id):
         """
@@ -688,7 +961,27 @@ class Service(Descriptor):
 
         self._functions[func.id] = func
         self._vnf_id_map[vnf_id] = func.id
+        # the first vnf id of a function is kept, as by a scan of the map
+        self._fid_map.setdefault(func.id, vnf_id)
+        self.invalidate_cache()
 
+    def topology_graph(self, level=1, bridges=False,
+                       vdu_inner_connections=True):
+        """
+        Provides the network topology graph of the service. Graphs are
+        built on first request and memoised per level and settings.
+        The returned graph is shared and must not be modified.
+        See 'build_topology_graph' for a description of the parameters.
+        :return: topology graph (networkx.Graph)
+        """
+        key = (level, bridges, vdu_inner_connections)
+        if key not in self._graphs:
+            self._graphs[key] = self.build_topology_graph(
+                level=level, bridges=bridges,
+                vdu_inner_connections=vdu_inner_connections)
+        return self._graphs[key]
+
+    @trace.traced(category='son.validate')
     def build_topology_graph(self, level=1, bridges=False,
                              vdu_inner_connections=True):
         """
@@ -719,61 +1012,55 @@ class Service(Descriptor):
                           }
 
         # assign nodes from service connection points
-        connection_point_refs = self.vlink_cp_refs
+        index = self.cp_index
+        connection_point_refs = index.vlink_refs
         if bridges:
-            connection_point_refs += self.vbridge_cp_refs
+            connection_point_refs += index.vbridge_refs
 
         for cpr in connection_point_refs:
             node_attrs = def_node_attrs.copy()
-            node_attrs['label'] = cpr
-            s_cpr = cpr.split(':')
-            func = self.mapped_function(s_cpr[0])
-            if len(s_cpr) > 1 and func:
+            ref = index.resolve(cpr)
+            if ref.prefix is not None and ref.owner is not None:
 
                 node_attrs['parent_id'] = self.id
                 node_attrs['level'] = 1
-                node_attrs['node_id'] = func.id
-                node_attrs['node_label'] = func.content['name']
+                node_attrs['node_id'] = ref.owner.id
+                node_attrs['node_label'] = ref.owner.name
 
             else:
                 node_attrs['parent_id'] = ""
                 node_attrs['level'] = 0
                 node_attrs['node_id'] = self.id
-                node_attrs['node_label'] = self.content['name']
+                node_attrs['node_label'] = self.name
 
-            node_attrs['label'] = s_cpr[1] if len(s_cpr) > 1 else cpr
+            node_attrs['label'] = ref.cp
 
-            if cpr in self.vlink_cp_refs:
+            if index.in_vlinks(cpr):
                 node_attrs['type'] = 'iface'
-            elif cpr in self.vbridge_cp_refs:
+            elif index.in_vbridges(cpr):
                 node_attrs['type'] = 'br-iface'
 
             graph.add_node(cpr, attr_dict=node_attrs)
 
         prefixes = []
+        f_graphs = {}
         # assign sub-graphs of functions
         for fid, func in self.functions.items():
             # done to work with current descriptors of sonata demo
             prefix_map = {}
             prefix = self.vnf_id(func)
 
-            if level <= 2:
-                func.graph = func.build_topology_graph(
-                    parent_id=self.id,
-                    bridges=bridges,
-                    level=0,
-                    vdu_inner_connections=vdu_inner_connections)
-            else:
-                func.graph = func.build_topology_graph(
-                    parent_id=self.id,
-                    bridges=bridges,
-                    level=1,
-                    vdu_inner_connections=vdu_inner_connections)
+            f_graph = func.topology_graph(
+                parent_id=self.id,
+                bridges=bridges,
+                level=0 if level <= 2 else 1,
+                vdu_inner_connections=vdu_inner_connections)
+            f_graphs[prefix] = f_graph
 
             if level == 0:
-                for node in func.graph.nodes():
+                for node in f_graph.nodes():
                     node_tokens = node.split(':')
-                    if len(node_tokens) > 1 and node in graph.nodes():
+                    if len(node_tokens) > 1 and graph.has_node(node):
                         graph.remove_node(node)
                     else:
                         pn = prefix + ':' + node
@@ -785,27 +1072,27 @@ class Service(Descriptor):
                 prefixes.append(prefix)
 
             elif level == 2:
-                for node in func.graph.nodes():
+                for node in f_graph.nodes():
                     s_node = node.split(':')
                     if len(s_node) > 1:
                         prefix_map[node] = prefix + ':' + s_node[0]
                     else:
                         prefix_map[node] = prefix + ':' + node
 
-                re_f_graph = nx.relabel_nodes(func.graph, prefix_map,
+                re_f_graph = nx.relabel_nodes(f_graph, prefix_map,
                                               copy=True)
                 graph.add_nodes_from(re_f_graph.nodes(data=True))
                 graph.add_edges_from(re_f_graph.edges(data=True))
 
             elif level == 3:
-                for node in func.graph.nodes():
+                for node in f_graph.nodes():
                     s_node = node.split(':')
-                    if node in func.connection_points and len(s_node) > 1:
+                    if func.has_connection_point(node) and len(s_node) > 1:
                         prefix_map[node] = node
                     else:
                         prefix_map[node] = prefix + ':' + node
 
-                re_f_graph = nx.relabel_nodes(func.graph, prefix_map,
+                re_f_graph = nx.relabel_nodes(f_graph, prefix_map,
                                               copy=True)
                 graph.add_nodes_from(re_f_graph.nodes(data=True))
                 graph.add_edges_from(re_f_graph.edges(data=True))
@@ -873,50 +1160,60 @@ class Service(Descriptor):
 
         # inter-connect VNF interfaces
         if level == 1:
-            for node_u in graph.nodes():
-                node_u_tokens = node_u.split(':')
-
-                if len(node_u_tokens) > 1 and node_u_tokens[0] in prefixes:
-
-                    for node_v in graph.nodes():
-                        if node_u == node_v:
-                            continue
-                        node_v_tokens = node_v.split(':')
-                        if len(node_v_tokens) > 1 and \
-                                node_v_tokens[0] == node_u_tokens[0]:
-
-                            # verify if these interfaces are connected
-                            func = self.mapped_function(node_v_tokens[0])
-
-                            if func.graph.has_node(node_u_tokens[1]):
-                                node_u_c = node_u_tokens[1]
-                            elif func.graph.has_node(node_u):
-                                node_u_c = node_u
-                            else:
-                                continue
+            # two interfaces of the same VNF are connected if they belong to
+            # the same connected component of the VNF graph. Components are
+            # computed once per function and interfaces grouped by them.
+            components = {}
+            groups = OrderedDict()
+            for node in graph.nodes():
+                node_tokens = node.split(':')
+                if len(node_tokens) < 2 or node_tokens[0] not in prefixes:
+                    continue
+
+                if node_tokens[0] not in components:
+                    components[node_tokens[0]] = \
+                        Service._component_map(f_graphs[node_tokens[0]])
+                comp_map = components[node_tokens[0]]
+
+                if node_tokens[1] in comp_map:
+                    comp = comp_map[node_tokens[1]]
+                elif node in comp_map:
+                    comp = comp_map[node]
+                else:
+                    continue
 
-                            if func.graph.has_node(node_v_tokens[1]):
-                                node_v_c = node_v_tokens[1]
-                            elif func.graph.has_node(node_v):
-                                node_v_c = node_v
-                            else:
-                                continue
+                groups.setdefault((node_tokens[0], comp), []).append(node)
 
-                            if nx.has_path(func.graph, node_u_c, node_v_c):
-                                link_attrs = def_link_attrs
-                                link_attrs['label'] = node_u + '-' + node_v
-                                link_attrs['level'] = 1
-                                link_attrs['type'] = 'iface'
-                                graph.add_edge(node_u, node_v,
-                                               attr_dict=link_attrs)
+            for group in groups.values():
+                for node_u, node_v in itertools.combinations(group, 2):
+                    link_attrs = def_link_attrs.copy()
+                    link_attrs['label'] = node_u + '-' + node_v
+                    link_attrs['level'] = 1
+                    link_attrs['type'] = 'iface'
+                    graph.add_edge(node_u, node_v, attr_dict=link_attrs)
 
         return graph
 
+    @staticmethod
+    def _component_map(graph):
+        """
+        Maps each node of a graph to the index of the connected component
+        it belongs to.
+        :param graph: undirected graph (networkx.Graph)
+        :return: dictionary of node -> component index
+        """
+        comp_map = {}
+        for idx, component in enumerate(nx.connected_components(graph)):
+            for node in component:
+                comp_map[node] = idx
+        return comp_map
+
     def load_forwarding_graphs(self):
         """
         Load all forwarding paths of all forwarding graphs, defined in the
         service content.
         """
+        index = self.cp_index
         for fgraph in self.content['forwarding_graphs']:
             s_fwgraph = dict()
             s_fwgraph['fg_id'] = fgraph['fg_id']
@@ -929,10 +1226,10 @@ class Service(Descriptor):
                 path_dict = {}
                 for cp in fpath['connection_points']:
                     cpr = cp['connection_point_ref']
-                    s_cpr = cpr.split(':')
+                    ref = index.resolve(cpr)
                     pos = cp['position']
 
-                    if len(s_cpr) == 1 and cpr not in self.connection_points:
+                    if ref.owner is self and not ref.declared:
                         evtlog.log("Undefined connection point",
                                    "Connection point '{0}' of forwarding path "
                                    "'{1}' is not defined"
@@ -940,18 +1237,15 @@ class Service(Descriptor):
                                    self.id,
                                    'evt_nsd_top_fwgraph_cpoint_undefined')
                         return
-                    elif len(s_cpr) == 2:
-                        # get corresponding function
-                        func = self.mapped_function(s_cpr[0])
-                        if not func or (func and s_cpr[1]
-                                        not in func.connection_points):
-                            evtlog.log("Undefined connection point",
-                                       "Connection point '{0}' of forwarding "
-                                       "path '{1}' is not defined"
-                                       .format(cpr, fpath['fp_id']),
-                                       self.id,
-                                       'evt_nsd_top_fwgraph_cpoint_undefined')
-                            return
+                    elif ref.prefix is not None and not ref.declared:
+                        # unknown function or function connection point
+                        evtlog.log("Undefined connection point",
+                                   "Connection point '{0}' of forwarding "
+                                   "path '{1}' is not defined"
+                                   .format(cpr, fpath['fp_id']),
+                                   self.id,
+                                   'evt_nsd_top_fwgraph_cpoint_undefined')
+                        return
 
                     if pos in path_dict:
                         evtlog.log("Duplicate reference in FG",
@@ -1008,22 +1302,28 @@ class Service(Descriptor):
             if not self._graph.has_node(path[x]):
                 trace.append("BREAK")
                 continue
-            neighbours = self._graph.neighbors(path[x])
-            if path[x+1] not in neighbours:
+            if not self._graph.has_edge(path[x], path[x+1]):
                 trace.append("BREAK")
         trace.append(path[-1])
         return trace
 
     def trace_path_pairs(self, path):
+        """
+        Trace a forwarding path along the service topology, by pairs of
+        interfaces. A pair is marked as 'break' if its interfaces are not
+        adjacent in the topology graph.
+        :param path: forwarding path ordered interface list
+        :return: list of pair dicts {'break', 'from', 'to'}
+        """
         trace = []
         for x in range(0, len(path), 2):
             if x+1 >= len(path):
                 node_pair = {'break': False, 'from': path[x], 'to': None}
             else:
                 node_pair = {'break': False, 'from': path[x], 'to': path[x+1]}
-                
-                if path[x] not in self.graph.nodes() or \
-                        path[x+1] not in self._graph.neighbors(path[x]):
+
+                # graph adjacency is hash-based: O(1) per pair
+                if not self._graph.has_edge(path[x], path[x+1]):
                     node_pair['break'] = True
             trace.append(node_pair)
         return trace
@@ -1034,22 +1334,24 @@ class Service(Descriptor):
         'virtual_links' section but not declared in 'connection_points'
         of the Service or its Functions.
         """
-        target_cp_refs = self.vlink_cp_refs + self.vbridge_cp_refs
-
+        index = self.cp_index
         undeclared_cps = []
-        for cpr in target_cp_refs:
-            cpr_split = cpr.split(':')
-            if len(cpr_split) == 1 and cpr not in self.connection_points:
+        for cpr in index.vlink_refs + index.vbridge_refs:
+            s_cpr = cpr.split(':')
+            # only the function and connection point parts of longer
+            # references are checked
+            ref = index.resolve(cpr if len(s_cpr) <= 2
+                                else ':'.join(s_cpr[:2]))
+            # references to unknown functions are reported by the
+            # integrity validation
+            if ref.owner is not None and not ref.declared:
                 undeclared_cps.append(cpr)
-            else:
-                f = self.mapped_function(cpr_split[0])
-                if f and cpr_split[1] not in f.connection_points:
-                    undeclared_cps.append(cpr)
 
         return undeclared_cps
 
 
 class Function(Descriptor):
+    __slots__ = ('_units',)
 
     def __init__(self, descriptor_file):
         """
@@ -1067,6 +1369,9 @@ class Function(Descriptor):
         """
         return self._units
 
+    def cp_owner(self, prefix):
+        return self._units.get(prefix)
+
     def associate_unit(self, unit):
         """
         Associate a unit to the function.
@@ -1081,6 +1386,7 @@ class Function(Descriptor):
             return
 
         self._units[unit.id] = unit
+        self.invalidate_cache()
 
     def load_units(self):
         """
@@ -1131,8 +1437,26 @@ class Function(Descriptor):
             for cp in vdu['connection_points']:
                 unit.add_connection_point(cp['id'])
 
+        self.invalidate_cache()
         return True
 
+    def topology_graph(self, bridges=False, parent_id='', level=0,
+                       vdu_inner_connections=True):
+        """
+        Provides the network topology graph of the function. Graphs are
+        built on first request and memoised per level and settings.
+        The returned graph is shared and must not be modified.
+        See 'build_topology_graph' for a description of the parameters.
+        :return: topology graph (networkx.Graph)
+        """
+        key = (level, bridges, parent_id, vdu_inner_connections)
+        if key not in self._graphs:
+            self._graphs[key] = self.build_topology_graph(
+                bridges=bridges, parent_id=parent_id, level=level,
+                vdu_inner_connections=vdu_inner_connections)
+        return self._graphs[key]
+
+    @trace.traced(category='son.validate')
     def build_topology_graph(self, bridges=False, parent_id='', level=0,
                              vdu_inner_connections=True):
         """
@@ -1157,34 +1481,31 @@ class Function(Descriptor):
                           'type': ''}
 
         # assign nodes from function
-
-        cp_refs = self.vlink_cp_refs
+        index = self.cp_index
+        cp_refs = index.vlink_refs
         if bridges:
-            cp_refs += self.vbridge_cp_refs
+            cp_refs += index.vbridge_refs
 
         for cpr in cp_refs:
             node_attrs = def_node_attrs.copy()
-            s_cpr = cpr.split(':')
-            unit = self.units[s_cpr[0]] if s_cpr[0] in self.units else None
-            if len(s_cpr) > 1 and unit:
+            ref = index.resolve(cpr)
+            if ref.prefix is not None and ref.owner is not None:
 
-                if level == 0:
-                    iface = s_cpr[0]
                 node_attrs['parent_id'] = self.id
                 node_attrs['level'] = 2
-                node_attrs['node_id'] = unit.id
-                node_attrs['node_label'] = unit.id
+                node_attrs['node_id'] = ref.owner.id
+                node_attrs['node_label'] = ref.owner.id
             else:
                 node_attrs['parent_id'] = parent_id
                 node_attrs['level'] = 1
                 node_attrs['node_id'] = self.id
-                node_attrs['node_label'] = self.content['name']
+                node_attrs['node_label'] = self.name
 
-            node_attrs['label'] = s_cpr[1] if len(s_cpr) > 1 else cpr
+            node_attrs['label'] = ref.cp
 
-            if cpr in self.vlink_cp_refs:
+            if index.in_vlinks(cpr):
                 node_attrs['type'] = 'iface'
-            elif cpr in self.vbridge_cp_refs:
+            elif index.in_vbridges(cpr):
                 node_attrs['type'] = 'br-iface'
 
             graph.add_node(cpr, attr_dict=node_attrs)
@@ -1199,12 +1520,14 @@ class Function(Descriptor):
 
             if level == 0:
                 # unit interfaces not considered as nodes, just the unit itself
-                if vl.cpr_u not in self.connection_points and len(cpr_u) > 1:
+                if not self.has_connection_point(vl.cpr_u) and \
+                        len(cpr_u) > 1:
                     cpr_u = cpr_u[0]
                 else:
                     cpr_u = vl.cpr_u
 
-                if vl.cpr_v not in self.connection_points and len(cpr_v) > 1:
+                if not self.has_connection_point(vl.cpr_v) and \
+                        len(cpr_v) > 1:
                     cpr_v = cpr_v[0]
                 else:
                     cpr_v = vl.cpr_v
@@ -1243,8 +1566,8 @@ class Function(Descriptor):
                             if graph.has_edge(u_cp, v_cp):
                                 continue
                             if not bridges and (
-                                    u_cp in self.vbridge_cp_refs or
-                                    v_cp in self.vbridge_cp_refs):
+                                    index.in_vbridges(u_cp) or
+                                    index.in_vbridges(v_cp)):
                                 continue
                             edge_attrs['level'] = 2
                             edge_attrs['label'] = 'VDU_IN'
@@ -1279,32 +1602,27 @@ class Function(Descriptor):
         section but not declared in 'connection_points' of the Function and its
         Units.
         """
-        target_cp_refs = self.vlink_cp_refs + self.vbridge_cp_refs
-
+        index = self.cp_index
         undeclared_cps = []
-        for cpr in target_cp_refs:
-            cpr_split = cpr.split(':')
-            if len(cpr_split) == 1 and cpr not in self.connection_points:
+        for cpr in index.vlink_refs + index.vbridge_refs:
+            # references of more than two parts aren't checked
+            if cpr.count(':') > 1:
+                continue
+            if not index.resolve(cpr).declared:
                 undeclared_cps.append(cpr)
-            elif len(cpr_split) == 2:
-                if not cpr_split[0] in self.units:
-                    undeclared_cps.append(cpr)
-                else:
-                    vdu = self.units[cpr_split[0]]
-                    if cpr_split[1] not in vdu.connection_points:
-                        undeclared_cps.append(cpr)
 
         return undeclared_cps
 
 
 class Unit(Node):
+    __slots__ = ()
+
     def __init__(self, uid):
         """
         Initialize a unit object. This inherits the node object.
         :param uid: unit id
         """
-        self._id = uid
-        super().__init__(self._id)
+        super().__init__(intern_id(uid))
 
     @property
     def id(self):
@@ -0,0 +1,228 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+import fnmatch
+import threading
+import time
+
+
+class StandInRedis(object):
+    """
+    In-memory stand-in of the Redis commands used by the validation
+    service, to test it without a Redis server. Several clients (e.g.
+    workers) may share an instance, as they would share a server.
+    """
+
+    def __init__(self, decode_responses=True):
+        self._data = dict()
+        self._cond = threading.Condition()
+        self._decode = decode_responses
+
+    def client(self, decode_responses=True):
+        """
+        Provides another client of the same server.
+        """
+        other = StandInRedis(decode_responses=decode_responses)
+        other._data = self._data
+        other._cond = self._cond
+        return other
+
+    def _value(self, value):
+        if type(value) is bytes:
+            return value.decode('utf-8') if self._decode else value
+        value = value if type(value) is str else str(value)
+        return value if self._decode else value.encode('utf-8')
+
+    @staticmethod
+    def _name(name):
+        return name.decode('utf-8') if type(name) is bytes else name
+
+    def _out(self, value):
+        if value is None:
+            return None
+        if self._decode:
+            return value.decode('utf-8') if type(value) is bytes else value
+        return value.encode('utf-8') if type(value) is str else value
+
+    def set(self, name, value, nx=False, ex=None):
+        with self._cond:
+            if nx and name in self._data:
+                return None
+            self._data[name] = self._value(value)
+            return True
+
+    def get(self, name):
+        with self._cond:
+            return self._out(self._data.get(name))
+
+    def delete(self, *names):
+        with self._cond:
+            return sum(1 for name in names
+                       if self._data.pop(self._name(name), None) is not None)
+
+    def exists(self, name):
+        with self._cond:
+            return int(name in self._data)
+
+    def expire(self, name, time):
+        return name in self._data
+
+    def scan_iter(self, match='*'):
+        with self._cond:
+            names = [name for name in self._data
+                     if fnmatch.fnmatchcase(name, match)]
+        return iter(self._out(name) for name in names)
+
+    def hset(self, name, key=None, value=None, mapping=None):
+        with self._cond:
+            fields = self._data.setdefault(name, dict())
+            if key is not None:
+                mapping = {key: value}
+            for field, val in mapping.items():
+                fields[field] = self._value(val)
+            return len(mapping)
+
+    def hget(self, name, key):
+        with self._cond:
+            return self._out(self._data.get(name, dict()).get(key))
+
+    def hgetall(self, name):
+        with self._cond:
+            return {self._out(field): self._out(value) for field, value in
+                    self._data.get(name, dict()).items()}
+
+    def hdel(self, name, *keys):
+        with self._cond:
+            fields = self._data.get(name, dict())
+            return sum(1 for key in keys if fields.pop(key, None) is not None)
+
+    def hincrby(self, name, key, amount=1):
+        with self._cond:
+            fields = self._data.setdefault(name, dict())
+            fields[key] = self._value(int(self._out(fields.get(key)) or 0) +
+                                      amount)
+            return int(fields[key])
+
+    def sadd(self, name, *values):
+        with self._cond:
+            members = self._data.setdefault(name, set())
+            for value in values:
+                members.add(self._name(value))
+            return len(values)
+
+    def smembers(self, name):
+        with self._cond:
+            return {self._out(value) for value in
+                    self._data.get(name, set())}
+
+    def lpush(self, name, value):
+        with self._cond:
+            self._data.setdefault(name, list()).insert(0, self._value(value))
+            self._cond.notify_all()
+            return len(self._data[name])
+
+    def rpush(self, name, value):
+        with self._cond:
+            self._data.setdefault(name, list()).append(self._value(value))
+            self._cond.notify_all()
+            return len(self._data[name])
+
+    def brpop(self, keys, timeout=0):
+        deadline = time.time() + timeout
+        with self._cond:
+            while True:
+                for key in keys:
+                    if self._data.get(key):
+                        return key, self._out(self._data[key].pop())
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def brpoplpush(self, src, dst, timeout=0):
+        deadline = time.time() + timeout
+        with self._cond:
+            while not self._data.get(src):
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            value = self._data[src].pop()
+            self._data.setdefault(dst, list()).insert(0, value)
+            return self._out(value)
+
+    def lrem(self, name, count, value):
+        with self._cond:
+            values = self._data.get(name, list())
+            value = self._value(value)
+            removed = 0
+            while value in values and (not count or removed < count):
+                values.remove(value)
+                removed += 1
+            return removed
+
+    def llen(self, name):
+        with self._cond:
+            return len(self._data.get(name, list()))
+
+    def lrange(self, name, start, end):
+        with self._cond:
+            values = self._data.get(name, list())
+            values = values[start:] if end == -1 else values[start:end + 1]
+            return [self._out(value) for value in values]
+
+    def ltrim(self, name, start, end):
+        with self._cond:
+            values = self._data.get(name, list())
+            self._data[name] = values[start:] if end == -1 \
+                else values[start:end + 1]
+
+    def pipeline(self, transaction=True):
+        return StandInPipeline(self)
+
+
+class StandInPipeline(object):
+    """
+    Pipeline of a StandInRedis client: commands are queued and executed
+    together, holding the server lock.
+    """
+
+    def __init__(self, client):
+        self._client = client
+        self._commands = []
+
+    def __getattr__(self, command):
+        def queue(*args, **kwargs):
+            self._commands.append((command, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        with self._client._cond:
+            results = [getattr(self._client, command)(*args, **kwargs)
+                       for command, args, kwargs in self._commands]
+        self._commands = []
+        return results
@@ -0,0 +1,291 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+import os
+import gzip
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from son.validate.api import api
+from son.validate.api.artifacts import ArtifactStore
+from son.validate.api.jobs import JobQueue, RedisJobQueue
+from son.validate.api.store import MemoryStore
+from son.validate.tests.redis_standin import StandInRedis
+
+SAMPLES_DIR = os.path.join('src', 'son', 'validate', 'tests', 'samples')
+
+
+class ValidateApiTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._cache = api.cache
+        api.cache = MemoryStore()
+        self.client = api.app.test_client()
+
+    def tearDown(self):
+        api.cache = self._cache
+        api.topology_sources.clear()
+
+
+class UnitValidateApiReportTests(ValidateApiTestCase):
+
+    def _validate_project(self):
+        response = self.client.post('/validate/project', data={
+            'source': 'local', 'syntax': True, 'integrity': True,
+            'topology': True,
+            'path': os.path.join(SAMPLES_DIR, 'sample_project_valid')})
+        self.assertEqual(response.status_code, 200)
+        rid = json.loads(response.data.decode('utf-8'))['resource_id']
+        return rid, api.get_resource(rid)['latest_vid']
+
+    def test_lazy_reports(self):
+        """
+        Network reports are only generated, and cached, when requested.
+        """
+        rid, vid = self._validate_project()
+        self.assertEqual(list(api.get_validation(vid)), ['result'])
+
+        response = self.client.get('/report/topology/' + rid)
+        self.assertEqual(response.status_code, 200)
+        topology = json.loads(response.data.decode('utf-8'))
+        self.assertTrue(topology['nodes'])
+        self.assertTrue(topology['links'])
+        self.assertNotIn(b'\n', response.data)
+
+        response = self.client.get('/report/fwgraph/' + rid)
+        self.assertEqual(response.status_code, 200)
+        fwgraph = json.loads(response.data.decode('utf-8'))
+        self.assertEqual(fwgraph[0]['fg_id'], 'fg01')
+
+        self.assertEqual(sorted(api.get_validation(vid)),
+                         ['net_fwgraph', 'net_topology', 'result'])
+
+    def test_graphml_report(self):
+        rid, vid = self._validate_project()
+        topology = json.loads(self.client.get('/report/topology/' + rid)
+                              .data.decode('utf-8'))
+
+        response = self.client.get('/report/topology/' + rid +
+                                   '?format=graphml')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data.startswith(b'<graphml'))
+        self.assertEqual(response.data.count(b'<node '),
+                         len(topology['nodes']))
+
+        response = self.client.get('/report/topology/' + rid +
+                                   '?format=dot')
+        self.assertEqual(response.status_code, 400)
+
+    def test_reused_validator_reports(self):
+        """
+        The network reports of a validation by a reused validator (e.g. of
+        a watch) are snapshotted, unaffected by its next validations.
+        """
+        path = os.path.join(SAMPLES_DIR, 'sample_project_valid')
+        validator = api.create_validator(True, True, True)
+        result = api._validate_object(path, path, 'project', True, True,
+                                      True, validator=validator)
+        rid = json.loads(result.decode('utf-8'))['resource_id']
+        vid = api.get_resource(rid)['latest_vid']
+
+        self.assertNotIn(vid, api.topology_sources)
+        topology = api.get_validation(vid)['net_topology']
+        validator.storage.services.clear()
+        response = self.client.get('/report/topology/' + rid)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, topology)
+
+    def test_gzip_report(self):
+        rid, vid = self._validate_project()
+        plain = self.client.get('/report/topology/' + rid)
+        self.assertNotIn('Content-Encoding', plain.headers)
+
+        response = self.client.get('/report/topology/' + rid,
+                                   headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertLess(len(response.data), len(plain.data))
+        self.assertEqual(gzip.decompress(response.data), plain.data)
+
+
+class UnitValidateApiMetricsTests(ValidateApiTestCase):
+
+    def _cache_requests(self):
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        counts = {'hit': 0, 'miss': 0}
+        for line in response.data.decode('utf-8').splitlines():
+            if line.startswith(
+                    'son_validate_api_result_cache_requests_total{'):
+                result = line.split('"')[1]
+                counts[result] = float(line.split()[-1])
+        return counts
+
+    def test_cache_metrics(self):
+        before = self._cache_requests()
+        data = {'source': 'local', 'syntax': True, 'integrity': True,
+                'topology': True,
+                'path': os.path.join(SAMPLES_DIR, 'sample_project_valid')}
+        for _ in range(3):
+            response = self.client.post('/validate/project', data=data)
+            self.assertEqual(response.status_code, 200)
+
+        after = self._cache_requests()
+        self.assertEqual(after['miss'] - before['miss'], 1)
+        self.assertEqual(after['hit'] - before['hit'], 2)
+
+
+def stream_records(response):
+    return [json.loads(line) for line in
+            response.data.decode('utf-8').splitlines()]
+
+
+class UnitValidateApiStreamTests(ValidateApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self._job_queue = api.job_queue
+        api.job_queue = JobQueue(workers=1)
+
+    def tearDown(self):
+        api.job_queue.shutdown()
+        api.job_queue = self._job_queue
+        super().tearDown()
+
+    def test_stream_job(self):
+        """
+        Streamed validations run as jobs of the job queue.
+        """
+        response = self.client.post('/validate/project', data={
+            'source': 'local', 'syntax': True, 'integrity': True,
+            'topology': True, 'stream': 'jsonl',
+            'path': os.path.join(SAMPLES_DIR, 'sample_project_valid')})
+        self.assertEqual(response.status_code, 200)
+
+        records = stream_records(response)
+        self.assertEqual(records[0]['type'], 'validation')
+        self.assertIn('stage', [record['type'] for record in records])
+        self.assertEqual(records[-1]['type'], 'result')
+        self.assertEqual(records[-1]['result']['error_count'], 0)
+        self.assertEqual(api.job_queue.stats()['completed'], 1)
+
+
+class UnitValidateApiRedisJobTests(ValidateApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self._job_queue = api.job_queue
+        api.job_queue = RedisJobQueue(StandInRedis())
+        api.metrics.track_job_queue(api.job_queue)
+        self._artifacts = api.artifacts
+        api.artifacts = ArtifactStore(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(api.artifacts.root, True)
+        api.artifacts = self._artifacts
+        api.metrics.track_job_queue(self._job_queue)
+        api.job_queue = self._job_queue
+        super().tearDown()
+
+    def _project_validations(self):
+        response = self.client.get('/metrics')
+        for line in response.data.decode('utf-8').splitlines():
+            if line.startswith('son_validate_api_validation_cpu_seconds_'
+                               'count{object_type="project"}'):
+                return float(line.split()[-1])
+        return 0
+
+    def test_worker_job(self):
+        """
+        Workers validate the object sent along with the job, even if it's
+        no longer available, and the service records their metrics.
+        """
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, True)
+        project = os.path.join(root, 'project')
+        shutil.copytree(os.path.join(SAMPLES_DIR, 'sample_project_valid'),
+                        project)
+        before = self._project_validations()
+
+        response = self.client.post('/validate/project', data={
+            'source': 'local', 'syntax': True, 'integrity': True,
+            'topology': True, 'async': True, 'path': project})
+        self.assertEqual(response.status_code, 202)
+        job_id = json.loads(response.data.decode('utf-8'))['job_id']
+
+        shutil.rmtree(project)
+        api.job_queue.work(api.run_validation_job, max_jobs=1, timeout=1)
+
+        response = self.client.get('/jobs/' + job_id)
+        self.assertEqual(response.status_code, 200)
+        status = json.loads(response.data.decode('utf-8'))
+        self.assertEqual(status['result']['error_count'], 0)
+        self.assertEqual(self._project_validations() - before, 1)
+
+    def test_pending_reports(self):
+        """
+        Reports of a resource whose asynchronous validation is in flight,
+        or of an unknown resource, aren't found.
+        """
+        response = self.client.post('/validate/project', data={
+            'source': 'local', 'syntax': True, 'integrity': True,
+            'topology': True, 'async': True,
+            'path': os.path.join(SAMPLES_DIR, 'sample_project_valid')})
+        self.assertEqual(response.status_code, 202)
+        status = json.loads(response.data.decode('utf-8'))
+        self.assertEqual(status['status'], 'queued')
+
+        for rid in (status['resource_id'], 'unknown'):
+            for report in ('result', 'topology', 'fwgraph'):
+                response = self.client.get(
+                    '/report/{0}/{1}'.format(report, rid))
+                self.assertEqual(response.status_code, 404)
+
+        # available once the job is processed
+        api.job_queue.work(api.run_validation_job, max_jobs=1, timeout=1)
+        response = self.client.get('/report/result/' +
+                                   status['resource_id'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_worker_stream(self):
+        """
+        Streams of validations run by workers end with their result.
+        """
+        worker = threading.Thread(
+            target=api.job_queue.work, args=(api.run_validation_job,),
+            kwargs={'max_jobs': 1, 'timeout': 10})
+        worker.start()
+        response = self.client.post('/validate/project', data={
+            'source': 'local', 'syntax': True, 'integrity': True,
+            'topology': True, 'stream': 'jsonl',
+            'path': os.path.join(SAMPLES_DIR, 'sample_project_valid')})
+        worker.join()
+
+        records = stream_records(response)
+        self.assertEqual([record['type'] for record in records],
+                         ['validation', 'result'])
+        self.assertEqual(records[-1]['result']['error_count'], 0)
@@ -0,0 +1,195 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+import io
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from son.validate.api.artifacts import ArtifactStore
+
+SAMPLES_DIR = os.path.join('src', 'son', 'validate', 'tests', 'samples')
+
+
+class UnitArtifactStoreTests(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, True)
+        self.store = ArtifactStore(os.path.join(self.root, 'store'))
+
+    def test_put_stream(self):
+        """
+        Identical contents are stored once and share the same artifact.
+        """
+        path1 = self.store.put_stream(io.BytesIO(b'name: a\n'), 'vnfd.yml')
+        path2 = self.store.put_stream(io.BytesIO(b'name: a\n'), 'vnfd.yml')
+        path3 = self.store.put_stream(io.BytesIO(b'name: b\n'), 'vnfd.yml')
+
+        self.assertEqual(path1, path2)
+        self.assertNotEqual(path1, path3)
+        self.assertEqual(os.path.basename(path3), 'vnfd.yml')
+        with open(path3, 'rb') as _f:
+            self.assertEqual(_f.read(), b'name: b\n')
+
+        # same content under another name shares the stored blob
+        path4 = self.store.put_stream(io.BytesIO(b'name: a\n'), 'other.yml')
+        self.assertEqual(os.path.basename(path4), 'other.yml')
+        self.assertTrue(os.path.samefile(path1, path4))
+
+    def test_put_tree(self):
+        """
+        Snapshots of unchanged directories are reused.
+        """
+        project = os.path.join(self.root, 'project')
+        shutil.copytree(os.path.join(SAMPLES_DIR, 'sample_project_valid'),
+                        project)
+
+        path1 = self.store.put_tree(project)
+        path2 = self.store.put_tree(project)
+        self.assertEqual(path1, path2)
+        self.assertEqual(os.path.basename(path1), 'project')
+        for root, dirs, files in os.walk(project):
+            relroot = os.path.relpath(root, project)
+            for filename in files:
+                self.assertTrue(os.path.isfile(
+                    os.path.join(path1, relroot, filename)))
+
+        with open(os.path.join(project, 'project.yml'), 'a') as _f:
+            _f.write('\n')
+        path3 = self.store.put_tree(project)
+        self.assertNotEqual(path1, path3)
+        # unchanged files share the stored blobs
+        self.assertTrue(os.path.samefile(
+            os.path.join(path1, 'sources', 'nsd',
+                         'sonata-demo-with-ssm.yml'),
+            os.path.join(path3, 'sources', 'nsd',
+                         'sonata-demo-with-ssm.yml')))
+
+    def test_pack(self):
+        """
+        Artifacts packed by a store are stored identically by another
+        store, e.g. of a worker host.
+        """
+        other = ArtifactStore(os.path.join(self.root, 'other'))
+        tree = self.store.put_tree(
+            os.path.join(SAMPLES_DIR, 'sample_project_valid'))
+        path = self.store.put_stream(io.BytesIO(b'name: a\n'), 'vnfd.yml')
+
+        other_tree = other.put_packed(ArtifactStore.pack(tree),
+                                      'sample_project_valid', tree=True)
+        other_path = other.put_packed(ArtifactStore.pack(path), 'vnfd.yml')
+        self.assertEqual(os.path.relpath(tree, self.store.root),
+                         os.path.relpath(other_tree, other.root))
+        self.assertEqual(os.path.relpath(path, self.store.root),
+                         os.path.relpath(other_path, other.root))
+
+    def test_evict_age(self):
+        """
+        Unused artifacts expire.
+        """
+        self.store.max_age = 60
+        old = self.store.put_stream(io.BytesIO(b'old'), 'old.yml')
+        past = time.time() - 120
+        os.utime(os.path.dirname(old), (past, past))
+
+        new = self.store.put_stream(io.BytesIO(b'new'), 'new.yml')
+        self.assertFalse(os.path.exists(old))
+        self.assertTrue(os.path.exists(new))
+        self.assertEqual(self.store.size(), 3)
+
+    def test_evict_size(self):
+        """
+        Least recently used artifacts are evicted beyond the maximum size,
+        except those used recently.
+        """
+        self.store.max_size = 2500
+        self.store.grace = 60
+        paths = []
+        for i in range(3):
+            paths.append(self.store.put_stream(
+                io.BytesIO(bytes([i]) * 1000), '{0}.son'.format(i)))
+            past = time.time() - 120 + i
+            os.utime(os.path.dirname(paths[-1]), (past, past))
+
+        # the least recently used artifact is evicted
+        paths.append(self.store.put_stream(io.BytesIO(b'x' * 1000), 'x.son'))
+        self.assertEqual([os.path.exists(p) for p in paths],
+                         [False, False, True, True])
+        self.assertLessEqual(self.store.size(), 2500)
+
+        # recently used artifacts are kept, even beyond the maximum size
+        self.store.put_stream(io.BytesIO(b'y' * 1000), 'y.son')
+        self.store.put_stream(io.BytesIO(b'z' * 1000), 'z.son')
+        self.assertGreater(self.store.size(), 2500)
+
+    def test_evict_shared(self):
+        """
+        Evicting a view doesn't release the blobs shared with other views.
+        """
+        self.store.max_size = 1500
+        self.store.grace = 0
+        past = time.time() - 120
+        trees = []
+        for i in range(2):
+            # trees of the same file content, under other names
+            tree = os.path.join(self.root, 'tree{0}'.format(i))
+            os.makedirs(tree)
+            with open(os.path.join(tree, 'vnfd.yml'), 'wb') as _f:
+                _f.write(b'x' * 1000)
+            trees.append(self.store.put_tree(tree))
+            os.utime(os.path.dirname(trees[-1]), (past + i, past + i))
+
+        # the oldest tree is evicted, yet the store still exceeds its
+        # maximum size: the other tree is evicted as well
+        new = self.store.put_stream(io.BytesIO(b'y' * 1000), 'y.son')
+        self.assertEqual([os.path.exists(p) for p in trees + [new]],
+                         [False, False, True])
+        self.assertEqual(self.store.size(), 1000)
+
+    def test_remove_temp(self):
+        """
+        Temporary files are removed, stored artifacts are kept.
+        """
+        path = self.store.put_stream(io.BytesIO(b'name: a\n'), 'vnfd.yml')
+        tmp_dir = os.path.join(self.store.root, 'tmp', str(os.getpid()))
+        with open(os.path.join(tmp_dir, 'partial'), 'wb') as _f:
+            _f.write(b'name')
+
+        self.store.remove_temp()
+        self.assertFalse(os.path.exists(tmp_dir))
+        self.assertTrue(os.path.isfile(path))
+
+    def test_clear(self):
+        path = self.store.put_stream(io.BytesIO(b'name: a\n'), 'vnfd.yml')
+        self.store.clear()
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(os.path.exists(self.store.root))
+
+        # the store is still usable
+        path = self.store.put_stream(io.BytesIO(b'name: a\n'), 'vnfd.yml')
+        self.assertTrue(os.path.isfile(path))
@@ -0,0 +1,115 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+import os
+import shutil
+import tempfile
+import unittest
+from xml.etree import ElementTree
+from son.validate import batch
+
+SAMPLES_DIR = os.path.join('src', 'son', 'validate', 'tests', 'samples')
+PACKAGES_DIR = os.path.join(SAMPLES_DIR, 'packages')
+
+
+class UnitBatchValidationTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, True)
+
+    def test_expand_targets(self):
+        targets = batch.expand_targets([
+            os.path.join(PACKAGES_DIR, 'sonata-demo-valid.so*'),
+            os.path.join(SAMPLES_DIR, 'sample_project_valid'),
+            os.path.join(SAMPLES_DIR, 'services', 'valid.yml')])
+        self.assertEqual(targets, [
+            (os.path.join(PACKAGES_DIR, 'sonata-demo-valid.son'),
+             'package'),
+            (os.path.join(SAMPLES_DIR, 'sample_project_valid'), 'project'),
+            (os.path.join(SAMPLES_DIR, 'services', 'valid.yml'), None)])
+
+        # functions of a directory are validated separately
+        functions_dir = os.path.join(SAMPLES_DIR, 'functions', 'valid')
+        targets = batch.expand_targets([functions_dir], obj_type='function')
+        self.assertEqual(len(targets), 3)
+        self.assertEqual({os.path.dirname(path) for path, _ in targets},
+                         {functions_dir})
+
+    def _targets(self):
+        return batch.expand_targets([
+            os.path.join(PACKAGES_DIR, 'sonata-demo-valid.son'),
+            os.path.join(PACKAGES_DIR, 'sonata-demo-invalid-struct-1.son'),
+            os.path.join(PACKAGES_DIR, 'sonata-demo-invalid-integrity-1.son'),
+            os.path.join(PACKAGES_DIR, 'missing.son')])
+
+    def test_validate_batch(self):
+        """
+        Validation carries on past failures, reporting all targets in
+        order.
+        """
+        progress = []
+        summary = batch.validate_batch(self._targets(), jobs=1,
+                                       progress=progress.append)
+
+        self.assertEqual([r['status'] for r in summary['results']],
+                         ['passed', 'failed', 'failed', 'error'])
+        self.assertEqual((summary['targets'], summary['passed'],
+                          summary['failed'], summary['errors']), (4, 1, 2, 1))
+        self.assertEqual(len(progress), 4)
+        for result in summary['results']:
+            self.assertGreaterEqual(result['duration'], 0)
+        self.assertEqual(summary['results'][2]['errors'][0]['event_code'],
+                         'evt_pd_itg_invalid_reference')
+
+    def test_validate_batch_pool(self):
+        """
+        Targets validated by a pool of workers have the same results.
+        """
+        serial = batch.validate_batch(self._targets(), jobs=1)
+        parallel = batch.validate_batch(self._targets(), jobs=2)
+        self.assertEqual(parallel['jobs'], 2)
+        self.assertEqual(
+            [(r['target'], r['status'], r['error_count'])
+             for r in parallel['results']],
+            [(r['target'], r['status'], r['error_count'])
+             for r in serial['results']])
+
+    def test_reports(self):
+        summary = batch.validate_batch(self._targets(), jobs=1)
+        junit_file = os.path.join(self.tmp_dir, 'junit.xml')
+        batch.write_junit(summary, junit_file)
+        batch.write_json(summary, os.path.join(self.tmp_dir, 'summary.json'))
+
+        suite = ElementTree.parse(junit_file).getroot()
+        self.assertEqual(suite.get('tests'), '4')
+        self.assertEqual(suite.get('failures'), '2')
+        self.assertEqual(suite.get('errors'), '1')
+        cases = suite.findall('testcase')
+        self.assertEqual([case.find('failure') is not None
+                          for case in cases], [False, True, True, False])
+        self.assertIsNotNone(cases[3].find('error'))
+        self.assertIn('is not packaged', cases[2].find('failure').text)
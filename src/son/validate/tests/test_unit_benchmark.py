@@ -0,0 +1,118 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+import os
+import shutil
+import tempfile
+import unittest
+from son.validate.benchmark import bench_catalogue, bench_interconnect, \
+    bench_requests, bench_synthetic, forwarding_graph, latency_summary, \
+    load_service, write_synthetic_service
+from son.validate.cycles import find_cycles
+from son.validate.storage import DescriptorStorage
+
+SAMPLES_DIR = os.path.join('src', 'son', 'validate', 'tests', 'samples')
+
+
+class UnitBenchmarkTests(unittest.TestCase):
+
+    def test_latency_summary(self):
+        summary = latency_summary([0.004, 0.001, 0.003, 0.002])
+        self.assertEqual(summary['count'], 4)
+        self.assertAlmostEqual(summary['p50_ms'], 3)
+        self.assertAlmostEqual(summary['max_ms'], 4)
+        self.assertEqual(latency_summary([]), {'count': 0})
+
+    def test_bench_requests(self):
+        path = os.path.join(SAMPLES_DIR, 'functions', 'valid',
+                            'firewall-vnfd.yml')
+        for warm in (False, True):
+            summary = bench_requests(path, 'function', runs=3, warm=warm)
+            self.assertEqual(summary['count'], 3)
+            self.assertGreater(summary['p50_ms'], 0)
+
+    def test_synthetic_service(self):
+        root = tempfile.mkdtemp()
+        try:
+            nsd_file, vnfd_files = write_synthetic_service(
+                root, 6, 2, num_cps=3, num_bridges=2, num_paths=3,
+                cycle_density=1.0)
+            service = load_service(DescriptorStorage(), nsd_file,
+                                   vnfd_files)
+            self.assertEqual(len(vnfd_files), 6)
+            self.assertEqual(len(service.vbridges), 2)
+            self.assertEqual(len(service.vbridges['br1']
+                                 .connection_point_refs), 6)
+
+            # every forwarding path follows the topology
+            graph = service.topology_graph(level=1)
+            fpg = forwarding_graph(service)
+            for fw_graph in service.content['forwarding_graphs']:
+                for fw_path in fw_graph['network_forwarding_paths']:
+                    path = [cp['connection_point_ref']
+                            for cp in fw_path['connection_points']]
+                    for x in range(0, len(path), 2):
+                        self.assertTrue(graph.has_edge(path[x], path[x+1]))
+
+            # paths taking back links close cycles between functions
+            cycles, truncated = find_cycles(fpg, min_length=3)
+            self.assertEqual(len(cycles), 2)
+            self.assertFalse(truncated)
+        finally:
+            shutil.rmtree(root)
+
+        self.assertRaises(ValueError, write_synthetic_service, root, 2, 1,
+                          num_bridges=1)
+
+    def test_bench_synthetic(self):
+        results = bench_synthetic(runs=2, num_vnfs=4, num_vdus=2, num_cps=3,
+                                  num_bridges=1, num_paths=2,
+                                  cycle_density=1.0)
+        self.assertEqual(results['result']['errors'], 0)
+        for stage in ('syntax', 'integrity', 'topology'):
+            self.assertGreater(
+                results['stages']['service.' + stage]['count'], 0)
+        self.assertEqual(sorted(results['topology']),
+                         ['level0', 'level1', 'level2', 'level3'])
+        self.assertEqual(results['cycles']['find_cycles']['cycles'],
+                         results['cycles']['simple_cycles']['cycles'])
+        self.assertGreater(results['memory']['peak_bytes'], 0)
+
+    def test_bench_interconnect(self):
+        results = bench_interconnect(sizes=(5, 10), runs=2)
+        self.assertEqual(sorted(results['topology']), [5, 10])
+        for num_vdus, result in results['topology'].items():
+            self.assertEqual(result['nodes'], 4 * num_vdus + 2)
+            self.assertEqual(result['count'], 2)
+
+    def test_bench_catalogue(self):
+        results = bench_catalogue(num_services=2, num_vnfs=2, num_vdus=1)
+        self.assertEqual(results['descriptors'], 6)
+        for mode in ('retained', 'released'):
+            self.assertEqual(results[mode]['errors'], 0)
+            self.assertGreater(results[mode]['retained_bytes'], 0)
+        self.assertLess(results['released']['retained_bytes'],
+                        results['retained']['retained_bytes'])
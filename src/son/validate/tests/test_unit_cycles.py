@@ -0,0 +1,107 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+
+import unittest
+import random
+import time
+import networkx as nx
+from son.validate.cycles import find_cycles
+
+
+def canonical(cycle):
+    """
+    Rotates a cycle to start at its lowest node, for comparison.
+    """
+    idx = cycle.index(min(cycle))
+    return tuple(cycle[idx:] + cycle[:idx])
+
+
+class UnitCycleAnalysisTests(unittest.TestCase):
+
+    def test_find_cycles_equals_simple_cycles(self):
+        """
+        Tests that, without limits, the found cycles are the same as the
+        ones enumerated by networkx.
+        """
+        rnd = random.Random(7)
+        for _ in range(20):
+            graph = nx.gnp_random_graph(8, 0.3, seed=rnd.randint(0, 1000),
+                                        directed=True)
+            graph = nx.relabel_nodes(graph, lambda n: 'vnf{0}'.format(n))
+
+            expected = set(canonical(c) for c in nx.simple_cycles(graph)
+                           if len(c) > 2)
+            cycles, truncated = find_cycles(graph, min_length=3,
+                                            max_cycles=None, timeout=None)
+
+            self.assertFalse(truncated)
+            self.assertEqual(len(cycles), len(expected))
+            self.assertEqual(set(canonical(c) for c in cycles), expected)
+
+    def test_find_cycles_limits(self):
+        """
+        Tests the count and length limits of the cycle analysis.
+        """
+        graph = nx.complete_graph(6, create_using=nx.DiGraph())
+
+        cycles, truncated = find_cycles(graph, max_cycles=10)
+        self.assertTrue(truncated)
+        self.assertEqual(len(cycles), 10)
+
+        cycles, truncated = find_cycles(graph, min_length=3, max_length=3,
+                                        max_cycles=None)
+        self.assertFalse(truncated)
+        self.assertEqual(len(cycles), 40)  # C(6,3) * 2 directions
+        self.assertTrue(all(len(c) == 3 for c in cycles))
+
+    def test_find_cycles_per_component(self):
+        """
+        Tests that the count limit applies to each strongly connected
+        component of the graph.
+        """
+        graph = nx.DiGraph()
+        graph.add_edges_from(nx.complete_graph(
+            5, create_using=nx.DiGraph()).edges())
+        graph.add_edges_from([(10, 11), (11, 12), (12, 10), (4, 10)])
+
+        cycles, truncated = find_cycles(graph, min_length=3, max_cycles=5)
+        self.assertTrue(truncated)
+        self.assertEqual(len(cycles), 6)
+        self.assertIn((10, 11, 12), [canonical(c) for c in cycles])
+
+    def test_find_cycles_time_budget(self):
+        """
+        Tests that the analysis of a densely meshed graph is bounded by the
+        time budget.
+        """
+        graph = nx.complete_graph(14, create_using=nx.DiGraph())
+
+        start = time.time()
+        cycles, truncated = find_cycles(graph, max_cycles=None, timeout=0.5)
+        self.assertTrue(truncated)
+        self.assertLess(time.time() - start, 2)
+        self.assertGreater(len(cycles), 0)
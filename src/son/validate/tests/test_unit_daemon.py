@@ -0,0 +1,86 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+
+import io
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from son.validate import daemon
+
+SAMPLES_DIR = os.path.join('src', 'son', 'validate', 'tests', 'samples')
+
+
+class UnitDaemonTests(unittest.TestCase):
+
+    def setUp(self):
+        self._root = tempfile.mkdtemp()
+        self._path = os.path.join(self._root, 'daemon.sock')
+        self._daemon = daemon.ValidateDaemon(self._path, idle_timeout=30)
+        self._daemon.bind()
+        self._thread = threading.Thread(target=self._daemon.serve)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def tearDown(self):
+        daemon.request({'command': 'stop'}, self._path)
+        self._thread.join(10)
+        shutil.rmtree(self._root)
+
+    def forward(self, *argv):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        code = daemon.forward(list(argv), self._path, stdout=stdout,
+                              stderr=stderr)
+        return code, stdout.getvalue(), stderr.getvalue()
+
+    def test_forward(self):
+        vnfd = os.path.join(SAMPLES_DIR, 'functions', 'valid',
+                            'firewall-vnfd.yml')
+        code, stdout, stderr = self.forward('--function', vnfd)
+        self.assertEqual(code, 0)
+        self.assertIn("0 error(s) and 0 warning(s)", stdout)
+        self.assertIn("Validating function", stderr)
+
+        # invalid arguments are reported as by the CLI
+        code, stdout, stderr = self.forward('--invalid-argument')
+        self.assertEqual(code, 2)
+        self.assertIn("usage:", stderr)
+
+    def test_fallback(self):
+        self.assertIsNotNone(daemon.request({'command': 'ping'}, self._path))
+
+        # batches are validated in-process
+        self.assertIsNone(self.forward('--batch', SAMPLES_DIR)[0])
+
+        # a daemon running other code exits without validating
+        self._daemon.code = None
+        self.assertIsNone(self.forward('--function', SAMPLES_DIR)[0])
+        self._thread.join(10)
+        self.assertFalse(self._thread.is_alive())
+        self.assertFalse(os.path.exists(self._path))
+        self.assertIsNone(daemon.request({'command': 'ping'}, self._path))
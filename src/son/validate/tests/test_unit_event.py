@@ -0,0 +1,238 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+import unittest
+import os
+import shutil
+import tempfile
+import threading
+from son.validate import event
+from son.validate.event import EventContext, EventLogger
+from son.validate.validate import Validator
+
+SAMPLES_DIR = os.path.join('src', 'son', 'validate', 'tests', 'samples')
+
+
+class UnitEventContextTests(unittest.TestCase):
+
+    def setUp(self):
+        self._evtlog = EventLogger('test.events')
+
+    def test_context_isolation(self):
+        """
+        Tests that events are stored in the context active in the thread
+        that logs them.
+        """
+        ctx_a = EventContext()
+        ctx_b = EventContext()
+
+        with self._evtlog.context(ctx_a):
+            self._evtlog.log("Invalid NSD syntax", "msg", 'service_a',
+                             'evt_nsd_stx_invalid')
+            with self._evtlog.context(ctx_b):
+                self._evtlog.log("Invalid VNFD syntax", "msg", 'function_b',
+                                 'evt_vnfd_stx_invalid')
+            self._evtlog.log("Invalid NSD syntax", "msg", 'service_c',
+                             'evt_nsd_stx_invalid')
+
+        self.assertEqual(sorted(e['source_id'] for e in ctx_a.errors),
+                         ['service_a', 'service_c'])
+        self.assertEqual([e['source_id'] for e in ctx_b.errors],
+                         ['function_b'])
+        self.assertEqual(self._evtlog.errors, [])
+
+    def test_context_threads(self):
+        """
+        Tests that concurrent threads logging to their own contexts don't
+        mix their events.
+        """
+        contexts = [EventContext() for _ in range(8)]
+
+        def worker(idx):
+            with self._evtlog.context(contexts[idx]):
+                for n in range(200):
+                    self._evtlog.log("Unused connection point", "cp",
+                                     'source_{0}_{1}'.format(idx, n),
+                                     'evt_nsd_itg_unused_cpoint')
+
+        threads = [threading.Thread(target=worker, args=(idx,))
+                   for idx in range(len(contexts))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for idx, ctx in enumerate(contexts):
+            self.assertEqual(len(ctx.events), 200)
+            self.assertTrue(all(e['source_id'].startswith(
+                'source_{0}_'.format(idx)) for e in ctx.events.values()))
+
+    def test_level_counters(self):
+        """
+        Tests that errors and warnings are indexed and counted by level.
+        """
+        ctx = EventContext(eventdict={'evt_error': 'error',
+                                      'evt_warning': 'warning',
+                                      'evt_none': 'none'})
+        with self._evtlog.context(ctx):
+            for n in range(3):
+                self._evtlog.log("Error", "error {0}", 'src{0}'.format(n),
+                                 'evt_error', msg_args=(n,))
+                self._evtlog.log("Warning", "warning", 'src', 'evt_warning')
+            self._evtlog.log("None", "none {0}", 'src', 'evt_none',
+                             msg_args=(0,))
+
+            self.assertEqual(self._evtlog.error_count, 3)
+            self.assertEqual(self._evtlog.warning_count, 1)
+
+        self.assertEqual(ctx.error_count, 3)
+        self.assertEqual([e['detail'][0]['message'] for e in ctx.errors],
+                         ['error 0', 'error 1', 'error 2'])
+        self.assertEqual(len(ctx.warnings[0]['detail']), 3)
+        self.assertEqual(len(ctx.events), 5)
+
+        ctx.reset()
+        self.assertEqual(ctx.error_count, 0)
+        self.assertEqual(ctx.warnings, [])
+
+    def test_max_details(self):
+        """
+        Tests that detail messages beyond the limit are counted but neither
+        formatted nor stored.
+        """
+        class Unformattable(object):
+            def __format__(self, spec):
+                raise AssertionError("message formatted")
+
+        ctx = EventContext(eventdict={'evt_warning': 'warning'},
+                           max_details=2)
+        with self._evtlog.context(ctx):
+            for n in range(2):
+                self._evtlog.log("Warning", "cp {0}", 'src', 'evt_warning',
+                                 msg_args=(n,))
+            for n in range(5):
+                self._evtlog.log("Warning", "cp {0}", 'src', 'evt_warning',
+                                 msg_args=(Unformattable(),))
+
+        self.assertEqual(ctx.warning_count, 1)
+        warning = ctx.warnings[0]
+        self.assertEqual(len(warning['detail']), 2)
+        self.assertEqual(warning['detail_dropped'], 5)
+
+    def test_listeners(self):
+        """
+        Tests that listeners are notified of stored events as they are
+        logged, except of events with level 'none'.
+        """
+        ctx = EventContext(eventdict={'evt_error': 'error',
+                                      'evt_none': 'none'})
+        records = []
+        ctx.subscribe(records.append)
+        with self._evtlog.context(ctx):
+            self._evtlog.log("Error", "error {0}", 'src', 'evt_error',
+                             msg_args=(0,))
+            self._evtlog.log("None", "none", 'src', 'evt_none')
+            self.assertEqual(len(records), 1)
+            self._evtlog.log("Error", "error {0}", 'src', 'evt_error',
+                             msg_args=(1,))
+
+            ctx.unsubscribe(records.append)
+            self._evtlog.log("Error", "error 2", 'src', 'evt_error')
+
+        self.assertEqual([(r['type'], r['level'], r['message'])
+                          for r in records],
+                         [('event', 'error', 'error 0'),
+                          ('event', 'error', 'error 1')])
+        self.assertEqual(len(ctx.errors[0]['detail']), 3)
+
+    def test_eventcfg_cache(self):
+        """
+        Tests that the event configuration is read once and reloaded when
+        the custom configuration file changes.
+        """
+        cwd = os.getcwd()
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.addCleanup(os.chdir, cwd)
+        os.chdir(tmp_dir)
+        event.clear_eventcfg_cache()
+
+        eventdict = EventLogger.load_eventcfg()
+        self.assertEqual(eventdict, EventLogger.load_eventcfg())
+
+        # returned configurations are independent copies
+        eventdict['evt_pd_itg_invalid_md5'] = 'none'
+        self.assertNotEqual(EventLogger.load_eventcfg(), eventdict)
+
+        EventLogger.dump_eventcfg(eventdict)
+        self.assertEqual(EventLogger.load_eventcfg()
+                         ['evt_pd_itg_invalid_md5'], 'none')
+        # cached along with the default configuration
+        custom = event._eventcfg_cache[os.path.abspath('eventcfg.yml')]
+        self.assertEqual(custom[1]['evt_pd_itg_invalid_md5'], 'none')
+        self.assertEqual(len(event._eventcfg_cache), 2)
+
+
+class UnitConcurrentValidationTests(unittest.TestCase):
+
+    @staticmethod
+    def _validate(service):
+        validator = Validator()
+        validator.configure(dpath=os.path.join(SAMPLES_DIR, 'functions',
+                                               'valid'))
+        validator.validate_service(os.path.join(SAMPLES_DIR, 'services',
+                                                service))
+        return validator
+
+    def test_concurrent_validations(self):
+        """
+        Tests that validations running concurrently in the same process
+        report the same errors and warnings as sequential validations.
+        """
+        services = ['valid.yml', 'invalid_integrity.yml'] * 4
+        expected = {}
+        for service in set(services):
+            validator = self._validate(service)
+            expected[service] = (validator.error_count,
+                                 validator.warning_count)
+        self.assertNotEqual(expected['valid.yml'],
+                            expected['invalid_integrity.yml'])
+
+        results = [None] * len(services)
+
+        def worker(idx):
+            validator = self._validate(services[idx])
+            results[idx] = (validator.error_count, validator.warning_count)
+
+        threads = [threading.Thread(target=worker, args=(idx,))
+                   for idx in range(len(services))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for idx, service in enumerate(services):
+            self.assertEqual(results[idx], expected[service])
@@ -0,0 +1,300 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+import time
+import unittest
+import threading
+from son.validate.api import jobs
+from son.validate.api.jobs import JobQueue, RedisJobQueue, latency_stats
+from son.validate.tests.redis_standin import StandInRedis
+
+
+def square(value):
+    return value * value
+
+
+def fail(msg):
+    raise ValueError(msg)
+
+
+class UnitJobQueueTests(unittest.TestCase):
+
+    def setUp(self):
+        self.queue = JobQueue(workers=2)
+
+    def tearDown(self):
+        self.queue.shutdown()
+
+    def test_submit_result(self):
+        """
+        Submitted jobs run in the pool and provide their result,
+        transformed by the callback.
+        """
+        job = self.queue.submit(square, args=(3,),
+                                callback=lambda r: r + 1,
+                                description={'type': 'service'})
+        self.assertTrue(job.wait(10))
+        self.assertEqual(job.status, jobs.DONE)
+        self.assertEqual(job.result, 10)
+        self.assertIs(self.queue.get(job.id), job)
+
+        status = job.to_dict()
+        self.assertEqual(status['job_id'], job.id)
+        self.assertEqual(status['type'], 'service')
+        self.assertEqual(status['result'], 10)
+        self.assertNotIn('error', status)
+
+    def test_failed_job(self):
+        job = self.queue.submit(fail, args=('bad descriptor',))
+        self.assertTrue(job.wait(10))
+        self.assertEqual(job.status, jobs.FAILED)
+        self.assertEqual(job.to_dict()['error'], 'bad descriptor')
+        self.assertEqual(self.queue.stats()['failed'], 1)
+
+    def test_stats(self):
+        """
+        Jobs waiting for a free worker are reported as queue depth.
+        """
+        release = threading.Event()
+        blocked = [self.queue.submit(release.wait, args=(10,))
+                   for _ in range(5)]
+
+        stats = self.queue.stats()
+        self.assertEqual(stats['workers'], 2)
+        self.assertEqual(stats['queue_depth'] + stats['running'], 5)
+        self.assertGreaterEqual(stats['queue_depth'], 3)
+
+        release.set()
+        for job in blocked:
+            self.assertTrue(job.wait(10))
+
+        stats = self.queue.stats()
+        self.assertEqual(stats['queue_depth'], 0)
+        self.assertEqual(stats['running'], 0)
+        self.assertEqual(stats['completed'], 5)
+        self.assertEqual(stats['latency']['wait']['count'], 5)
+        self.assertEqual(stats['latency']['run']['count'], 5)
+
+    def test_complete(self):
+        job = self.queue.complete('cached', description={'type': 'package'})
+        self.assertTrue(job.finished)
+        self.assertEqual(self.queue.get(job.id).result, 'cached')
+
+    def test_history(self):
+        queue = JobQueue(workers=1, history=3)
+        job_ids = [queue.complete(idx).id for idx in range(5)]
+        queue.shutdown()
+
+        self.assertIsNone(queue.get(job_ids[0]))
+        self.assertIsNone(queue.get(job_ids[1]))
+        for job_id in job_ids[2:]:
+            self.assertIsNotNone(queue.get(job_id))
+
+    def test_history_unfinished(self):
+        """
+        Unfinished jobs are kept, without holding back the others from
+        being forgotten.
+        """
+        queue = JobQueue(workers=1, history=3)
+        release = threading.Event()
+        stuck = queue.submit(release.wait, args=(10,))
+        job_ids = [queue.complete(idx).id for idx in range(5)]
+        release.set()
+        queue.shutdown()
+
+        self.assertIs(queue.get(stuck.id), stuck)
+        self.assertEqual([queue.get(job_id) is not None
+                          for job_id in job_ids],
+                         [False, False, False, True, True])
+
+    def test_process_stats(self):
+        """
+        Jobs of a process pool are reported as running once started.
+        """
+        queue = JobQueue(workers=1, executor='process')
+        self.addCleanup(queue.shutdown)
+        submitted = [queue.submit(time.sleep, args=(0.5,))
+                     for _ in range(3)]
+
+        deadline = time.time() + 10
+        while queue.stats()['running'] == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        stats = queue.stats()
+        self.assertEqual(stats['running'], 1)
+        self.assertEqual(stats['queue_depth'], 2)
+        self.assertEqual(queue.get(submitted[0].id).status, jobs.RUNNING)
+
+        for job in submitted:
+            self.assertTrue(job.wait(30))
+        stats = queue.stats()
+        self.assertEqual(stats['running'], 0)
+        self.assertEqual(stats['queue_depth'], 0)
+        self.assertEqual(stats['latency']['wait']['count'], 3)
+
+    def test_process_executor(self):
+        queue = JobQueue(workers=2, executor='process')
+        submitted = [queue.submit(square, args=(idx,)) for idx in range(4)]
+        for job in submitted:
+            self.assertTrue(job.wait(30))
+        queue.shutdown()
+
+        self.assertEqual([job.result for job in submitted], [0, 1, 4, 9])
+        self.assertEqual(queue.stats()['completed'], 4)
+
+    def test_latency_stats(self):
+        stats = latency_stats([0.4, 0.1, 0.2, 0.3])
+        self.assertEqual(stats['count'], 4)
+        self.assertEqual(stats['p50'], 0.3)
+        self.assertEqual(stats['max'], 0.4)
+        self.assertIsNone(latency_stats([])['mean'])
+
+
+class UnitRedisJobQueueTests(unittest.TestCase):
+
+    def setUp(self):
+        self.redis = StandInRedis()
+        self.queue = RedisJobQueue(self.redis)
+
+    def test_submit_work(self):
+        job = self.queue.submit({'value': 3}, description={'type': 'service'})
+        self.assertEqual(job.status, jobs.QUEUED)
+        self.assertEqual(self.queue.stats()['queue_depth'], 1)
+
+        # a worker of another host, sharing the redis server
+        worker = RedisJobQueue(self.redis)
+        processed = worker.work(lambda p: str(square(p['value'])),
+                                max_jobs=1, timeout=1)
+        self.assertEqual(processed, 1)
+
+        job = self.queue.get(job.id)
+        self.assertTrue(job.wait(1))
+        status = job.to_dict()
+        self.assertEqual(status['status'], jobs.DONE)
+        self.assertEqual(status['result'], '9')
+        self.assertEqual(status['type'], 'service')
+        self.assertIsNotNone(status['started_at'])
+
+        stats = self.queue.stats()
+        self.assertEqual(stats['queue_depth'], 0)
+        self.assertEqual(stats['running'], 0)
+        self.assertEqual(stats['completed'], 1)
+        self.assertEqual(stats['latency']['run']['count'], 1)
+
+    def test_collect_profiles(self):
+        """
+        Profiles reported by workers are collected once, and the payload
+        of a finished job is removed.
+        """
+        job = self.queue.submit({'value': 3})
+        worker = RedisJobQueue(self.redis)
+
+        def handler(payload):
+            worker.report_profile({'object_type': 'service'})
+            return str(payload['value'])
+
+        worker.work(handler, max_jobs=1, timeout=1)
+        self.assertIsNone(self.redis.hget(self.queue.job_key(job.id),
+                                          'payload'))
+        self.assertEqual(self.queue.collect_profiles(),
+                         [{'object_type': 'service'}])
+        self.assertEqual(self.queue.collect_profiles(), [])
+
+    def test_recover(self):
+        """
+        Jobs of a worker dying before finishing them are queued again.
+        """
+        job = self.queue.submit({'value': 3})
+        crashed = RedisJobQueue(self.redis)
+        self.assertEqual(crashed.fetch(timeout=1)[0], job.id)
+        self.assertEqual(job.status, jobs.RUNNING)
+
+        # not recovered while it may still be running
+        self.assertEqual(self.queue.recover(), 0)
+        worker = RedisJobQueue(self.redis, max_run_time=0)
+        self.assertEqual(worker.recover(), 1)
+        self.assertEqual(job.status, jobs.QUEUED)
+        self.assertEqual(worker.recover(), 0)
+
+        worker.work(lambda p: str(square(p['value'])), max_jobs=1,
+                    timeout=1)
+        self.assertEqual(job.result, '9')
+        stats = self.queue.stats()
+        self.assertEqual(stats['running'], 0)
+        self.assertEqual(stats['completed'], 1)
+        self.assertFalse(self.redis.lrange(self.queue._key('processing'),
+                                           0, -1))
+
+    def test_failed_job(self):
+        job = self.queue.submit({'msg': 'bad descriptor'})
+        self.queue.work(lambda p: fail(p['msg']), max_jobs=1, timeout=1)
+        self.assertEqual(job.status, jobs.FAILED)
+        self.assertEqual(job.to_dict()['error'], 'bad descriptor')
+        self.assertEqual(self.queue.stats()['failed'], 1)
+
+    def test_inflight_dedup(self):
+        """
+        Identical jobs are only queued once while in flight.
+        """
+        job = self.queue.submit({'value': 2}, key='rid:vid')
+        same = self.queue.submit({'value': 2}, key='rid:vid')
+        other = self.queue.submit({'value': 2}, key='rid:other')
+        self.assertEqual(job.id, same.id)
+        self.assertNotEqual(job.id, other.id)
+        self.assertEqual(self.queue.stats()['queue_depth'], 2)
+
+        self.queue.work(lambda p: str(p['value']), max_jobs=2, timeout=1)
+        again = self.queue.submit({'value': 2}, key='rid:vid')
+        self.assertNotEqual(job.id, again.id)
+
+    def test_shared_backlog(self):
+        """
+        Several workers drain a shared backlog, each job being processed
+        exactly once.
+        """
+        submitted = [self.queue.submit({'value': idx}) for idx in range(20)]
+        processed = []
+        stop = threading.Event()
+
+        def handler(payload):
+            processed.append(payload['value'])
+            return str(square(payload['value']))
+
+        workers = [threading.Thread(
+            target=RedisJobQueue(self.redis).work,
+            args=(handler,), kwargs={'timeout': 0.1, 'stop': stop})
+            for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        for job in submitted:
+            self.assertTrue(job.wait(10))
+        stop.set()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(sorted(processed), list(range(20)))
+        self.assertEqual([job.result for job in submitted],
+                         [str(idx * idx) for idx in range(20)])
+        self.assertEqual(self.queue.stats()['completed'], 20)
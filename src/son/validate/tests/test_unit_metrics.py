@@ -0,0 +1,120 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+import os
+import unittest
+from prometheus_client.parser import text_string_to_metric_families
+from son.validate.validate import Validator
+from son.validate.api.metrics import ValidationMetrics, ValidationProfile
+
+SAMPLES_DIR = os.path.join('src', 'son', 'validate', 'tests', 'samples')
+
+
+def parse_samples(text):
+    samples = dict()
+    for family in text_string_to_metric_families(text.decode('utf-8')):
+        for sample in family.samples:
+            key = (sample.name, tuple(sorted(sample.labels.items())))
+            samples[key] = sample.value
+    return samples
+
+
+class UnitValidationMetricsTests(unittest.TestCase):
+
+    def test_profile(self):
+        """
+        The profile of a validation includes the durations of its stages.
+        """
+        validator = Validator()
+        validator.configure(dpath=os.path.join(SAMPLES_DIR, 'functions',
+                                               'valid'))
+        profile = ValidationProfile('service')
+        validator.event_context.subscribe(profile)
+        profile.start()
+        validator.validate_service(os.path.join(SAMPLES_DIR, 'services',
+                                                'valid.yml'))
+        profile.add_stage('report', 0.5)
+        profile.stop()
+
+        stages = [(object_type, stage)
+                  for object_type, stage, _ in profile.stages]
+        self.assertEqual(stages[0], ('service', 'syntax'))
+        self.assertIn(('function', 'integrity'), stages)
+        self.assertEqual(stages[-2:], [('service', 'topology'),
+                                       ('service', 'report')])
+        self.assertTrue(all(duration >= 0 for *_, duration in
+                            profile.stages))
+
+        record = profile.to_dict()
+        self.assertGreater(record['cpu_seconds'], 0)
+        self.assertGreaterEqual(record['memory_bytes'], 0)
+
+    def test_package_stages(self):
+        validator = Validator()
+        validator.configure(syntax=True, integrity=False, topology=False)
+        profile = ValidationProfile('package')
+        validator.event_context.subscribe(profile)
+        validator.validate_package(os.path.join(
+            SAMPLES_DIR, 'packages', 'sonata-demo-valid.son'))
+        self.assertEqual([stage for _, stage, _ in profile.stages],
+                         ['struct', 'syntax'])
+
+    def test_export(self):
+        class Queue(object):
+            @staticmethod
+            def stats():
+                return {'queue_depth': 3, 'running': 2}
+
+        metrics = ValidationMetrics()
+        metrics.track_job_queue(Queue())
+        metrics.observe_request('/validate/service', 'POST', 200, 0.2)
+        metrics.observe_cache(False)
+        metrics.observe_cache(True)
+        metrics.observe_cache(True)
+        metrics.observe_validation({
+            'object_type': 'service', 'cpu_seconds': 0.1,
+            'memory_bytes': 1024,
+            'stages': [('service', 'syntax', 0.01),
+                       ('function', 'syntax', 0.02),
+                       ('function', 'syntax', 0.03)]})
+
+        samples = parse_samples(metrics.export())
+        prefix = 'son_validate_api_'
+        self.assertEqual(samples[(prefix + 'requests_total', (
+            ('endpoint', '/validate/service'), ('method', 'POST'),
+            ('status', '200')))], 1)
+        self.assertEqual(samples[(prefix + 'result_cache_requests_total',
+                                  (('result', 'hit'),))], 2)
+        self.assertEqual(samples[(prefix + 'job_queue_depth', ())], 3)
+        self.assertEqual(samples[(prefix + 'jobs_running', ())], 2)
+        self.assertEqual(samples[(prefix + 'stage_duration_seconds_count', (
+            ('object_type', 'function'), ('stage', 'syntax')))], 2)
+        self.assertAlmostEqual(samples[(
+            prefix + 'stage_duration_seconds_sum',
+            (('object_type', 'function'), ('stage', 'syntax')))], 0.05)
+        self.assertEqual(samples[(prefix + 'validation_cpu_seconds_count',
+                                  (('object_type', 'service'),))], 1)
+        self.assertIn(('process_resident_memory_bytes', ()), samples)
@@ -0,0 +1,277 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+import unittest
+import os
+import shutil
+import tempfile
+import time
+from son.validate.storage import DescriptorStorage, VLink
+from son.validate.benchmark import write_synthetic_service, load_service
+
+SAMPLES_DIR = os.path.join('src', 'son', 'validate', 'tests', 'samples')
+
+
+class UnitServiceTopologyTests(unittest.TestCase):
+
+    def setUp(self):
+        self._root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._root)
+
+    def test_interconnect_function_interfaces(self):
+        """
+        Tests that interfaces of a VNF are inter-connected only when they
+        are reachable inside the VNF.
+        """
+        nsd_file, vnfd_files = write_synthetic_service(self._root, 1, 3)
+        service = load_service(DescriptorStorage(), nsd_file, vnfd_files)
+        graph = service.build_topology_graph(level=1, bridges=False)
+
+        for u in range(3):
+            self.assertTrue(graph.has_edge('vnf_0:in{0}'.format(u),
+                                           'vnf_0:out{0}'.format(u)))
+        self.assertFalse(graph.has_edge('vnf_0:in0', 'vnf_0:in1'))
+        self.assertFalse(graph.has_edge('vnf_0:in0', 'vnf_0:out1'))
+
+    def test_interconnect_sample_service(self):
+        """
+        Tests the inter-connection of VNF interfaces of the sample service.
+        """
+        functions_dir = os.path.join(SAMPLES_DIR, 'functions', 'valid')
+        vnfd_files = [os.path.join(functions_dir, f)
+                      for f in sorted(os.listdir(functions_dir))]
+        service = load_service(DescriptorStorage(),
+                               os.path.join(SAMPLES_DIR, 'services',
+                                            'valid.yml'),
+                               vnfd_files)
+        graph = service.build_topology_graph(level=1, bridges=False)
+
+        self.assertTrue(graph.has_edge('vnf_firewall:input',
+                                       'vnf_firewall:output'))
+        self.assertTrue(graph.has_edge('vnf_iperf:input', 'vnf_iperf:output'))
+
+    def test_interconnect_large(self):
+        """
+        Tests the level 1 topology graph of a synthetic service with
+        a thousand connection points.
+        """
+        nsd_file, vnfd_files = write_synthetic_service(self._root, 2, 250)
+        service = load_service(DescriptorStorage(), nsd_file, vnfd_files)
+        graph = service.build_topology_graph(level=1, bridges=False)
+
+        self.assertEqual(graph.number_of_nodes(), 4 * 250 + 2)
+        self.assertTrue(graph.has_edge('vnf_1:in0', 'vnf_1:out0'))
+        self.assertFalse(graph.has_edge('vnf_1:in0', 'vnf_1:in1'))
+
+    def test_topology_graph_memoised(self):
+        """
+        Tests that topology graphs are built once per level and settings,
+        and rebuilt after the service links are modified.
+        """
+        nsd_file, vnfd_files = write_synthetic_service(self._root, 2, 2)
+        service = load_service(DescriptorStorage(), nsd_file, vnfd_files)
+
+        graph = service.topology_graph(level=1, bridges=False)
+        self.assertIs(graph, service.topology_graph(level=1, bridges=False))
+        self.assertIsNot(graph, service.topology_graph(level=1, bridges=True))
+        self.assertIsNot(graph, service.topology_graph(level=2, bridges=False))
+
+        service.add_vlink('vl-extra', ['input', 'output'])
+        self.assertIsNot(graph, service.topology_graph(level=1, bridges=False))
+        self.assertTrue(service.topology_graph(level=1).has_edge('input',
+                                                                 'output'))
+
+
+class UnitConnectionPointIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        self._root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._root)
+
+    def test_resolve_references(self):
+        """
+        Tests the resolution of connection point references to their
+        owning function or unit.
+        """
+        nsd_file, vnfd_files = write_synthetic_service(self._root, 2, 2)
+        service = load_service(DescriptorStorage(), nsd_file, vnfd_files)
+        index = service.cp_index
+
+        ref = index.resolve('vnf_1:in0')
+        self.assertEqual(ref.prefix, 'vnf_1')
+        self.assertEqual(ref.cp, 'in0')
+        self.assertIs(ref.owner, service.mapped_function('vnf_1'))
+        self.assertTrue(ref.declared)
+
+        ref = index.resolve('input')
+        self.assertIsNone(ref.prefix)
+        self.assertIs(ref.owner, service)
+        self.assertTrue(ref.declared)
+
+        self.assertFalse(index.resolve('vnf_1:in9').declared)
+        self.assertIsNone(index.resolve('vnf_9:in0').owner)
+        self.assertFalse(index.resolve('undefined').declared)
+
+        func = service.mapped_function('vnf_0')
+        ref = func.cp_index.resolve('vdu1:out')
+        self.assertIs(ref.owner, func.units['vdu1'])
+        self.assertTrue(ref.declared)
+        self.assertEqual(service.vnf_id(func), 'vnf_0')
+
+    def test_index_rebuilt_on_change(self):
+        """
+        Tests that the index is built once and discarded when the links
+        of the descriptor are modified.
+        """
+        nsd_file, vnfd_files = write_synthetic_service(self._root, 1, 1)
+        service = load_service(DescriptorStorage(), nsd_file, vnfd_files)
+
+        index = service.cp_index
+        self.assertIs(index, service.cp_index)
+        self.assertFalse(index.in_vlinks('vnf_0:undeclared'))
+        self.assertEqual(service.undeclared_connection_points(), [])
+
+        service.add_vlink('vl-extra', ['input', 'vnf_0:undeclared'])
+        self.assertIsNot(index, service.cp_index)
+        self.assertTrue(service.cp_index.in_vlinks('vnf_0:undeclared'))
+        self.assertEqual(service.undeclared_connection_points(),
+                         ['vnf_0:undeclared'])
+
+    def test_undeclared_long_references(self):
+        """
+        Tests the undeclared connection points of references of more than
+        two parts: only the function and connection point parts are
+        checked in services, and they aren't checked in functions. Such
+        references are rejected by add_vlink: links are set directly.
+        """
+        nsd_file, vnfd_files = write_synthetic_service(self._root, 1, 1)
+        service = load_service(DescriptorStorage(), nsd_file, vnfd_files)
+        func = service.mapped_function('vnf_0')
+
+        service.vlinks['vl-long'] = VLink('vl-long', 'vnf_0:in0:extra',
+                                          'vnf_0:in9:extra')
+        service.invalidate_cache()
+        self.assertEqual(service.undeclared_connection_points(),
+                         ['vnf_0:in9:extra'])
+
+        func.vlinks['vl-long'] = VLink('vl-long', 'vdu0:in:extra',
+                                       'vdu9:in:extra')
+        func.invalidate_cache()
+        self.assertEqual(func.undeclared_connection_points(), [])
+
+    def test_vnf_id_first_mapping(self):
+        """
+        Tests that the vnf id of a function mapped several times is its
+        first mapping.
+        """
+        nsd_file, vnfd_files = write_synthetic_service(self._root, 1, 1)
+        service = load_service(DescriptorStorage(), nsd_file, vnfd_files)
+        func = service.mapped_function('vnf_0')
+
+        del service._functions[func.id]
+        service.associate_function(func, 'vnf_alias')
+        self.assertIs(service.mapped_function('vnf_alias'), func)
+        self.assertEqual(service.vnf_id(func), 'vnf_0')
+
+    def test_integrity_checks_scaling(self):
+        """
+        Tests that the connection point checks scale linearly with the
+        number of connection points.
+        """
+        timings = []
+        for num_vdus in (500, 2000):
+            root = os.path.join(self._root, str(num_vdus))
+            os.makedirs(root)
+            nsd_file, vnfd_files = write_synthetic_service(root, 2, num_vdus)
+            service = load_service(DescriptorStorage(), nsd_file, vnfd_files)
+
+            start = time.time()
+            for func in service.functions.values():
+                self.assertEqual(func.undeclared_connection_points(), [])
+                self.assertEqual(func.unused_connection_points(), [])
+            self.assertEqual(service.undeclared_connection_points(), [])
+            self.assertEqual(service.unused_connection_points(), [])
+            timings.append(time.time() - start)
+
+        # 4x connection points: quadratic lookups would take 16x longer
+        self.assertLess(timings[1], max(timings[0], 0.01) * 10)
+
+
+class UnitDescriptorMemoryTests(unittest.TestCase):
+
+    def setUp(self):
+        self._root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._root)
+
+    def test_compact_descriptors(self):
+        """
+        Tests that descriptor objects don't have per-instance dictionaries
+        and that identifiers repeated across descriptors are stored once.
+        """
+        nsd_file, vnfd_files = write_synthetic_service(self._root, 2, 2)
+        service = load_service(DescriptorStorage(), nsd_file, vnfd_files)
+        func_0 = service.mapped_function('vnf_0')
+        func_1 = service.mapped_function('vnf_1')
+
+        for obj in (service, func_0, func_0.units['vdu0'],
+                    func_0.vlinks['vl-in0'], service.cp_index):
+            self.assertFalse(hasattr(obj, '__dict__'))
+
+        self.assertIs(func_0.connection_points[0],
+                      func_1.connection_points[0])
+        self.assertIs(func_0.vlinks['vl-in0'].cpr_u,
+                      func_1.vlinks['vl-in0'].cpr_u)
+
+    def test_release(self):
+        """
+        Tests that released descriptors drop their content and graphs, and
+        that graphs built again are unchanged.
+        """
+        nsd_file, vnfd_files = write_synthetic_service(self._root, 3, 2,
+                                                       num_paths=1)
+        service = load_service(DescriptorStorage(), nsd_file, vnfd_files)
+        edges = sorted(service.topology_graph(level=2).edges())
+        labels = service.topology_graph(level=1).nodes(data=True)
+
+        for func in service.functions.values():
+            func.release()
+        service.release()
+
+        self.assertIsNone(service.content)
+        self.assertIsNone(service.graph)
+        self.assertEqual(service.name, 'synthetic')
+        self.assertEqual(service.id, 'eu.sonata-nfv.synthetic.0.1')
+        self.assertEqual(sorted(service.topology_graph(level=2).edges()),
+                         edges)
+        self.assertEqual(sorted(service.topology_graph(level=1)
+                                .nodes(data=True)), sorted(labels))
+        self.assertEqual(service.undeclared_connection_points(), [])
@@ -0,0 +1,150 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+import unittest
+import threading
+from son.validate.api.store import MemoryStore, RedisStore
+from son.validate.tests.redis_standin import StandInRedis
+
+
+class StoreTests(object):
+    """
+    Tests common to all store backends.
+    """
+
+    def create_store(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.store = self.create_store()
+
+    def test_items(self):
+        self.store.hset('resources', 'r1', path='/a', syntax=True)
+        self.store.hset('resources', 'r2', path='/b', syntax=False)
+
+        self.assertTrue(self.store.exists('resources', 'r1'))
+        self.assertFalse(self.store.exists('resources', 'r3'))
+        self.assertFalse(self.store.exists('validations', 'r1'))
+        self.assertEqual(self.store.hget('resources', 'r1'),
+                         {'path': '/a', 'syntax': True})
+        self.assertEqual(self.store.hget('resources', 'r2', 'syntax'), False)
+        self.assertIsNone(self.store.hget('resources', 'r3'))
+        self.assertIsNone(self.store.hget('resources', 'r1', 'latest_vid'))
+
+        self.assertEqual(sorted(self.store.items('resources')),
+                         [('r1', {'path': '/a', 'syntax': True}),
+                          ('r2', {'path': '/b', 'syntax': False})])
+        self.assertEqual(self.store.items('watches'), [])
+
+    def test_field_update(self):
+        """
+        Updating a field keeps the other fields of the item.
+        """
+        self.store.hset('validations', 'v1', result=b'{"error_count": 0}')
+        self.store.hset('validations', 'v1', net_topology=['<graphml/>'])
+        self.assertEqual(self.store.hget('validations', 'v1'),
+                         {'result': b'{"error_count": 0}',
+                          'net_topology': ['<graphml/>']})
+
+    def test_lists(self):
+        self.store.append('artifacts', '/tmp/a')
+        self.store.append('artifacts', '/tmp/b')
+        self.assertEqual(self.store.members('artifacts'),
+                         ['/tmp/a', '/tmp/b'])
+
+    def test_clear(self):
+        self.store.hset('resources', 'r1', path='/a')
+        self.store.hset('validations', 'v1', result=b'{}')
+        self.store.append('artifacts', '/tmp/a')
+
+        self.store.clear('validations')
+        self.assertFalse(self.store.exists('validations', 'v1'))
+        self.assertTrue(self.store.exists('resources', 'r1'))
+
+        self.store.clear()
+        self.assertEqual(self.store.items('resources'), [])
+        self.assertEqual(self.store.members('artifacts'), [])
+
+    def test_concurrent_updates(self):
+        """
+        Concurrent writers of different items or fields don't lose
+        updates.
+        """
+        def writer(idx):
+            for vid in range(50):
+                self.store.hset('validations', str(vid),
+                                **{'field{0}'.format(idx): idx})
+
+        threads = [threading.Thread(target=writer, args=(idx,))
+                   for idx in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        items = self.store.items('validations')
+        self.assertEqual(len(items), 50)
+        for vid, fields in items:
+            self.assertEqual(len(fields), 4)
+
+
+class UnitMemoryStoreTests(StoreTests, unittest.TestCase):
+
+    def create_store(self):
+        return MemoryStore()
+
+
+class CountingRedis(StandInRedis):
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.commands = []
+
+    def __getattribute__(self, name):
+        if name in ('get', 'hget', 'hgetall', 'exists', 'smembers',
+                    'lrange'):
+            self.commands.append(name)
+        return super().__getattribute__(name)
+
+
+class UnitRedisStoreTests(StoreTests, unittest.TestCase):
+
+    def create_store(self):
+        self.redis = CountingRedis(decode_responses=False)
+        return RedisStore(self.redis)
+
+    def test_item_lookup(self):
+        """
+        Items are looked up without transferring the collection.
+        """
+        for vid in range(1000):
+            self.store.hset('validations', str(vid), result=b'{}')
+
+        del self.redis.commands[:]
+        self.assertTrue(self.store.exists('validations', '500'))
+        self.assertEqual(self.store.hget('validations', '500', 'result'),
+                         b'{}')
+        self.assertEqual(self.redis.commands, ['exists', 'hget'])
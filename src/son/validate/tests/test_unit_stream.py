@@ -0,0 +1,114 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+import os
+import json
+import threading
+import unittest
+from son.validate.validate import Validator
+from son.validate.api.jobs import JobQueue
+from son.validate.api.stream import EventStream
+
+SAMPLES_DIR = os.path.join('src', 'son', 'validate', 'tests', 'samples')
+
+
+class UnitEventStreamTests(unittest.TestCase):
+
+    def test_formats(self):
+        record = {'type': 'stage', 'stage': 'syntax', 'status': 'started'}
+        self.assertEqual(
+            EventStream.format_record(record, 'sse'),
+            'event: stage\ndata: {0}\n\n'.format(
+                json.dumps(record, sort_keys=True)))
+        self.assertEqual(EventStream.format_record(record, 'jsonl'),
+                         json.dumps(record, sort_keys=True) + '\n')
+
+    def test_heartbeat(self):
+        """
+        Idle server-sent event streams send keep-alives.
+        """
+        stream = EventStream('sse', heartbeat=0.01)
+        timer = threading.Timer(0.1, stream.close)
+        timer.start()
+        chunks = list(stream)
+        timer.join()
+        self.assertTrue(chunks)
+        self.assertEqual(set(chunks), {': keep-alive\n\n'})
+
+    def test_follow(self):
+        """
+        Streams following a job end with its outcome, after the records
+        pushed before.
+        """
+        jobs = JobQueue(workers=1)
+        self.addCleanup(jobs.shutdown)
+        ready = threading.Event()
+        job = jobs.submit(ready.wait, args=(10,))
+
+        stream = EventStream('sse', heartbeat=0.01)
+        stream.put({'type': 'validation'})
+        stream.follow(job, lambda j: {'type': 'result', 'result': j.result})
+        threading.Timer(0.1, ready.set).start()
+        chunks = list(stream)
+
+        self.assertEqual(chunks[0], EventStream.format_record(
+            {'type': 'validation'}, 'sse'))
+        self.assertIn(': keep-alive\n\n', chunks)
+        self.assertEqual(chunks[-1], EventStream.format_record(
+            {'type': 'result', 'result': True}, 'sse'))
+
+    def test_validation_stream(self):
+        """
+        Events and stages of a validation are streamed while it runs.
+        """
+        stream = EventStream('jsonl')
+        validator = Validator()
+        validator.configure(dpath=os.path.join(SAMPLES_DIR, 'functions',
+                                               'valid'))
+        validator.event_context.subscribe(stream.put)
+
+        def validate():
+            validator.validate_service(os.path.join(
+                SAMPLES_DIR, 'services', 'invalid_integrity.yml'))
+            stream.close()
+
+        thread = threading.Thread(target=validate)
+        thread.start()
+        records = [json.loads(line) for line in stream]
+        thread.join()
+
+        stages = [(r['object_type'], r['stage'], r['status'])
+                  for r in records if r['type'] == 'stage']
+        self.assertEqual(stages, [('service', 'syntax', 'started'),
+                                  ('service', 'syntax', 'passed'),
+                                  ('service', 'integrity', 'started'),
+                                  ('service', 'integrity', 'failed')])
+
+        events = [r for r in records if r['type'] == 'event']
+        self.assertEqual(
+            len({(e['source_id'], e['event_code']) for e in events
+                 if e['level'] == 'error'}),
+            validator.error_count)
@@ -28,7 +28,10 @@ import unittest
 import os
 import shutil
 import socket
+import tempfile
+import yaml
 from son.validate.validate import Validator
+from son.validate.benchmark import write_synthetic_catalogue
 from son.workspace.workspace import Workspace, Project
 from son.validate.event import EventLogger
 from Crypto.PublicKey import RSA
@@ -64,6 +67,21 @@ class UnitValidateTests(unittest.TestCase):
         self.assertEqual(validator.error_count, 0)
         self.assertEqual(validator.warning_count, 0)
 
+    def test_validate_package_cleanup(self):
+        """
+        Tests that the extracted contents of a package are removed once
+        validated, instead of when the process exits.
+        """
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        prev, tempfile.tempdir = tempfile.tempdir, tmp_dir
+        self.addCleanup(setattr, tempfile, 'tempdir', prev)
+
+        validator = Validator(workspace=self._workspace)
+        self.assertTrue(validator.validate_package(os.path.join(
+            SAMPLES_DIR, 'packages', 'sonata-demo-valid.son')))
+        self.assertEqual(os.listdir(tmp_dir), [])
+
     def test_validate_package_invalid_struct(self):
         """
         Tests the validation of a multiple SONATA packages with a bad file
@@ -330,6 +348,159 @@ class UnitValidateTests(unittest.TestCase):
         validator.validate_function(functions_path)
         self.assertGreater(validator.error_count, 0)
 
+    def test_validate_catalogue(self):
+        """
+        Tests the validation of a catalogue of services sharing the same
+        functions. Each function must be validated only once.
+        """
+        catalogue = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, catalogue)
+        ns_path = os.path.join(catalogue, 'ns_catalogue')
+        os.makedirs(ns_path)
+
+        # two services referencing the same three functions
+        with open(os.path.join(SAMPLES_DIR, 'services', 'valid.yml')) as _f:
+            nsd = yaml.load(_f)
+        for idx in range(2):
+            nsd['name'] = 'sonata-demo-{0}'.format(idx)
+            with open(os.path.join(ns_path, 'nsd{0}.yml'.format(idx)),
+                      'w') as _f:
+                yaml.dump(nsd, _f)
+
+        validator = Validator()
+        result = validator.validate_catalogue(
+            ns_path, os.path.join(SAMPLES_DIR, 'functions', 'valid'))
+
+        self.assertTrue(result)
+        self.assertEqual(validator.error_count, 0)
+
+        stats = validator.stats
+        self.assertEqual(stats['functions'], 3)
+        self.assertEqual(stats['function_stages_run'], 9)
+        self.assertEqual(stats['function_stages_reused'], 18)
+        self.assertGreater(stats['descriptor_reads_saved'], 0)
+
+    def test_validate_catalogue_release(self):
+        """
+        Tests that releasing descriptors once validated doesn't change the
+        results of the validation of a catalogue.
+        """
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        ns_path, vnf_path, _ = write_synthetic_catalogue(
+            root, 3, num_vnfs=3, num_vdus=2, num_cps=3, num_bridges=1,
+            num_paths=2, cycle_density=1.0)
+
+        results = []
+        for release in (False, True):
+            validator = Validator()
+            validator.configure(release_descriptors=release)
+            result = validator.validate_catalogue(ns_path, vnf_path)
+            results.append((result, validator.error_count,
+                            validator.warning_count, validator.stats))
+
+            descriptors = list(validator.storage.services.values()) + \
+                list(validator.storage.functions.values())
+            self.assertTrue(descriptors)
+            for descriptor in descriptors:
+                self.assertEqual(descriptor.content is None, release)
+
+        self.assertEqual(results[0], results[1])
+
+    def test_invalidate(self):
+        """
+        Tests the incremental validation of a service after one of its
+        functions is modified. Only the modified function is validated
+        again, and the results match those of a new validation.
+        """
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        vnf_path = os.path.join(root, 'vnfs')
+        shutil.copytree(os.path.join(SAMPLES_DIR, 'functions', 'valid'),
+                        vnf_path)
+        nsd_file = os.path.join(root, 'nsd.yml')
+        shutil.copy(os.path.join(SAMPLES_DIR, 'services', 'valid.yml'),
+                    nsd_file)
+        vnfd_file = os.path.join(vnf_path, 'firewall-vnfd.yml')
+        with open(vnfd_file) as _f:
+            vnfd = yaml.load(_f)
+
+        def validate(validator):
+            validator.configure(dpath=vnf_path, syntax=True, integrity=True,
+                                topology=True)
+            return validator.validate_service(nsd_file)
+
+        validator = Validator()
+        self.assertTrue(validate(validator))
+        self.assertEqual(validator.stats['function_stages_run'], 9)
+
+        # reference an undefined connection point in the function
+        vnfd['virtual_links'][0]['connection_points_reference'][0] = \
+            'vdu01:undefined'
+        with open(vnfd_file, 'w') as _f:
+            yaml.dump(vnfd, _f)
+
+        invalidated = validator.invalidate([vnfd_file])
+        self.assertEqual(len(invalidated), 2)
+        self.assertFalse(validate(validator))
+        self.assertEqual(validator.stats['function_stages_run'], 11)
+        self.assertGreater(validator.error_count, 0)
+
+        fresh = Validator()
+        validate(fresh)
+        self.assertEqual(validator.error_count, fresh.error_count)
+        self.assertEqual(validator.warning_count, fresh.warning_count)
+
+        # fix the function: its events are removed
+        vnfd['virtual_links'][0]['connection_points_reference'][0] = \
+            'vdu01:eth0'
+        with open(vnfd_file, 'w') as _f:
+            yaml.dump(vnfd, _f)
+
+        validator.invalidate([vnfd_file])
+        self.assertTrue(validate(validator))
+        self.assertEqual(validator.error_count, 0)
+        self.assertEqual(validator.warning_count, 0)
+
+        # the service is validated again without invalidation, replacing
+        # its results
+        self.assertTrue(validate(validator))
+        self.assertEqual(validator.error_count, 0)
+        self.assertEqual(validator.stats['function_stages_run'], 14)
+
+    def test_reuse_modified_function(self):
+        """
+        Tests that a reused validator doesn't reuse the results of a
+        function whose descriptor was modified on disk since.
+        """
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        ns_path = os.path.join(root, 'ns_catalogue')
+        vnf_path = os.path.join(root, 'vnf_catalogue')
+        os.makedirs(ns_path)
+        shutil.copytree(os.path.join(SAMPLES_DIR, 'functions', 'valid'),
+                        vnf_path)
+        shutil.copy(os.path.join(SAMPLES_DIR, 'services', 'valid.yml'),
+                    ns_path)
+        vnfd_file = os.path.join(vnf_path, 'firewall-vnfd.yml')
+
+        validator = Validator()
+        self.assertTrue(validator.validate_catalogue(ns_path, vnf_path))
+
+        with open(vnfd_file) as _f:
+            vnfd = yaml.load(_f)
+        vnfd['virtual_links'][0]['connection_points_reference'][0] = \
+            'vdu01:undefined'
+        with open(vnfd_file, 'w') as _f:
+            yaml.dump(vnfd, _f)
+
+        self.assertFalse(validator.validate_catalogue(ns_path, vnf_path))
+        fresh = Validator()
+        fresh.validate_catalogue(ns_path, vnf_path)
+        self.assertGreater(fresh.error_count, 0)
+        self.assertEqual(validator.error_count, fresh.error_count)
+        self.assertEqual(validator.warning_count, fresh.warning_count)
+
     def test_event_config_cli(self):
         """
         Tests the custom event configuration meant to be used with the CLI
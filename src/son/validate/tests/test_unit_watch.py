@@ -0,0 +1,99 @@
+#  Copyright (c) 2015 SONATA-NFV, UBIWHERE
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, UBIWHERE
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from son.validate.api.watch import ValidateWatcher
+
+
+class UnitValidateWatcherTests(unittest.TestCase):
+
+    def setUp(self):
+        self._calls = []
+        self._called = threading.Event()
+
+    def callback(self, path, changes):
+        self._calls.append((path, changes))
+        self._called.set()
+
+    def test_debounce(self):
+        """
+        A burst of changes is notified once, with all changed files.
+        """
+        watcher = ValidateWatcher('project', self.callback, debounce=0.2,
+                                  observer=False)
+        for _ in range(5):
+            watcher.changed('project/sources/nsd/nsd.yml')
+            watcher.changed('project/sources/vnf/vnfd.yml')
+            time.sleep(0.02)
+        watcher.changed('project/sources/vnf/.vnfd.yml.swp')
+        watcher.changed('project/sources/vnf/vnfd.yml~')
+        watcher.changed('project/.git/index')
+        watcher.changed('project/.git/refs/vnfd.yml')
+        watcher.changed('project/README.md')
+
+        self.assertTrue(self._called.wait(5))
+        time.sleep(0.3)
+        self.assertEqual(self._calls,
+                         [('project', {'project/sources/nsd/nsd.yml',
+                                       'project/sources/vnf/vnfd.yml'})])
+
+        # further changes are still watched
+        self._called.clear()
+        watcher.changed('project/sources/vnf/vnfd.yml')
+        self.assertTrue(self._called.wait(5))
+        self.assertEqual(len(self._calls), 2)
+        watcher.stop()
+
+    def test_observer(self):
+        """
+        Changes of a watched file are notified by the filesystem observer.
+        Other files of its directory are ignored.
+        """
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        watched = os.path.join(root, 'vnfd.yml')
+        other = os.path.join(root, 'other.yml')
+        for filename in (watched, other):
+            with open(filename, 'w') as _f:
+                _f.write('name: a\n')
+
+        watcher = ValidateWatcher(watched, self.callback, debounce=0.2)
+        self.addCleanup(watcher.stop)
+        with open(other, 'w') as _f:
+            _f.write('name: b\n')
+        with open(watched, 'w') as _f:
+            _f.write('name: b\n')
+
+        self.assertTrue(self._called.wait(10))
+        path, changes = self._calls[0]
+        self.assertEqual(path, watched)
+        self.assertEqual({os.path.basename(c) for c in changes},
+                         {'vnfd.yml'})
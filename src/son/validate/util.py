@@ -27,6 +27,7 @@
 import os
 import yaml
 import logging
+from son import trace
 from son.validate import event
 
 log = logging.getLogger(__name__)
@@ -61,6 +62,7 @@ def read_descriptor_file(file):
     :param file: descriptor filename
     :return: descriptor dictionary
     """
+    trace.count('files_parsed')
     with open(file, 'r') as _file:
 
         try:
@@ -129,6 +131,20 @@ def list_files(path, extension):
     return file_list
 
 
+def file_stamp(path):
+    """
+    Identifies the version of a file on disk, so that results obtained
+    from its content are not reused once it's modified.
+    :param path: filename
+    :return: tuple (realpath, mtime_ns, size), None if it can't be read
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return
+    return os.path.realpath(path), stat.st_mtime_ns, stat.st_size
+
+
 def strip_root(path):
     """
     Remove leading slash of a path
@@ -148,3 +164,20 @@ class CountCalls(object):
     def __call__(self, *args, **kwargs):
         self.counter += 1
         return self.method(*args, **kwargs)
+
+
+def resident_memory():
+    """
+    Provides the resident memory of the process, in bytes. Where it can't
+    be read, the peak resident memory is provided, and 0 on platforms
+    without the resource module.
+    """
+    try:
+        import resource
+    except ImportError:
+        return 0
+    try:
+        with open('/proc/self/statm', 'r') as _f:
+            return int(_f.read().split()[1]) * resource.getpagesize()
+    except (IOError, OSError, IndexError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
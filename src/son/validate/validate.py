@@ -34,24 +34,72 @@ import networkx as nx
 import zipfile
 import time
 import shutil
-import atexit
+import tempfile
 import errno
+import functools
 import yaml
+from son import trace
 from son.validate import event
+from son.validate import cycles as fgcycles
 from contextlib import closing
 from son.package.md5 import generate_hash
 from son.schema.validator import SchemaValidator
 from son.workspace.workspace import Workspace, Project
 from son.validate.storage import DescriptorStorage
 from son.validate.util import read_descriptor_files, list_files, strip_root, \
-    build_descriptor_id
-from Crypto.PublicKey import RSA
-from Crypto.Hash import SHA256
+    build_descriptor_id, file_stamp
 
 log = logging.getLogger(__name__)
 evtlog = event.get_logger('validator.events')
 
 
+def with_event_context(method):
+    """
+    Decorator that runs a validation method within the event context of
+    its validator, so that concurrent validations don't share events.
+    The validation is traced, see son.trace.
+    """
+    name = 'Validator.' + method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with evtlog.context(self.event_context), \
+                trace.span(name, 'son.validate',
+                           target=str(args[0]) if args else None):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def validation_stage(object_type, stage):
+    """
+    Decorator that notifies the start and the outcome (with its duration,
+    in seconds) of a validation stage of an object (package, service or
+    function) to the listeners of the event context of its validator.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, obj, *args, **kwargs):
+            # objects not stored yet (e.g. package files) are identified
+            # by the validated source
+            object_id = getattr(obj, 'id', self.source_id)
+            self._event_context.notify('stage', object_type=object_type,
+                                       object_id=object_id, stage=stage,
+                                       status='started')
+            start = time.time()
+            with trace.span(object_type + '.' + stage, 'son.validate',
+                            object_id=object_id) as span:
+                result = method(self, obj, *args, **kwargs)
+                span.set(result=bool(result))
+            self._event_context.notify('stage', object_type=object_type,
+                                       object_id=object_id, stage=stage,
+                                       status='passed' if result
+                                       else 'failed',
+                                       duration=time.time() - start)
+            return result
+        return wrapper
+    return decorator
+
+
 class Validator(object):
 
     def __init__(self, workspace=None):
@@ -80,43 +128,73 @@ class Validator(object):
         self._pkg_signature = None
         self._pkg_pubkey = None
 
+        # directory to export topology graphs (disabled by default)
+        self._graphs_dir = None
+
+        # release descriptors once validated (disabled by default)
+        self._release_descriptors = False
+
+        # limits of the forwarding graph cycle analysis
+        self._cycles_max_count = fgcycles.DEFAULT_MAX_CYCLES
+        self._cycles_max_length = fgcycles.DEFAULT_MAX_LENGTH
+        self._cycles_timeout = fgcycles.DEFAULT_TIMEOUT
+
         # configure logs
         coloredlogs.install(level=self._log_level)
 
         # descriptors storage
         self._storage = DescriptorStorage()
 
+        # results of the validation stages of each function, reused by all
+        # services referencing it until its descriptor file is modified:
+        # {function id: (file stamp, {stage: result})}
+        self._function_results = {}
+        self._function_stages_run = 0
+        self._function_stages_reused = 0
+
+        # function descriptors found in each dpath, listed again once any
+        # of its files is modified: {(dpath, dext): (file stamps, files)}
+        self._dpath_functions = {}
+        self._dpath_reads_saved = 0
+
         # syntax validation
         self._schema_validator = SchemaValidator(self._workspace, preload=True)
 
-        # reset event logger
-        evtlog.reset()
+        # events of this validator, isolated from other validators
+        self._event_context = event.EventContext()
 
         self.source_id = None
 
         self._fwgraphs = dict()
 
+    @property
+    def event_context(self):
+        """
+        Provides the event context collecting the events of the validator.
+        """
+        return self._event_context
+
     @property
     def errors(self):
-        return evtlog.errors
+        return self._event_context.errors
 
     @property
     def error_count(self):
         """
         Provides the number of errors given during validation.
         """
-        return len(self.errors)
+        return self._event_context.error_count
 
     @property
     def warnings(self):
-        return evtlog.warnings
+        return self._event_context.warnings
 
     @property
     def warning_count(self):
         """
         Provides the number of warnings given during validation.
         """
-        return len(self.warnings)
+        return self._event_context.warning_count
 
     @property
     def storage(self):
@@ -125,6 +203,19 @@ class Validator(object):
         """
         return self._storage
 
+    @property
+    def stats(self):
+        """
+        Provides counters of the validation work performed and saved by
+        reusing the results of functions already validated.
+        :return: dictionary of counters
+        """
+        return {'functions': len(self._function_results),
+                'function_stages_run': self._function_stages_run,
+                'function_stages_reused': self._function_stages_reused,
+                'descriptor_reads_saved': self._dpath_reads_saved +
+                self._storage.reads_saved}
+
     @property
     def dpath(self):
         return self._dpath
@@ -135,7 +226,9 @@ class Validator(object):
 
     def configure(self, syntax=None, integrity=None, topology=None,
                   dpath=None, dext=None, debug=None, pkg_signature=None,
-                  pkg_pubkey=None):
+                  pkg_pubkey=None, graphs_dir=None, cycles_max_count=None,
+                  cycles_max_length=None, cycles_timeout=None,
+                  max_event_details=None, release_descriptors=None):
         """
         Configure parameters for validation. It is recommended to call this
         function before performing a validation.
@@ -147,6 +240,22 @@ class Validator(object):
         :param debug: increase verbosity level of logger
         :param pkg_signature: String package signature to be validated
         :param pkg_pubkey: String package public key to verify signature
+        :param graphs_dir: directory to export the service topology graphs
+                           in GraphML format (not exported if not set)
+        :param cycles_max_count: maximum number of cycles reported per
+                                 strongly connected component of a
+                                 forwarding graph
+        :param cycles_max_length: maximum number of VNFs of a reported cycle
+        :param cycles_timeout: time budget, in seconds, of the cycle analysis
+                               of a forwarding graph
+        :param max_event_details: maximum number of detail messages kept per
+                                  event, e.g. each unused connection point
+                                  (0: unlimited)
+        :param release_descriptors: release the parsed content and topology
+                                    graphs of the services and functions
+                                    once validated, e.g. to validate large
+                                    catalogues. Stored descriptors no
+                                    longer provide their content.
         """
         # assign parameters
         if syntax is not None:
@@ -169,6 +278,18 @@ class Validator(object):
             self._pkg_signature = pkg_signature
         if pkg_pubkey is not None:
             self._pkg_pubkey = pkg_pubkey
+        if graphs_dir is not None:
+            self._graphs_dir = graphs_dir
+        if cycles_max_count is not None:
+            self._cycles_max_count = cycles_max_count
+        if cycles_max_length is not None:
+            self._cycles_max_length = cycles_max_length
+        if cycles_timeout is not None:
+            self._cycles_timeout = cycles_timeout
+        if max_event_details is not None:
+            self._event_context.max_details = max_event_details or None
+        if release_descriptors is not None:
+            self._release_descriptors = release_descriptors
 
     def _assert_configuration(self):
         """
@@ -180,11 +301,13 @@ class Validator(object):
             - 'validate_project'
             - 'validate_service'
             - 'validate_function'
+            - 'validate_catalogue'
         """
         # ensure this function is called by specific functions
         caller = inspect.stack()[1][3]
         if caller != 'validate_function' and caller != 'validate_service' and \
-           caller != 'validate_project' and caller != 'validate_package':
+           caller != 'validate_project' and caller != 'validate_package' and \
+           caller != 'validate_catalogue':
             log.error("Cannot assert a correct configuration. Validation "
                       "scope couldn't be determined. Aborting")
             return
@@ -223,8 +346,12 @@ class Validator(object):
         elif caller == 'validate_function':
             pass
 
+        elif caller == 'validate_catalogue':
+            pass
+
         return True
 
+    @with_event_context
     def validate_package(self, package):
         """
         Validate a SONATA package.
@@ -247,14 +374,23 @@ class Validator(object):
                        'evt_package_format_invalid')
             return
 
-        package_dir = '.' + str(time.time())
-        with closing(zipfile.ZipFile(package, 'r')) as pkg:
-            # extract package contents
-            pkg.extractall(package_dir)
-
-            # set folder for deletion when program exits
-            atexit.register(shutil.rmtree, package_dir)
+        # descriptors are read while validated: the extracted contents are
+        # removed right after, even by long-running processes (daemon, API)
+        package_dir = tempfile.mkdtemp(prefix='son-package-')
+        try:
+            with closing(zipfile.ZipFile(package, 'r')) as pkg:
+                pkg.extractall(package_dir)
+            return self._validate_package_contents(package, package_dir)
+        finally:
+            shutil.rmtree(package_dir, ignore_errors=True)
 
+    def _validate_package_contents(self, package, package_dir):
+        """
+        Validate the extracted contents of a SONATA package.
+        :param package: SONATA package filename
+        :param package_dir: directory of the extracted package
+        :return: True if all validations were successful, None otherwise
+        """
         # validate package file structure
         if not self._validate_package_struct(package_dir):
             evtlog.log("Invalid package structure",
@@ -264,10 +400,8 @@ class Validator(object):
             return
 
         # validate package signature (optional)
-        if (self._pkg_signature and self._pkg_pubkey) and (
-                not self.validate_package_signature(package,
-                                                    self._pkg_signature,
-                                                    self._pkg_pubkey)):
+        if (self._pkg_signature and self._pkg_pubkey) and \
+                not self._validate_package_signature(package):
             evtlog.log("Invalid package signature",
                        "Invalid signature of package '{}'".format(package),
                        self.source_id,
@@ -288,6 +422,7 @@ class Validator(object):
 
         return True
 
+    @with_event_context
     def validate_project(self, project):
         """
         Validate a SONATA project.
@@ -311,6 +446,10 @@ class Validator(object):
         if type(project) is not Project:
             return
 
+        # replace the results of a previous validation of the project
+        self._event_context.remove(
+            lambda source: source == project.project_root)
+
         log.info("Validating project '{0}'".format(project.project_root))
         log.info("... syntax: {0}, integrity: {1}, topology: {2}"
                  .format(self._syntax, self._integrity, self._topology))
@@ -327,6 +466,45 @@ class Validator(object):
 
         return self.validate_service(nsd_file)
 
+    @with_event_context
+    def validate_catalogue(self, ns_path, vnf_path):
+        """
+        Validate a catalogue of SONATA services and functions, e.g. the
+        catalogues of a workspace.
+        Each function is parsed and validated once, its result being reused
+        by every service referencing it. The validation continues after an
+        invalid descriptor is found.
+        :param ns_path: directory of service descriptors (NSDs)
+        :param vnf_path: directory of function descriptors (VNFDs)
+        :return: True if all validations were successful, None otherwise
+        """
+        if not self._assert_configuration():
+            return
+
+        log.info("Validating catalogue of services '{0}' and functions '{1}'"
+                 .format(ns_path, vnf_path))
+
+        # functions referenced by services are searched in the catalogue
+        self._dpath = vnf_path
+
+        result = True
+        for vnfd_file in sorted(list_files(vnf_path, self._dext)):
+            if not self.validate_function(vnfd_file):
+                result = None
+
+        for nsd_file in sorted(list_files(ns_path, self._dext)):
+            if not self.validate_service(nsd_file):
+                result = None
+
+        stats = self.stats
+        log.info("Validated {0} function(s): {1} validation stage(s) run, "
+                 "{2} reused. {3} descriptor read(s) saved"
+                 .format(stats['functions'], stats['function_stages_run'],
+                         stats['function_stages_reused'],
+                         stats['descriptor_reads_saved']))
+        return result
+
+    @with_event_context
     def validate_service(self, nsd_file):
         """
         Validate a SONATA service.
@@ -342,6 +520,9 @@ class Validator(object):
         log.info("... syntax: {0}, integrity: {1}, topology: {2}"
                  .format(self._syntax, self._integrity, self._topology))
 
+        # a service validated again is read again, replacing its results
+        self._forget_service(nsd_file)
+
         service = self._storage.create_service(nsd_file)
         if not service:
             evtlog.log("Invalid service descriptor",
@@ -351,6 +532,17 @@ class Validator(object):
                        'evt_service_invalid_descriptor')
             return
 
+        result = self._validate_service_stages(service)
+
+        if self._release_descriptors:
+            service.release()
+            # graphs of the functions built for the service topology
+            for func in service.functions.values():
+                func.release(content=False)
+
+        return result
+
+    def _validate_service_stages(self, service):
         # validate service syntax
         if self._syntax and not self._validate_service_syntax(service):
             return
@@ -363,6 +555,7 @@ class Validator(object):
 
         return True
 
+    @with_event_context
     def validate_function(self, vnfd_path):
         """
         Validate one or multiple SONATA functions (VNFs).
@@ -397,17 +590,110 @@ class Validator(object):
                        'evt_function_invalid_descriptor')
             return
 
-        if self._syntax and not self._validate_function_syntax(func):
-            return
+        result = self._validate_function_stages(func)
 
-        if self._integrity and not self._validate_function_integrity(func):
-            return
+        # the content is released once no further stage may be performed
+        # on the function: all stages passed or one of them failed
+        if self._release_descriptors and (not result or self._topology):
+            func.release()
 
-        if self._topology and not self._validate_function_topology(func):
-            return
+        return result
+
+    def _validate_function_stages(self, func):
+        # each stage is performed once per function, further validations
+        # of the same function (e.g. referenced by other services) reuse it
+        stamp = file_stamp(func.filename)
+        stored = self._function_results.get(func.id)
+        if stored and stored[0] != stamp:
+            # modified since validated: its results and events are replaced
+            log.debug("Function '{0}' was modified, validating it again"
+                      .format(func.id))
+            path = os.path.realpath(func.filename)
+            self._event_context.remove(
+                lambda source: source == func.id or
+                os.path.realpath(source) == path)
+            stored = None
+        if not stored:
+            stored = self._function_results[func.id] = (stamp, {})
+        results = stored[1]
+        stages = [('syntax', self._syntax, self._validate_function_syntax),
+                  ('integrity', self._integrity,
+                   self._validate_function_integrity),
+                  ('topology', self._topology,
+                   self._validate_function_topology)]
+
+        for stage, enabled, validate_stage in stages:
+            if not enabled:
+                continue
+            if stage in results:
+                log.debug("Reusing {0} validation of function '{1}'"
+                          .format(stage, func.id))
+                self._function_stages_reused += 1
+                self._event_context.notify(
+                    'stage', object_type='function', object_id=func.id,
+                    stage=stage, status='reused')
+            else:
+                results[stage] = validate_stage(func)
+                self._function_stages_run += 1
+            if not results[stage]:
+                return
 
         return True
 
+    def invalidate(self, paths):
+        """
+        Forget the descriptors read from the provided files, along with
+        the results and events of their validation, so that the next
+        validation reads and validates them again. Services referencing
+        an invalidated function are invalidated as well, while the results
+        of other functions are kept.
+        :param paths: modified, created or removed descriptor files
+        :return: set of ids of the invalidated descriptors
+        """
+        paths = {os.path.realpath(path) for path in paths}
+        invalidated = set()
+
+        for path in paths:
+            func = self._storage.remove_function_file(path)
+            if func:
+                self._function_results.pop(func.id, None)
+                invalidated.add(func.id)
+
+        for sid, service in list(self._storage.services.items()):
+            if os.path.realpath(service.filename) in paths or \
+                    invalidated.intersection(service.functions):
+                self._storage.remove_service(sid)
+                invalidated.add(sid)
+
+        # list again the descriptors of directories with changes
+        for key in list(self._dpath_functions):
+            dpath = os.path.join(os.path.realpath(key[0]), '')
+            if any(path.startswith(dpath) for path in paths):
+                del self._dpath_functions[key]
+
+        self._event_context.remove(
+            lambda source: source in invalidated or
+            os.path.realpath(source) in paths)
+
+        log.debug("Invalidated descriptors: {0}".format(invalidated))
+        return invalidated
+
+    def _forget_service(self, nsd_file):
+        """
+        Forget the service read from a descriptor file and the events of
+        its validation.
+        :param nsd_file: service descriptor filename
+        """
+        path = os.path.realpath(nsd_file)
+        sources = {nsd_file}
+        for sid, service in list(self._storage.services.items()):
+            if os.path.realpath(service.filename) == path:
+                self._storage.remove_service(sid)
+                sources.add(sid)
+
+        self._event_context.remove(lambda source: source in sources)
+
+    @validation_stage('package', 'struct')
     def _validate_package_struct(self, package_dir):
         """
         Validate the file structure of a SONATA package.
@@ -464,6 +750,11 @@ class Validator(object):
 
         return True
 
+    @validation_stage('package', 'signature')
+    def _validate_package_signature(self, package):
+        return self.validate_package_signature(package, self._pkg_signature,
+                                               self._pkg_pubkey)
+
     @staticmethod
     def validate_package_signature(package, signature, pubkey):
         """
@@ -474,6 +765,10 @@ class Validator(object):
         :param pubkey: String public key
         :return: Boolean. True if valid signature, False otherwise.
         """
+        # Crypto is only imported by signed package validations
+        from Crypto.PublicKey import RSA
+        from Crypto.Hash import SHA256
+
         log.info("Validating signature of package '{0}'".format(package))
         try:
             with open(package, 'rb') as _file:
@@ -494,6 +789,7 @@ class Validator(object):
 
         return result
 
+    @validation_stage('package', 'syntax')
     def _validate_package_syntax(self, package):
         """
         Validate the syntax of the package descriptor of a SONATA
@@ -513,6 +809,7 @@ class Validator(object):
             return
         return True
 
+    @validation_stage('service', 'syntax')
     def _validate_service_syntax(self, service):
         """
         Validate a the syntax of a service (NS) against its schema.
@@ -530,6 +827,7 @@ class Validator(object):
             return
         return True
 
+    @validation_stage('function', 'syntax')
     def _validate_function_syntax(self, func):
         """
         Validate the syntax of a function (VNF) against its schema.
@@ -547,6 +845,7 @@ class Validator(object):
             return
         return True
 
+    @validation_stage('package', 'integrity')
     def _validate_package_integrity(self, package, root_dir):
         """
         Validate the integrity of a package.
@@ -596,6 +895,7 @@ class Validator(object):
 
         return self.validate_service(entry_service_file)
 
+    @validation_stage('service', 'integrity')
     def _validate_service_integrity(self, service):
         """
         Validate the integrity of a service (NS).
@@ -648,31 +948,37 @@ class Validator(object):
 
         undeclared = service.undeclared_connection_points()
         if undeclared:
+            header = "{0} Undeclared connection point(s)" \
+                .format(len(undeclared))
             for cxpoint in undeclared:
-                evtlog.log("{0} Undeclared connection point(s)"
-                           .format(len(undeclared)),
+                evtlog.log(header,
                            "Virtual links section has undeclared connection "
-                           "point: {0}".format(cxpoint),
+                           "point: {0}",
                            service.id,
-                           'evt_nsd_itg_undeclared_cpoint')
+                           'evt_nsd_itg_undeclared_cpoint',
+                           msg_args=(cxpoint,))
             return
 
         # check for unused connection points
         unused_ifaces = service.unused_connection_points()
         if unused_ifaces:
+            header = "{0} Unused connection point(s)" \
+                .format(len(unused_ifaces))
             for cxpoint in unused_ifaces:
-                evtlog.log("{0} Unused connection point(s)"
-                           .format(len(unused_ifaces)),
-                           "Unused connection point: {0}"
-                           .format(cxpoint),
+                evtlog.log(header,
+                           "Unused connection point: {0}",
                            service.id,
-                           'evt_nsd_itg_unused_cpoint')
+                           'evt_nsd_itg_unused_cpoint',
+                           msg_args=(cxpoint,))
 
         # verify integrity between vnf_ids and vlinks
+        index = service.cp_index
         for vl_id, vl in service.vlinks.items():
             for cpr in vl.connection_point_refs:
-                s_cpr = cpr.split(':')
-                if len(s_cpr) == 1 and cpr not in service.connection_points:
+                ref = index.resolve(cpr)
+                if ref.declared:
+                    continue
+                if ref.prefix is None:
                     evtlog.log("Undefined connection point",
                                "Connection point '{0}' in virtual link "
                                "'{1}' is not defined"
@@ -680,19 +986,18 @@ class Validator(object):
                                service.id,
                                'evt_nsd_itg_undefined_cpoint')
                     return
-                elif len(s_cpr) == 2:
-                    func = service.mapped_function(s_cpr[0])
-                    if not func or s_cpr[1] not in func.connection_points:
-                        evtlog.log("Undefined connection point",
-                                   "Function (VNF) of vnf_id='{0}' declared "
-                                   "in connection point '{0}' in virtual link "
-                                   "'{1}' is not defined"
-                                   .format(s_cpr[0], s_cpr[1], vl_id),
-                                   service.id,
-                                   'evt_nsd_itg_undefined_cpoint')
-                        return
+                else:
+                    evtlog.log("Undefined connection point",
+                               "Function (VNF) of vnf_id='{0}' declared "
+                               "in connection point '{0}' in virtual link "
+                               "'{1}' is not defined"
+                               .format(ref.prefix, ref.cp, vl_id),
+                               service.id,
+                               'evt_nsd_itg_undefined_cpoint')
+                    return
         return True
 
+    @validation_stage('function', 'integrity')
     def _validate_function_integrity(self, func):
         """
         Validate the integrity of a function (VNF).
@@ -745,31 +1050,37 @@ class Validator(object):
         # check for undeclared connection points
         undeclared = func.undeclared_connection_points()
         if undeclared:
+            header = "{0} Undeclared connection point(s)" \
+                .format(len(undeclared))
             for cxpoint in undeclared:
-                evtlog.log("{0} Undeclared connection point(s)"
-                           .format(len(undeclared)),
+                evtlog.log(header,
                            "Virtual links section has undeclared connection "
-                           "points: {0}".format(cxpoint),
+                           "points: {0}",
                            func.id,
-                           'evt_vnfd_itg_undeclared_cpoint')
+                           'evt_vnfd_itg_undeclared_cpoint',
+                           msg_args=(cxpoint,))
             return
 
         # check for unused connection points
         unused_ifaces = func.unused_connection_points()
         if unused_ifaces:
+            header = "{0} Unused connection point(s)" \
+                .format(len(unused_ifaces))
             for cxpoint in unused_ifaces:
-                evtlog.log("{0} Unused connection point(s)"
-                           .format(len(unused_ifaces)),
-                           "Function has unused connection points: {0}"
-                           .format(cxpoint),
+                evtlog.log(header,
+                           "Function has unused connection points: {0}",
                            func.id,
-                           'evt_vnfd_itg_unused_cpoint')
+                           'evt_vnfd_itg_unused_cpoint',
+                           msg_args=(cxpoint,))
 
         # verify integrity between unit connection points and units
+        index = func.cp_index
         for vl_id, vl in func.vlinks.items():
             for cpr in vl.connection_point_refs:
-                s_cpr = cpr.split(':')
-                if len(s_cpr) == 1 and cpr not in func.connection_points:
+                ref = index.resolve(cpr)
+                if ref.declared:
+                    continue
+                if ref.prefix is None:
                     evtlog.log("Undefined connection point",
                                "Connection point '{0}' in virtual link "
                                "'{1}' is not defined"
@@ -777,20 +1088,18 @@ class Validator(object):
                                func.id,
                                'evt_nsd_itg_undefined_cpoint')
                     return
-                elif len(s_cpr) == 2:
-                    unit = func.units[s_cpr[0]]
-                    if not unit or s_cpr[1] not in unit.connection_points:
-
-                        evtlog.log("Undefined connection point(s)",
-                                   "Invalid connection point id='{0}' "
-                                   "of virtual link id='{1}': Unit id='{2}' "
-                                   "is not defined"
-                                   .format(s_cpr[1], vl_id, s_cpr[0]),
-                                   func.id,
-                                   'evt_vnfd_itg_undefined_cpoint')
-                        return
+                else:
+                    evtlog.log("Undefined connection point(s)",
+                               "Invalid connection point id='{0}' "
+                               "of virtual link id='{1}': Unit id='{2}' "
+                               "is not defined"
+                               .format(ref.cp, vl_id, ref.prefix),
+                               func.id,
+                               'evt_vnfd_itg_undefined_cpoint')
+                    return
         return True
 
+    @validation_stage('service', 'topology')
     def _validate_service_topology(self, service):
         """
         Validate the network topology of a service.
@@ -799,7 +1108,7 @@ class Validator(object):
         log.info("Validating topology of service '{0}'".format(service.id))
 
         # build service topology graph with VNF connection points
-        service.graph = service.build_topology_graph(level=1, bridges=False)
+        service.graph = service.topology_graph(level=1, bridges=False)
         if not service.graph:
             evtlog.log("Invalid topology",
                        "Couldn't build topology graph of service '{0}'"
@@ -812,7 +1121,8 @@ class Validator(object):
                   .format(service.id, service.graph.edges()))
 
         # write service graphs with different levels and options
-        self.write_service_graphs(service)
+        if self._graphs_dir:
+            self.write_service_graphs(service, self._graphs_dir)
 
         if nx.is_connected(service.graph):
             log.debug("Topology graph of service '{0}' is connected"
@@ -896,6 +1206,7 @@ class Validator(object):
             #  (cp pair) that integrate a particular cycle.
 
             fpg = nx.DiGraph()
+            index = service.cp_index
             for fw_path in fw_graph['fw_paths']:
                 prev_node = None
                 prev_iface = None
@@ -904,17 +1215,17 @@ class Validator(object):
                 # convert 'connection point' path into vnf path
                 for cp in fw_path['path']:
                     # find vnf_id of connection point
+                    ref = index.resolve(cp)
                     func = None
-                    s_cp = cp.split(':')
-                    if len(s_cp) == 2:
-                        func = service.mapped_function(s_cp[0])
+                    if ref.prefix is not None:
+                        func = ref.owner
                         if not func:
                             log.error(
                                 "Internal error: couldn't find corresponding"
                                 " VNFs in forwarding path '{}'"
                                 .format(fw_path['fp_id']))
                             return
-                        node = service.vnf_id(func)
+                        node = ref.prefix
 
                     else:
                         node = cp
@@ -966,14 +1277,16 @@ class Validator(object):
                 # remove 'path' from fw_path (not needed anymore)
                 fw_path.pop('path')
 
-            # find cycles
-            complete_cycles = list(nx.simple_cycles(fpg))
-
-            # remove 1-hop cycles
-            cycles = []
-            for cycle in complete_cycles:
-                if len(cycle) > 2:
-                    cycles.append(cycle)
+            # find cycles, ignoring 1-hop cycles (less than 3 VNFs)
+            cycles, truncated = fgcycles.find_cycles(
+                fpg, min_length=3,
+                max_length=self._cycles_max_length,
+                max_cycles=self._cycles_max_count,
+                timeout=self._cycles_timeout)
+            if truncated:
+                log.warning("Cycle analysis of forwarding graph fg_id='{0}' "
+                            "reached its limits. Reporting {1} cycle(s)"
+                            .format(fw_graph['fg_id'], len(cycles)))
 
             # build cycles representative connection point structure
             cycles_list = []
@@ -1016,10 +1329,12 @@ class Validator(object):
                                event_id=evtid,
                                detail_event_id=cycle['cycle_id'])
                 fw_graph['cycles'] = cycles_list
+                fw_graph['cycles_truncated'] = truncated
                 fw_graph['event_id'] = evtid
 
         return True
 
+    @validation_stage('function', 'topology')
     def _validate_function_topology(self, func):
         """
         Validate the network topology of a function.
@@ -1032,7 +1347,7 @@ class Validator(object):
                  .format(func.id))
 
         # build function topology graph
-        func.graph = func.build_topology_graph(bridges=True)
+        func.graph = func.topology_graph(bridges=True)
         if not func.graph:
             evtlog.log("Invalid topology graph",
                        "Couldn't build topology graph of function '{0}'"
@@ -1058,12 +1373,19 @@ class Validator(object):
         if not self._dpath:
             return
 
+        # load all VNFDs, once per dpath and version of its files
+        key = (self._dpath, self._dext)
         vnfd_files = list_files(self._dpath, self._dext)
-        log.debug("Found {0} descriptors in dpath='{2}': {1}"
-                  .format(len(vnfd_files), vnfd_files, self._dpath))
-
-        # load all VNFDs
-        path_vnfs = read_descriptor_files(vnfd_files)
+        stamps = {file_stamp(file) for file in vnfd_files}
+        if key in self._dpath_functions and \
+                self._dpath_functions[key][0] == stamps:
+            path_vnfs = self._dpath_functions[key][1]
+            self._dpath_reads_saved += len(path_vnfs)
+        else:
+            log.debug("Found {0} descriptors in dpath='{2}': {1}"
+                      .format(len(vnfd_files), vnfd_files, self._dpath))
+            path_vnfs = read_descriptor_files(vnfd_files)
+            self._dpath_functions[key] = (stamps, path_vnfs)
 
         # check for errors
         if 'network_functions' not in service.content:
@@ -1164,30 +1486,31 @@ class Validator(object):
         return backtrace
 
     @staticmethod
-    def write_service_graphs(service):
-        graphsdir = 'graphs'
+    def write_service_graphs(service, graphsdir='graphs'):
+        """
+        Export the topology graphs of a service, for all levels and with
+        and without bridges, to GraphML files.
+        :param service: service object
+        :param graphsdir: destination directory
+        """
         try:
             os.makedirs(graphsdir)
         except OSError as exc:
             if exc.errno == errno.EEXIST and os.path.isdir(graphsdir):
                 pass
 
-        service.build_topology_graph(level=3, bridges=False)
-
         for lvl in range(0, 4):
-            g = service.build_topology_graph(level=lvl, bridges=False)
+            g = service.topology_graph(level=lvl, bridges=False)
             nx.write_graphml(g, os.path.join(graphsdir,
                                              "{0}-lvl{1}.graphml"
                                              .format(service.id, lvl)))
-            g = service.build_topology_graph(level=lvl, bridges=True)
+            g = service.topology_graph(level=lvl, bridges=True)
             nx.write_graphml(g, os.path.join(graphsdir,
                                              "{0}-lvl{1}-br.graphml"
                                              .format(service.id, lvl)))
 
-        g = service.build_topology_graph(level=3, bridges=True,
-                                         vdu_inner_connections=False)
-        service.complete_graph = nx.generate_graphml(g, encoding='utf-8',
-                                                     prettyprint=True)
+        g = service.topology_graph(level=3, bridges=True,
+                                   vdu_inner_connections=False)
         nx.write_graphml(g, os.path.join(graphsdir,
                                          "{0}-lvl3-complete.graphml"
                                          .format(service.id)))
@@ -1230,6 +1553,11 @@ def main():
         son-validate --service ./nsd_file.yml --path ./vnfds/ --dext yml
         son-validate --function ./vnfd_file.yml
         son-validate --function ./vnfds/ --dext yml
+        son-validate --workspace-catalogue
+                     --workspace /home/sonata/.son-workspace
+        son-validate --batch './packages/**/*.son' --jobs 8
+                     --summary summary.json --junit junit.xml
+        son-validate --batch ./vnfds/ ./nsds/*.yml --type function
         """
     )
 
@@ -1275,6 +1603,53 @@ def main():
              "defined in '--dext'",
         required=False
     )
+    exclusive_parser.add_argument(
+        "--workspace-catalogue",
+        dest="workspace_catalogue",
+        help="Validate all the services and functions of the workspace "
+             "catalogues. Each function is validated once, regardless of "
+             "the number of services referencing it.",
+        required=False,
+        action="store_true",
+        default=False
+    )
+    exclusive_parser.add_argument(
+        "--batch",
+        nargs='+',
+        metavar="TARGET",
+        help="Validate many targets (paths or glob patterns) in parallel, "
+             "continuing past failures. The type of packages ('.son' "
+             "files) and projects is inferred, other targets require "
+             "'--type'. Function directories are expanded into their "
+             "descriptor files, with extension defined in '--dext'.",
+        required=False
+    )
+    parser.add_argument(
+        "--type",
+        dest="batch_type",
+        choices=['project', 'package', 'service', 'function'],
+        help="Type of the targets of '--batch'. Inferred by default.",
+        required=False
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        help="Number of worker processes of '--batch'. Default: number "
+             "of CPUs",
+        required=False
+    )
+    parser.add_argument(
+        "--summary",
+        help="Write the summary of '--batch', with the result and "
+             "duration of each target, to the specified JSON file.",
+        required=False
+    )
+    parser.add_argument(
+        "--junit",
+        help="Write the summary of '--batch' to the specified file, as a "
+             "JUnit XML report.",
+        required=False
+    )
     parser.add_argument(
         "--dpath",
         help="Specify a directory to search for descriptors. Particularly "
@@ -1308,14 +1683,32 @@ def main():
         action="store_true",
         default=False
     )
+    parser.add_argument(
+        "--graphs",
+        dest="graphs_dir",
+        help="Export the topology graphs of the validated service, in "
+             "GraphML format, to the specified directory.",
+        required=False
+    )
+    parser.add_argument(
+        "--max-event-details",
+        dest="max_event_details",
+        type=int,
+        help="Specify the maximum number of detail messages reported per "
+             "event, e.g. for each unused connection point. Further "
+             "occurrences are only counted. Unlimited by default.",
+        required=False
+    )
     parser.add_argument(
         "--debug",
         help="sets verbosity level to debug",
         required=False,
         action="store_true")
+    trace.add_argument(parser)
 
     # parse arguments
     args = parser.parse_args()
+    trace.configure(args, 'son-validate')
 
     # by default, perform all validations
     if not args.syntax and not args.integrity and not args.topology:
@@ -1341,7 +1734,9 @@ def main():
         validator.configure(syntax=args.syntax,
                             integrity=args.integrity,
                             topology=args.topology,
-                            debug=args.debug if args.debug else None)
+                            debug=args.debug if args.debug else None,
+                            graphs_dir=args.graphs_dir,
+                            max_event_details=args.max_event_details)
 
         result = validator.validate_package(args.package_file)
         print_result(validator, result)
@@ -1370,7 +1765,9 @@ def main():
         validator.configure(syntax=args.syntax,
                             integrity=args.integrity,
                             topology=args.topology,
-                            debug=args.debug)
+                            debug=args.debug,
+                            graphs_dir=args.graphs_dir,
+                            max_event_details=args.max_event_details)
 
         result = validator.validate_project(project)
         print_result(validator, result)
@@ -1381,7 +1778,9 @@ def main():
                             syntax=args.syntax,
                             integrity=args.integrity,
                             topology=args.topology,
-                            debug=args.debug)
+                            debug=args.debug,
+                            graphs_dir=args.graphs_dir,
+                            max_event_details=args.max_event_details)
 
         result = validator.validate_service(args.nsd)
         print_result(validator, result)
@@ -1392,11 +1791,75 @@ def main():
                             syntax=args.syntax,
                             integrity=args.integrity,
                             topology=args.topology,
-                            debug=args.debug)
+                            debug=args.debug,
+                            max_event_details=args.max_event_details)
 
         result = validator.validate_function(args.vnfd)
         print_result(validator, result)
 
+    elif args.batch:
+        from son.validate import batch
+
+        targets = batch.expand_targets(args.batch, obj_type=args.batch_type,
+                                       dext=args.dext or 'yml')
+        if not targets:
+            log.error("No targets to validate")
+            exit(1)
+
+        summary = batch.validate_batch(
+            targets, jobs=args.jobs, syntax=args.syntax,
+            integrity=args.integrity, topology=args.topology,
+            workspace_path=args.workspace_path, dpath=args.dpath,
+            dext=args.dext, max_event_details=args.max_event_details,
+            debug=args.debug, progress=batch.print_progress)
+
+        print("==== Batch: {0} target(s), {1} passed, {2} failed, {3} "
+              "error(s) in {4:.2f}s ({5} job(s)) ===="
+              .format(summary['targets'], summary['passed'],
+                      summary['failed'], summary['errors'],
+                      summary['duration'], summary['jobs']))
+        if args.summary:
+            batch.write_json(summary, args.summary)
+        if args.junit:
+            batch.write_junit(summary, args.junit)
+
+        exit(0 if summary['passed'] == summary['targets'] else 1)
+
+    elif args.workspace_catalogue:
+        if args.workspace_path:
+            ws_root = args.workspace_path
+        else:
+            ws_root = Workspace.DEFAULT_WORKSPACE_DIR
+
+        # Obtain Workspace object
+        workspace = Workspace.__create_from_descriptor__(ws_root)
+        if not workspace:
+            log.error("Invalid workspace path: '%s'\n" % ws_root)
+            exit(1)
+
+        validator = Validator(workspace=workspace)
+        validator.configure(dext=args.dext,
+                            syntax=args.syntax,
+                            integrity=args.integrity,
+                            topology=args.topology,
+                            debug=args.debug,
+                            graphs_dir=args.graphs_dir,
+                            max_event_details=args.max_event_details,
+                            release_descriptors=True)
+
+        result = validator.validate_catalogue(
+            os.path.join(workspace.workspace_root,
+                         workspace.ns_catalogue_dir),
+            os.path.join(workspace.workspace_root,
+                         workspace.vnf_catalogue_dir))
+        print_result(validator, result)
+
+        stats = validator.stats
+        print("==== Catalogue: {0} function(s) validated, {1} validation "
+              "stage(s) reused, {2} descriptor read(s) saved ===="
+              .format(stats['functions'], stats['function_stages_reused'],
+                      stats['descriptor_reads_saved']))
+
     else:
         log.error("Invalid arguments.")
         exit(1)
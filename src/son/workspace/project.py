@@ -30,7 +30,6 @@ import logging
 import coloredlogs
 import yaml
 import shutil
-import pkg_resources
 
 
 log = logging.getLogger(__name__)
@@ -253,6 +252,8 @@ class Project:
 
         :param path: The VNF sample directory
         """
+        import pkg_resources
+
         sample_vnfd = 'vnfd-sample.yml'
         sample_image = 'sample_docker'
         rp = __name__
@@ -275,6 +276,8 @@ class Project:
 
         :param path: The NSD sample directory
         """
+        import pkg_resources
+
         sample_nsd = 'nsd-sample.yml'
         rp = __name__
 
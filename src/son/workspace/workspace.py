@@ -358,6 +358,7 @@ class Workspace:
 
 def main():
     import argparse
+    from son import trace
 
     parser = argparse.ArgumentParser(
         description="Generate new sonata workspaces and project layouts")
@@ -385,7 +386,10 @@ def main():
         required=False,
         action="store_true")
 
+    trace.add_argument(parser)
+
     args = parser.parse_args()
+    trace.configure(args, 'son-workspace')
 
     log_level = "INFO"
     if args.debug: